@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable
+import argparse
+import importlib.util
+import inspect
+import math
+import random
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter
+
+SCRIPTS = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS))
+
+from polish_assets.benchmarks import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    Case,
+    Measurement,
+    compare,
+    isolated,
+    load_results,
+    measure,
+    save_results,
+)
+from polish_assets.encoding import ENCODERS, save_png  # noqa: E402
+from polish_assets.fields import (  # noqa: E402
+    array_to_image,
+    lut_strip_field,
+    noise_field,
+    portal_gradient_field,
+)
+from polish_assets.procedural import load_specs, render, render_batch  # noqa: E402
+from polish_assets.rng import stream as rng_stream  # noqa: E402
+
+
+SEED = 20260226
+SUITE_SIZES = [256, 512, 1024]
+# Timings are machine-specific, so the baseline lives in the untracked cache.
+BASELINE_PATH = SCRIPTS.parent / "Assets" / "free-open" / ".cache" / "bench-baseline.json"
+
+
+def load_pipeline() -> Any:
+    spec = importlib.util.spec_from_file_location(
+        "fetch_free_polish_assets", SCRIPTS / "fetch-free-polish-assets.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+PIPELINE = load_pipeline()
+
+
+# Per-pixel reference implementations, kept verbatim from the original
+# fetch-free-polish-assets.py generators for timing and byte comparison.
+def loop_noise(width: int, height: int, amount: int = 255) -> Image.Image:
+    img = Image.new("L", (width, height))
+    dst = img.load()
+    for y in range(height):
+        for x in range(width):
+            dst[x, y] = random.randint(0, amount)
+    return img
+
+
+def loop_portal_gradient(size: int) -> Image.Image:
+    img = Image.new("RGB", (size, size), (6, 16, 30))
+    center = size / 2
+    px = img.load()
+    for y in range(size):
+        for x in range(size):
+            dx = (x - center) / center
+            dy = (y - center) / center
+            distance = min(1.0, math.sqrt(dx * dx + dy * dy))
+            glow = 1.0 - distance
+            px[x, y] = (
+                int(26 + glow * 158),
+                int(74 + glow * 174),
+                int(126 + glow * 128),
+            )
+    return img.filter(ImageFilter.GaussianBlur(radius=1.8))
+
+
+def loop_lut_strip(width: int, height: int) -> Image.Image:
+    img = Image.new("RGB", (width, height))
+    px = img.load()
+    for y in range(height):
+        v = y / max(1, height - 1)
+        for x in range(width):
+            u = x / max(1, width - 1)
+            px[x, y] = (
+                int(min(255, (u ** 0.9) * 255)),
+                int(min(255, ((u * 0.8 + v * 0.2) ** 1.0) * 255)),
+                int(min(255, ((u * 0.58 + (1 - v) * 0.42) ** 1.1) * 255)),
+            )
+    return img
+
+
+def array_noise(width: int, height: int, amount: int = 255) -> Image.Image:
+    return array_to_image(noise_field(width, height, amount))
+
+
+def array_portal_gradient(size: int) -> Image.Image:
+    img = array_to_image(portal_gradient_field(size), "RGBX")
+    return img.filter(ImageFilter.GaussianBlur(radius=1.8)).convert("RGB")
+
+
+def array_lut_strip(width: int, height: int) -> Image.Image:
+    return array_to_image(lut_strip_field(width, height), "RGBX").convert("RGB")
+
+
+CASES: dict[str, tuple[Callable[[int], Image.Image], Callable[[int], Image.Image]]] = {
+    "noise": (lambda size: loop_noise(size, size), lambda size: array_noise(size, size)),
+    "portal_gradient": (loop_portal_gradient, array_portal_gradient),
+    "lut_strip": (lambda size: loop_lut_strip(size, 32), lambda size: array_lut_strip(size, 32)),
+}
+
+
+def timed(build: Callable[[int], Image.Image], size: int) -> tuple[float, bytes, int]:
+    random.seed(SEED)
+    start = time.perf_counter()
+    image = build(size)
+    elapsed = time.perf_counter() - start
+    # The trailing draw proves the array path leaves the global stream where the loops did.
+    return elapsed, image.tobytes(), random.getrandbits(32)
+
+
+# Suite inputs: deterministic stand-ins for the downloaded sources, so the
+# numbers do not depend on what is in the download cache.
+def sprite(size: int) -> Image.Image:
+    disc = Image.new("RGBA", (size, size), (255, 255, 255, 0))
+    inset = size // 4
+    ImageDraw.Draw(disc).ellipse((inset, inset, size - inset, size - inset), fill="white")
+    return disc.filter(ImageFilter.GaussianBlur(size / 12))
+
+
+def cloud(size: int, name: str) -> Image.Image:
+    rng = rng_stream(SEED, name)
+    bands = [array_to_image(noise_field(size, size, 255, rng)) for _ in range(4)]
+    return Image.merge("RGBA", bands).filter(ImageFilter.GaussianBlur(3))
+
+
+def generator_cases() -> dict[str, Case]:
+    P = PIPELINE
+
+    def confetti(size: int) -> Callable[[], Image.Image]:
+        stamps = [sprite(128), sprite(96)]
+        return lambda: P.make_confetti_atlas_from_stamps(
+            size, size, stamps, rng_stream(SEED, "confetti")
+        )
+
+    def waveform(size: int) -> Callable[[], Image.Image]:
+        noise = cloud(256, "waveform")
+        return lambda: P.make_waveform_mask(size, max(4, size // 16), noise)
+
+    def haze(size: int) -> Callable[[], Image.Image]:
+        source = cloud(size, "haze")
+        return lambda: P.make_haze_plate_from_source(
+            source,
+            (size, size),
+            "#10243b",
+            "#b9dcff",
+            blur_radius=9.0,
+            alpha_scale=0.72,
+            blur="pyramid",
+        )
+
+    return {
+        "make_noise": lambda size: lambda: P.make_noise(size, size, rng_stream(SEED, "noise")),
+        "make_confetti_atlas_from_stamps": confetti,
+        "make_waveform_mask": waveform,
+        "make_haze_plate_from_source": haze,
+        "make_lut_strip": lambda size: lambda: P.make_lut_strip(size, 32),
+        "make_vignette": lambda size: lambda: P.make_vignette(size),
+    }
+
+
+def procedural_cases() -> dict[str, Case]:
+    specs = load_specs(PIPELINE.PROCEDURAL_SPECS)
+
+    def scaled(spec: dict[str, Any], size: int) -> dict[str, Any]:
+        # Layers are laid out in fractions of the canvas, so the aspect ratio is all that carries over.
+        return {**spec, "width": size, "height": max(1, size * spec["height"] // spec["width"])}
+
+    def single(spec: dict[str, Any]) -> Case:
+        def setup(size: int) -> Callable[[], Image.Image]:
+            sized, images = scaled(spec, size), {"glow": sprite(128)}
+            return lambda: render(sized, images, SEED)
+
+        return setup
+
+    def batch(size: int) -> Callable[[], list[Image.Image]]:
+        sized, images = [scaled(spec, size) for spec in specs.values()], {"glow": sprite(128)}
+        return lambda: render_batch(sized, images, SEED)
+
+    return {
+        **{f"procedural:{name}": single(spec) for name, spec in specs.items()},
+        "procedural:batch": batch,
+    }
+
+
+def encoder_cases(workdir: Path) -> dict[str, Case]:
+    def case(save: Callable[[Image.Image, Path], Any]) -> Case:
+        suffix = ".ktx2" if "ktx2" in save.__name__ else ".png" if save is save_png else ".webp"
+
+        def setup(size: int) -> Callable[[], Path]:
+            image = ImageChops.multiply(
+                array_portal_gradient(size), cloud(size, "encode").convert("RGB")
+            )
+            out_path = workdir / f"{save.__name__}_{size}{suffix}"
+
+            def run() -> Path:
+                save(image, out_path)
+                return out_path
+
+            return run
+
+        return setup
+
+    return {save.__name__: case(save) for save in ENCODERS}
+
+
+def uncached(case: Case) -> Case:
+    # Without this the image cache would serve every repeat after the first.
+    def setup(size: int) -> Callable[[], Any]:
+        call = case(size)
+
+        def run() -> Any:
+            PIPELINE.IMAGES.clear()
+            return call()
+
+        return run
+
+    return setup
+
+
+def suite_cases(workdir: Path) -> dict[str, Case]:
+    return {**generator_cases(), **procedural_cases(), **encoder_cases(workdir)}
+
+
+def uncovered(cases: dict[str, Case]) -> list[str]:
+    """`make_*` generators in the pipeline script that have no suite case."""
+    return sorted(
+        name
+        for name, value in vars(PIPELINE).items()
+        if name.startswith("make_") and inspect.isfunction(value) and name not in cases
+    )
+
+
+def suite_case(name: str, size: int, repeat: int, workdir: str) -> Measurement:
+    return measure(uncached(suite_cases(Path(workdir))[name]), name, size, repeat)
+
+
+def run_suite(args: argparse.Namespace) -> int:
+    names = args.cases or list(suite_cases(Path()))
+    missing = uncovered(suite_cases(Path()))
+    if missing:
+        print(f"No benchmark case for: {', '.join(missing)}")
+        return 1
+
+    print(f"{'case':<32} {'size':>6} {'seconds':>9} {'peak MiB':>9} {'bytes':>11}")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="polish-bench-") as workdir:
+        for name in names:
+            for size in args.sizes or SUITE_SIZES:
+                # A fresh process per case keeps caches and heap growth out of the next one.
+                result = isolated(suite_case, name, size, args.repeat, workdir)
+                results.append(result)
+                print(
+                    f"{name:<32} {size:>6} {result.seconds:>9.3f} "
+                    f"{result.peak_bytes / (1 << 20):>9.1f} {result.output_bytes:>11,}"
+                )
+
+    if args.json is not None:
+        save_results(args.json, results)
+    if args.save_baseline:
+        save_results(args.baseline, results)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 0
+    regressions = compare(results, load_results(args.baseline), args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if regressions else 0
+
+
+def run_loops(args: argparse.Namespace) -> int:
+    print(f"{'generator':<16} {'size':>6} {'loop s':>9} {'array s':>9} {'speedup':>8}  identical")
+    mismatches = 0
+    for name in args.cases or CASES:
+        loop_build, array_build = CASES[name]
+        for size in args.sizes or [512, 1024, 4096]:
+            loop_time, loop_bytes, loop_tail = timed(loop_build, size)
+            array_time, array_bytes, array_tail = timed(array_build, size)
+            identical = loop_bytes == array_bytes and loop_tail == array_tail
+            mismatches += not identical
+            print(
+                f"{name:<16} {size:>6} {loop_time:>9.3f} {array_time:>9.3f} "
+                f"{loop_time / max(array_time, 1e-9):>7.1f}x  {'yes' if identical else 'NO'}"
+            )
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark per-pixel vs array generators, or every generator and encoder."
+    )
+    parser.add_argument(
+        "--suite",
+        action="store_true",
+        help=(
+            "Benchmark every make_* generator and encoder instead (time, peak memory, output "
+            "bytes) and compare against the stored baseline."
+        ),
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--cases", nargs="+", default=None)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Suite: time the best of N calls (default: 3)."
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Suite: write the results here.")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE_PATH,
+        help=f"Suite: baseline to compare against (default: {BASELINE_PATH}).",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Suite: store this run as the baseline."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=(
+            "Suite: fail when a metric grows by more than this fraction "
+            f"(default: {DEFAULT_THRESHOLD})."
+        ),
+    )
+    args = parser.parse_args()
+
+    known = suite_cases(Path()) if args.suite else CASES
+    unknown = sorted(set(args.cases or ()) - set(known))
+    if unknown:
+        parser.error(f"unknown cases {unknown}; choose from {sorted(known)}")
+    return run_suite(args) if args.suite else run_loops(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
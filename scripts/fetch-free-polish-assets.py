@@ -1,15 +1,63 @@
 from __future__ import annotations
 
-from io import BytesIO
+from functools import partial
 from pathlib import Path
-from typing import Iterable
-import math
+from typing import Any, Callable, Hashable, Iterable
+import argparse
+import json
 import random
+import re
 import shutil
-import urllib.request
-import zipfile
-
-from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageOps
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+from polish_assets.archives import ArchiveIndex
+from polish_assets.atlas import AtlasLayout, compose, pack, uv_rects
+from polish_assets.blur import blur_footprint, gaussian_blur
+from polish_assets.build_graph import BuildGraph, BuildResult, Node
+from polish_assets.download_cache import DownloadCache
+from polish_assets.downloader import DEFAULT_WORKERS, fetch_all
+from polish_assets.curves import Sinusoid, flipbook, line_coverage, sinusoid_sum
+from polish_assets.encoding import (
+    EncodeReport,
+    EncodeStage,
+    save_png,
+    save_webp,
+    save_webp_tuned,
+)
+from polish_assets.fields import (
+    array_to_image,
+    lut_strip_field,
+    noise_field,
+    radial_gradient_field,
+)
+from polish_assets.hdr import levels, read_hdr, rgbe_image
+from polish_assets.image_cache import DEFAULT_MAX_BYTES, ImageCache
+from polish_assets.sh import prefilter_specular, project_sh
+from polish_assets.streaming import Stream
+from polish_assets.stamps import (
+    DEFAULT_ANGLE_STEPS,
+    DEFAULT_SCALE_STEPS,
+    StampVariants,
+    composite_over,
+    to_image,
+)
+from polish_assets.ktx2 import (
+    level_count,
+    read_ktx2,
+    save_ktx2_linear,
+    save_ktx2_normal,
+    save_ktx2_srgb,
+)
+from polish_assets.procedural import load_specs, render
+from polish_assets.quality import DEFAULT_TARGET
+from polish_assets.rng import stream as rng_stream
+from polish_assets.tiles import Tiler
+from polish_assets.tracing import TRACER
+from polish_assets.runtime_config import technical_budgets, texture_set_sides, texture_sets
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -17,6 +65,47 @@ ASSETS_SOURCE_ROOT = ROOT / "Assets" / "free-open"
 DOWNLOAD_ROOT = ASSETS_SOURCE_ROOT / "downloads"
 GENERATED_ROOT = ASSETS_SOURCE_ROOT / "generated"
 RUNTIME_ROOT = ROOT / "src" / "assets"
+CONFIG_ROOT = ROOT / "src" / "config"
+DOWNLOAD_CACHE_ROOT = ASSETS_SOURCE_ROOT / ".cache" / "downloads"
+BUILD_DB_PATH = ASSETS_SOURCE_ROOT / ".cache" / "build-graph.json"
+TEXTURE_TIERS_PATH = RUNTIME_ROOT / "textures" / "texture_tiers.json"
+PROCEDURAL_SPECS = Path(__file__).with_name("procedural-textures.json")
+SEED = 20260226
+# Runtime textures that were replaced by hand-made versions (PROGRESS.md, 2026-02-27). Their
+# specs render into the generated tree only, and the runtime files are committed sources.
+CURATED_TEXTURES = frozenset({"textures/transition/radial_burst_mask.webp"})
+
+# Material packs are opened once per run and shared by every tunnel node;
+# decoded sources and their resizes are shared by every node that reads them.
+ARCHIVES = ArchiveIndex()
+IMAGES = ImageCache()
+# Large blurs and composites run tile by tile on threads; tiling never changes the output bytes.
+TILES = Tiler()
+
+# Width of the RGBE environment level each device tier downloads.
+ENV_TIER_WIDTHS = {"high": 1024, "mid": 512, "low": 256}
+# Prefiltered specular bands, one row of the strip per roughness, cut from the low level.
+ENV_SPECULAR = {"width": 64, "roughness": [0.25, 0.5, 0.75, 1.0]}
+# The transition waveform: two sinusoids whose phases loop over the baked flipbook frames.
+# WaveformLines.tsx steps through WAVEFORM_FRAMES frames of 1024x64.
+WAVEFORM_TERMS = (Sinusoid(0.36, 0.05), Sinusoid(0.36, 0.11, 1.4, cycles=2))
+WAVEFORM_FRAMES = 16
+# Decoded levels of the environment being built; its tier nodes run back to back.
+ENV_LEVELS: dict[Path, dict[int, np.ndarray]] = {}
+
+# Textures the runtime loads with `srgb: true`; every other texture is data.
+SRGB_TEXTURES = frozenset(
+    {
+        "wall_albedo",
+        "floor_albedo",
+        "ceiling_emissive_strip",
+        "portal_gradient",
+        "grime_atlas",
+        "haze_a",
+        "haze_b",
+        "stadium_crowd_plate",
+    }
+)
 
 
 def ensure_dirs(paths: Iterable[Path]) -> None:
@@ -24,57 +113,38 @@ def ensure_dirs(paths: Iterable[Path]) -> None:
         path.mkdir(parents=True, exist_ok=True)
 
 
-def download(url: str, out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    request = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(request) as response:
-        out_path.write_bytes(response.read())
-
-
-def save_webp(image: Image.Image, out_path: Path, quality: int = 92) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(out_path, format="WEBP", quality=quality, method=6)
-
-
-def save_png(image: Image.Image, out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    image.save(out_path, format="PNG", optimize=True)
+def download_all(cache: DownloadCache, downloads: dict[str, str], workers: int) -> None:
+    start = time.perf_counter()
+    results = fetch_all(
+        cache,
+        [(url, DOWNLOAD_ROOT / filename) for filename, url in downloads.items()],
+        workers=workers,
+    )
+    for result in results:
+        print(result.summary())
+    received = sum(result.bytes_received for result in results)
+    elapsed = time.perf_counter() - start
+    print(f"Fetched {len(results)} sources ({received / 1e6:.2f} MB received) in {elapsed:.2f} s")
 
 
 def resize_image(image: Image.Image, size: tuple[int, int]) -> Image.Image:
-    return image.resize(size, Image.Resampling.LANCZOS)
+    return IMAGES.resize(image, size)
 
 
 def load_rgb(path: Path) -> Image.Image:
-    return Image.open(path).convert("RGB")
+    return IMAGES.load(path, "RGB")
 
 
 def load_rgba(path: Path) -> Image.Image:
-    return Image.open(path).convert("RGBA")
+    return IMAGES.load(path, "RGBA")
 
 
-def load_zip_image(zip_path: Path, suffix: str, mode: str = "RGB") -> Image.Image:
-    suffix_l = suffix.lower()
-    with zipfile.ZipFile(zip_path) as archive:
-        candidate = next(
-            (name for name in archive.namelist() if name.lower().endswith(suffix_l)),
-            None,
-        )
-        if candidate is None:
-            raise FileNotFoundError(f"{suffix} not found in {zip_path}")
-        with archive.open(candidate) as file_handle:
-            data = file_handle.read()
-    with Image.open(BytesIO(data)) as image:
-        return image.convert(mode).copy()
+def load_pack_channel(zip_path: Path, channel: str, mode: str = "RGB") -> Image.Image:
+    return ARCHIVES.take(zip_path, channel, mode)
 
 
-def make_noise(width: int, height: int, amount: int = 255) -> Image.Image:
-    img = Image.new("L", (width, height))
-    dst = img.load()
-    for y in range(height):
-        for x in range(width):
-            dst[x, y] = random.randint(0, amount)
-    return img
+def make_noise(width: int, height: int, rng: random.Random, amount: int = 255) -> Image.Image:
+    return array_to_image(noise_field(width, height, amount, rng))
 
 
 def tint(image: Image.Image, black: str, white: str) -> Image.Image:
@@ -86,64 +156,43 @@ def make_confetti_atlas_from_stamps(
     width: int,
     height: int,
     stamps: list[Image.Image],
+    rng: random.Random,
     count: int = 180,
+    scale_steps: int = DEFAULT_SCALE_STEPS,
+    angle_steps: int = DEFAULT_ANGLE_STEPS,
 ) -> Image.Image:
-    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    # Each (stamp, scale step, angle step) is rendered once; copies are a tint and a blend.
+    scale_range = (0.2, 0.65)
+    variants = StampVariants(
+        stamps, scale_range, scale_steps, angle_steps, min_size=8, resize=resize_image
+    )
+    canvas = np.zeros((height, width, 4), dtype=np.float32)
     for _ in range(count):
-        stamp = random.choice(stamps)
-        scale = random.uniform(0.2, 0.65)
-        size = max(8, int(stamp.width * scale))
-        tile = resize_image(stamp, (size, size))
-        angle = random.uniform(0, 360)
-        tile = tile.rotate(angle, expand=True, resample=Image.Resampling.BICUBIC)
-        alpha = random.randint(96, 220)
-        rgb = Image.new(
-            "RGBA",
-            tile.size,
-            (
-                random.randint(164, 255),
-                random.randint(195, 255),
-                255,
-                alpha,
-            ),
-        )
-        tile = ImageChops.multiply(tile, rgb)
-        x = random.randint(-tile.width // 2, width - tile.width // 2)
-        y = random.randint(-tile.height // 2, height - tile.height // 2)
-        atlas.alpha_composite(tile, (x, y))
-    return atlas.filter(ImageFilter.GaussianBlur(radius=0.5))
-
-
-def make_light_streak(width: int, height: int, glow_sprite: Image.Image) -> Image.Image:
-    streak = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(streak)
-    center_y = height // 2
-    for i in range(10, 0, -1):
-        alpha = int((i / 10) ** 1.8 * 185)
-        thickness = max(1, int((i / 10) * (height // 2)))
-        draw.rectangle(
-            (0, center_y - thickness, width, center_y + thickness),
-            fill=(255, 255, 255, alpha),
-        )
-
-    glow = resize_image(glow_sprite, (height * 5, height * 5))
-    glow = glow.filter(ImageFilter.GaussianBlur(radius=8))
-    for x in (int(width * 0.18), int(width * 0.52), int(width * 0.84)):
-        streak.alpha_composite(glow, (x - glow.width // 2, center_y - glow.height // 2))
-    return streak.filter(ImageFilter.GaussianBlur(radius=1.9))
-
-
-def make_waveform_mask(width: int, height: int, noise_tex: Image.Image) -> Image.Image:
-    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    for x in range(width):
-        wave = (math.sin(x * 0.05) + math.sin(x * 0.11 + 1.4)) * 0.36
-        y = int((height / 2) + wave * (height / 2.7))
-        draw.line((x, max(0, y - 2), x, min(height, y + 2)), fill=(255, 255, 255, 220))
+        index = rng.randrange(len(stamps))
+        tile = variants.get(index, rng.uniform(*scale_range), rng.uniform(0, 360))
+        alpha = rng.randint(96, 220)
+        factors = (rng.randint(164, 255) / 255, rng.randint(195, 255) / 255, 1.0, alpha / 255)
+        x = rng.randint(-tile.shape[1] // 2, width - tile.shape[1] // 2)
+        y = rng.randint(-tile.shape[0] // 2, height - tile.shape[0] // 2)
+        composite_over(canvas, tile, x, y, factors)
+    return to_image(canvas).filter(ImageFilter.GaussianBlur(radius=0.5))
+
+
+def make_waveform_mask(
+    width: int, height: int, noise_tex: Image.Image, frames: int = 1
+) -> Image.Image:
+    """The waveform line at `frames` phases of its loop, stacked into one strip, frame 0 on top."""
+    wave = sinusoid_sum(width, WAVEFORM_TERMS, frames)
+    coverage = line_coverage(height / 2 + wave * (height / 2.7) + 0.5, height, half_width=2.5)
     noise_line = resize_image(noise_tex.convert("RGBA"), (width, height)).filter(
         ImageFilter.GaussianBlur(0.6)
     )
-    return ImageChops.multiply(img, noise_line)
+    line = np.empty((*coverage.shape, 4), dtype=np.float32)
+    line[..., :3] = coverage[..., np.newaxis] * 255
+    line[..., 3] = coverage * 220
+    line *= np.asarray(noise_line, dtype=np.float32) * (1 / 255)
+    line += 0.5
+    return array_to_image(flipbook(line.astype(np.uint8)))
 
 
 def make_haze_plate_from_source(
@@ -153,303 +202,949 @@ def make_haze_plate_from_source(
     tint_white: str,
     blur_radius: float,
     alpha_scale: float,
+    blur: str = "exact",
 ) -> Image.Image:
-    plate = resize_image(source.convert("RGBA"), size).filter(
-        ImageFilter.GaussianBlur(blur_radius)
-    )
-    rgb = tint(plate.convert("RGB"), tint_black, tint_white).convert("RGBA")
-    alpha = ImageOps.grayscale(plate).point(lambda p: int(min(255, p * alpha_scale)))
-    rgb.putalpha(alpha)
-    return rgb
-
-
-def make_radial_burst(size: int) -> Image.Image:
-    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    center = size // 2
-    for degree in range(0, 360, 8):
-        radians = math.radians(degree)
-        inner = size * 0.14
-        outer = size * (0.35 + random.random() * 0.28)
-        x1 = center + math.cos(radians) * inner
-        y1 = center + math.sin(radians) * inner
-        x2 = center + math.cos(radians) * outer
-        y2 = center + math.sin(radians) * outer
-        alpha = random.randint(110, 230)
-        draw.line((x1, y1, x2, y2), fill=(255, 255, 255, alpha), width=random.randint(1, 3))
-    return img.filter(ImageFilter.GaussianBlur(radius=1.8))
-
-
-def make_ceiling_emissive_strip(width: int, height: int) -> Image.Image:
-    img = Image.new("RGB", (width, height), (8, 16, 28))
-    draw = ImageDraw.Draw(img)
-    band_top = int(height * 0.33)
-    band_bottom = int(height * 0.67)
-    for i in range(6):
-        inset = i * 5
-        alpha = int(220 - i * 35)
-        draw.rectangle(
-            (inset, band_top + inset // 2, width - inset, band_bottom - inset // 2),
-            fill=(134, 205, 255, alpha),
-        )
-    return img.filter(ImageFilter.GaussianBlur(radius=4.5))
-
-
-def make_portal_gradient(size: int) -> Image.Image:
-    img = Image.new("RGB", (size, size), (6, 16, 30))
-    center = size / 2
-    px = img.load()
-    for y in range(size):
-        for x in range(size):
-            dx = (x - center) / center
-            dy = (y - center) / center
-            distance = min(1.0, math.sqrt(dx * dx + dy * dy))
-            glow = 1.0 - distance
-            px[x, y] = (
-                int(26 + glow * 158),
-                int(74 + glow * 174),
-                int(126 + glow * 128),
-            )
-    return img.filter(ImageFilter.GaussianBlur(radius=1.8))
+    alpha_table = [min(255, int(level * alpha_scale)) for level in range(256)]
+
+    def shade(tile: Image.Image) -> Image.Image:
+        plate = gaussian_blur(tile, blur_radius, blur)
+        rgb = tint(plate.convert("RGB"), tint_black, tint_white).convert("RGBA")
+        rgb.putalpha(ImageOps.grayscale(plate).point(alpha_table))
+        return rgb
+
+    halo, align = blur_footprint(blur_radius, blur)
+    resized = resize_image(source.convert("RGBA"), size)
+    return TILES(shade, resized, halo=halo, align=align)
 
 
 def make_lut_strip(width: int, height: int) -> Image.Image:
-    img = Image.new("RGB", (width, height))
-    px = img.load()
-    for y in range(height):
-        v = y / max(1, height - 1)
-        for x in range(width):
-            u = x / max(1, width - 1)
-            px[x, y] = (
-                int(min(255, (u ** 0.9) * 255)),
-                int(min(255, ((u * 0.8 + v * 0.2) ** 1.0) * 255)),
-                int(min(255, ((u * 0.58 + (1 - v) * 0.42) ** 1.1) * 255)),
-            )
-    return img
+    return array_to_image(lut_strip_field(width, height), "RGBX").convert("RGB")
 
 
-def write_sources_md(source_file: Path, lines: list[str]) -> None:
-    source_file.parent.mkdir(parents=True, exist_ok=True)
-    source_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+def make_vignette(size: int, power: float = 2.1, darkness: float = 0.84) -> Image.Image:
+    field = radial_gradient_field(
+        size, size, inner=(0, 0, 0, 0), outer=(0, 0, 0, 255), power=power, darkness=darkness
+    )
+    return array_to_image(field)
 
 
-def copy_to_generated(rel_path: str) -> None:
-    src = RUNTIME_ROOT / rel_path
-    dst = GENERATED_ROOT / rel_path
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dst)
+# Node builders: each reads its inputs from disk so the build graph can
+# rebuild any output on its own. Random generators draw from a stream named
+# by the node, so their output does not depend on which other nodes are
+# dirty, or on which process builds them.
+def build_resized_rgb(source: Path, size: tuple[int, int]) -> Image.Image:
+    return resize_image(load_rgb(source), size)
 
 
-def main() -> None:
-    random.seed(20260226)
-    ensure_dirs([DOWNLOAD_ROOT, GENERATED_ROOT, RUNTIME_ROOT])
+def build_resized_rgba(source: Path, size: tuple[int, int]) -> Image.Image:
+    return resize_image(load_rgba(source), size)
 
-    downloads = {
-        # ambientCG CC0 material packs
-        "Concrete013_2K-JPG.zip": "https://ambientcg.com/get?file=Concrete013_2K-JPG.zip",
-        "Concrete013_1K-JPG.zip": "https://ambientcg.com/get?file=Concrete013_1K-JPG.zip",
-        "Concrete047A_2K-JPG.zip": "https://ambientcg.com/get?file=Concrete047A_2K-JPG.zip",
-        "Concrete047A_1K-JPG.zip": "https://ambientcg.com/get?file=Concrete047A_1K-JPG.zip",
-        # Three.js example textures (open examples repository)
-        "disc.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/disc.png",
-        "spark1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/spark1.png",
-        "snowflake1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/snowflake1.png",
-        "ball.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/ball.png",
-        "blossom.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/blossom.png",
-        "lensflare0.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/lensflare/lensflare0.png",
-        "smoke1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/opengameart/smoke1.png",
-        "caustic_free.jpg": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/opengameart/Caustic_Free.jpg",
-        "noise.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/noise.png",
-        "venice_sunset_1k.hdr": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/equirectangular/venice_sunset_1k.hdr",
-        "san_giuseppe_bridge_2k.hdr": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/equirectangular/san_giuseppe_bridge_2k.hdr",
+
+def build_sprite_mix(base: Path, overlay: Path, mix_size: int, size: int) -> Image.Image:
+    mix = Image.alpha_composite(
+        resize_image(load_rgba(base), (mix_size, mix_size)),
+        resize_image(load_rgba(overlay), (mix_size, mix_size)),
+    )
+    return resize_image(mix, (size, size))
+
+
+def build_grime(pack: Path, caustic: Path, channel: str, size: int) -> Image.Image:
+    return TILES(
+        lambda base, overlay: gaussian_blur(ImageChops.multiply(base, overlay), 0.8),
+        resize_image(load_pack_channel(pack, channel), (size, size)),
+        resize_image(load_rgb(caustic), (size, size)),
+        halo=blur_footprint(0.8)[0],
+    )
+
+
+def build_confetti_atlas(
+    *stamps: Path, width: int, height: int, seed: int, stream: str
+) -> Image.Image:
+    rng = rng_stream(seed, stream)
+    return make_confetti_atlas_from_stamps(width, height, [load_rgba(path) for path in stamps], rng)
+
+
+def build_waveform_mask(noise: Path, width: int, height: int, frames: int = 1) -> Image.Image:
+    return make_waveform_mask(width, height, load_rgba(noise), frames).convert("RGB")
+
+
+def build_procedural(*inputs: Path, names: tuple[str, ...], seed: int, **spec: Any) -> Image.Image:
+    return render(spec, {name: load_rgba(path) for name, path in zip(names, inputs)}, seed)
+
+
+def build_haze_plate(source: Path, **params: object) -> Image.Image:
+    return make_haze_plate_from_source(load_rgba(source), **params).convert("RGB")
+
+
+def build_lens_dirt(caustic: Path, glow: Path, size: int, blur: str = "exact") -> Image.Image:
+    def shade(base: Image.Image, overlay: Image.Image) -> Image.Image:
+        return gaussian_blur(ImageChops.multiply(base, overlay), 5, blur).convert("RGB")
+
+    halo, align = blur_footprint(5, blur)
+    return TILES(
+        shade,
+        resize_image(load_rgba(caustic), (size, size)),
+        resize_image(load_rgba(glow), (size, size)),
+        halo=halo,
+        align=align,
+    )
+
+
+def build_rung(
+    build: Callable[..., Image.Image], *inputs: Path, cascade: tuple[int, ...] = (), **params: Any
+) -> Image.Image:
+    """`build`'s image, cut down to each long side in `cascade` in turn.
+
+    The full-size image is memoized, so a texture's base output, its smaller
+    rungs and their KTX2 siblings share one build and one decode, and each
+    rung is resampled from the rung above it rather than from the source.
+    """
+    image = IMAGES.memo(rung_key(build, inputs, params), lambda: build(*inputs, **params))
+    for side in cascade:
+        size = cut_size(image.size, side)
+        if size != image.size:
+            image = resize_image(image, size)
+    return image
+
+
+def rung_key(
+    build: Callable[..., Any], inputs: Iterable[Path], params: dict[str, Any]
+) -> tuple[str, ...]:
+    """The image cache key of one texture's full-size build, shared by all its rungs."""
+    name = f"{build.__module__}.{build.__qualname__}"
+    return (name, *map(str, inputs), json.dumps(params, sort_keys=True, default=str))
+
+
+def env_levels(source: Path) -> dict[int, np.ndarray]:
+    if source not in ENV_LEVELS:
+        ENV_LEVELS.clear()
+        with TRACER.span("decode", source.name, source.stat().st_size) as span:
+            hdr = read_hdr(source)
+            span.bytes_out = hdr.nbytes
+        widths = {min(width, hdr.shape[1]) for width in ENV_TIER_WIDTHS.values()}
+        ENV_LEVELS[source] = levels(hdr, sorted(widths | {hdr.shape[1]}))
+    return ENV_LEVELS[source]
+
+
+def build_env_level(source: Path, width: int) -> Image.Image:
+    """The tier's RGBE level as RGBA bytes, no wider than the source map."""
+    env = env_levels(source)
+    return rgbe_image(env[min(width, max(env))])
+
+
+def build_env_specular(source: Path, width: int, roughness: list[float]) -> Image.Image:
+    """Prefiltered bands stacked top to bottom, roughest last, as RGBE bytes."""
+    env = env_levels(source)
+    low = env[min(min(ENV_TIER_WIDTHS.values()), max(env))]
+    return rgbe_image(np.concatenate([prefilter_specular(low, width, r) for r in roughness]))
+
+
+def build_env_sidecar(
+    source: Path, stem: str, tiers: dict[str, int], specular: dict[str, object]
+) -> dict[str, object]:
+    env = env_levels(source)
+    full = env[max(env)]
+    sidecar_tiers = {}
+    for tier, width in tiers.items():
+        level = env[min(width, max(env))]
+        sidecar_tiers[tier] = {
+            "path": f"/src/assets/hdr/{stem}_rgbe_{tier}.png",
+            "width": level.shape[1],
+            "height": level.shape[0],
+        }
+    return {
+        "source": {"width": full.shape[1], "height": full.shape[0]},
+        # PNG RGBA bytes are Radiance RGBE: rgb * 2^(a - 136), or black where a == 0.
+        "encoding": "rgbe",
+        "tiers": sidecar_tiers,
+        # L2 radiance SH in three.js order; `LightProbe` turns it into irradiance.
+        "sh": [[round(float(value), 6) for value in band] for band in project_sh(full)],
+        # One band per roughness, each half as tall as it is wide, stacked top to bottom.
+        "specular": {
+            "path": f"/src/assets/hdr/{stem}_specular.png",
+            "width": specular["width"],
+            "height": specular["width"] // 2 * len(specular["roughness"]),
+            "bandHeight": specular["width"] // 2,
+            "roughness": specular["roughness"],
+        },
     }
 
-    for filename, url in downloads.items():
-        download(url, DOWNLOAD_ROOT / filename)
 
-    wall_2k_zip = DOWNLOAD_ROOT / "Concrete013_2K-JPG.zip"
-    wall_1k_zip = DOWNLOAD_ROOT / "Concrete013_1K-JPG.zip"
-    floor_2k_zip = DOWNLOAD_ROOT / "Concrete047A_2K-JPG.zip"
-    floor_1k_zip = DOWNLOAD_ROOT / "Concrete047A_1K-JPG.zip"
+def sprite_layout(sprites: tuple[Path, ...], names: list[str], gutter: int) -> AtlasLayout:
+    sizes = {}
+    for name, path in zip(names, sprites):
+        with Image.open(path) as image:
+            sizes[name] = image.size
+    return pack(sizes, gutter=gutter)
+
+
+def build_sprite_atlas(*sprites: Path, names: list[str], gutter: int) -> Image.Image:
+    layout = sprite_layout(sprites, names, gutter)
+    return compose(layout, {name: load_rgba(path) for name, path in zip(names, sprites)})
+
+
+def build_sprite_rects(*sprites: Path, names: list[str], gutter: int) -> dict[str, object]:
+    layout = sprite_layout(sprites, names, gutter)
+    return {
+        "width": layout.width,
+        "height": layout.height,
+        "gutter": layout.gutter,
+        "sprites": uv_rects(layout),
+    }
+
+
+def save_json(data: object, out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def source_path(path: Path) -> Path:
+    return path
+
+
+def copy_file(source: Path, out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, out_path)
+
+
+def ktx2_saver(stem: str) -> Callable[[Image.Image, Path], None]:
+    name = re.sub(r"_\d+k?$", "", stem)
+    if name.endswith("_normal"):
+        return save_ktx2_normal
+    return save_ktx2_srgb if name in SRGB_TEXTURES else save_ktx2_linear
+
+
+def declared_side(params: dict[str, Any]) -> int | None:
+    """Long side of a node's output as far as its parameters say."""
+    size = params.get("size")
+    if size is not None:
+        return max(size) if isinstance(size, (tuple, list)) else size
+    if "width" in params:
+        return max(params["width"], params.get("height", 0))
+    return None
+
+
+def declared_size(params: dict[str, Any]) -> tuple[int, int] | None:
+    """Width and height of a node's full-size output as far as its parameters say."""
+    size = params.get("size")
+    if isinstance(size, (tuple, list)):
+        return (size[0], size[1])
+    if "width" in params and "height" in params:
+        return (params["width"], params["height"])
+    return None
+
+
+def cut_size(size: tuple[int, int], side: int) -> tuple[int, int]:
+    """`size` scaled down, aspect kept, so its long side is at most `side`."""
+    scale = side / max(size)
+    if scale >= 1:
+        return size
+    return (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+
+
+def block_aligned(size: tuple[int, int], cascade: tuple[int, ...] = ()) -> bool:
+    """Whether the rung cut from a `size` image by `cascade` tiles into 4x4 blocks."""
+    for side in cascade:
+        size = cut_size(size, side)
+    return size[0] % 4 == 0 and size[1] % 4 == 0
+
+
+def declare_ladder(
+    graph: BuildGraph, node: Node, sides: dict[str, int], side: int | None
+) -> dict[str, Path]:
+    """Add a rung per texture set smaller than the node's output; returns set -> rung path."""
+    build = node.build if isinstance(node.build, partial) else partial(build_rung, node.build)
+    node.build = build
+    rungs: dict[str, Path] = {}
+    cascade: tuple[int, ...] = ()
+    for name, rung_side in sorted(sides.items(), key=lambda item: -item[1]):
+        if side is not None and rung_side >= side:
+            continue
+        cascade += (rung_side,)
+        rung = node.output.with_name(f"{node.output.stem}_{name}{node.output.suffix}")
+        graph.add(rung, build, node.save, node.inputs, **node.params, cascade=cascade)
+        rungs[name] = rung
+    return rungs
+
+
+def source_key(node: Node) -> tuple[Any, ...]:
+    """What a node decodes, whichever rung of its texture's ladder it is."""
+    build = node.build.args[0] if isinstance(node.build, partial) else node.build
+    params = {name: value for name, value in node.params.items() if name != "cascade"}
+    return (build, node.inputs, json.dumps(params, sort_keys=True, default=str))
+
+
+def want_channels(nodes: Iterable[Node]) -> None:
+    # Rungs of one texture share its build, so each pack channel is taken once.
+    for node in {source_key(node): node for node in nodes}.values():
+        if "channel" in node.params:
+            ARCHIVES.want(node.inputs[0], node.params["channel"])
+
+
+def task_group(node: Node) -> Any:
+    """Nodes that `--build-jobs` builds together: one pack, or one texture's ladder."""
+    if "channel" in node.params:
+        return node.inputs[0]
+    return source_key(node)
+
+
+def cached_by(node: Node) -> list[Hashable]:
+    """Image cache entries `node` reads: its input files and, for a rung, its texture's build."""
+    keys: list[Hashable] = list(node.inputs)
+    if isinstance(node.build, partial) and node.build.func is build_rung:
+        params = {name: value for name, value in node.params.items() if name != "cascade"}
+        keys.append(rung_key(node.build.args[0], node.inputs, params))
+    return keys
+
+
+def release_cached(key: Hashable) -> int:
+    return IMAGES.release(key) if isinstance(key, Path) else IMAGES.forget(key)
+
+
+def shed_caches() -> None:
+    IMAGES.clear()
+    ENV_LEVELS.clear()
+
+
+def prepare_task(nodes: list[Node]) -> None:
+    # Runs in a build worker: decodes are kept for one task, not the worker's lifetime.
+    # The workers already take a CPU each, so their tiles run on one thread.
+    TILES.workers = 1
+    ARCHIVES.close()
+    IMAGES.clear()
+    want_channels(nodes)
+
+
+def declare_nodes(graph: BuildGraph) -> dict[Path, dict[str, Path]]:
+    """Declare every derived file; returns each texture's ladder (base -> set -> rung)."""
+    wall_zip = DOWNLOAD_ROOT / "Concrete013_2K-JPG.zip"
+    floor_zip = DOWNLOAD_ROOT / "Concrete047A_2K-JPG.zip"
+    disc = DOWNLOAD_ROOT / "disc.png"
+    spark = DOWNLOAD_ROOT / "spark1.png"
+    snow = DOWNLOAD_ROOT / "snowflake1.png"
+    ball = DOWNLOAD_ROOT / "ball.png"
+    blossom = DOWNLOAD_ROOT / "blossom.png"
+    smoke = DOWNLOAD_ROOT / "smoke1.png"
+    lensflare = DOWNLOAD_ROOT / "lensflare0.png"
+    caustic = DOWNLOAD_ROOT / "caustic_free.jpg"
+    noise = DOWNLOAD_ROOT / "noise.png"
 
     tunnel_dir = RUNTIME_ROOT / "textures" / "tunnel"
-    save_webp(load_zip_image(wall_2k_zip, "_Color.jpg"), tunnel_dir / "wall_albedo.webp")
-    save_webp(load_zip_image(wall_2k_zip, "_NormalGL.jpg"), tunnel_dir / "wall_normal.webp")
-    save_webp(load_zip_image(wall_2k_zip, "_Roughness.jpg"), tunnel_dir / "wall_roughness.webp")
-    save_webp(
-        load_zip_image(wall_2k_zip, "_AmbientOcclusion.jpg"),
-        tunnel_dir / "wall_ao.webp",
-    )
-    save_webp(load_zip_image(floor_2k_zip, "_Color.jpg"), tunnel_dir / "floor_albedo.webp")
-    save_webp(load_zip_image(floor_2k_zip, "_NormalGL.jpg"), tunnel_dir / "floor_normal.webp")
-    save_webp(load_zip_image(floor_2k_zip, "_Roughness.jpg"), tunnel_dir / "floor_roughness.webp")
-    save_webp(
-        load_zip_image(floor_2k_zip, "_AmbientOcclusion.jpg"),
-        tunnel_dir / "floor_ao.webp",
-    )
-
-    save_webp(load_zip_image(wall_1k_zip, "_Color.jpg"), tunnel_dir / "wall_albedo_1k.webp")
-    save_webp(load_zip_image(wall_1k_zip, "_NormalGL.jpg"), tunnel_dir / "wall_normal_1k.webp")
-    save_webp(load_zip_image(wall_1k_zip, "_Roughness.jpg"), tunnel_dir / "wall_roughness_1k.webp")
-    save_webp(load_zip_image(floor_1k_zip, "_Color.jpg"), tunnel_dir / "floor_albedo_1k.webp")
-    save_webp(load_zip_image(floor_1k_zip, "_NormalGL.jpg"), tunnel_dir / "floor_normal_1k.webp")
-    save_webp(load_zip_image(floor_1k_zip, "_Roughness.jpg"), tunnel_dir / "floor_roughness_1k.webp")
-
-    lights_dir = RUNTIME_ROOT / "textures" / "lights"
-    save_webp(make_ceiling_emissive_strip(1024, 256), lights_dir / "ceiling_emissive_strip.webp")
-    save_webp(make_portal_gradient(1024), lights_dir / "portal_gradient.webp")
-
-    wall_ao = load_rgb(tunnel_dir / "wall_ao.webp")
-    caustic_tex = load_rgb(DOWNLOAD_ROOT / "caustic_free.jpg")
-    grime = ImageChops.multiply(
-        resize_image(wall_ao, (1024, 1024)),
-        resize_image(caustic_tex, (1024, 1024)),
-    ).filter(ImageFilter.GaussianBlur(radius=0.8))
-    save_webp(grime, RUNTIME_ROOT / "textures" / "decals" / "grime_atlas.webp")
-
-    disc = load_rgba(DOWNLOAD_ROOT / "disc.png")
-    spark = load_rgba(DOWNLOAD_ROOT / "spark1.png")
-    snow = load_rgba(DOWNLOAD_ROOT / "snowflake1.png")
-    ball = load_rgba(DOWNLOAD_ROOT / "ball.png")
-    blossom = load_rgba(DOWNLOAD_ROOT / "blossom.png")
-    smoke = load_rgba(DOWNLOAD_ROOT / "smoke1.png")
-    lensflare = load_rgba(DOWNLOAD_ROOT / "lensflare0.png")
+    channels = {
+        "albedo": "Color",
+        "normal": "NormalGL",
+        "roughness": "Roughness",
+        "ao": "AmbientOcclusion",
+    }
+    for surface, pack in (("wall", wall_zip), ("floor", floor_zip)):
+        for name, channel in channels.items():
+            out = tunnel_dir / f"{surface}_{name}.webp"
+            graph.add(out, load_pack_channel, save_webp, [pack], channel=channel)
+
+    # Lights, masks and overlays drawn from layer specs; adding a variant is an entry in the file.
+    for spec in load_specs(PROCEDURAL_SPECS).values():
+        root = GENERATED_ROOT if spec["output"] in CURATED_TEXTURES else RUNTIME_ROOT
+        output = root / spec["output"]
+        inputs = spec.get("inputs", {})
+        graph.add(
+            output,
+            build_procedural,
+            save_png if output.suffix == ".png" else save_webp,
+            [DOWNLOAD_ROOT / filename for filename in inputs.values()],
+            names=tuple(inputs),
+            seed=SEED,
+            **{key: value for key, value in spec.items() if key not in ("output", "inputs")},
+        )
+
+    graph.add(
+        RUNTIME_ROOT / "textures" / "decals" / "grime_atlas.webp",
+        build_grime,
+        save_webp,
+        [wall_zip, caustic],
+        channel="AmbientOcclusion",
+        size=1024,
+    )
 
     sprites_dir = RUNTIME_ROOT / "sprites"
-    smoke_mix = Image.alpha_composite(
-        resize_image(smoke, (512, 512)),
-        resize_image(disc, (512, 512)),
-    )
-    sharp_mix = Image.alpha_composite(
-        resize_image(snow, (512, 512)),
-        resize_image(spark, (512, 512)),
-    )
-    save_png(resize_image(smoke_mix, (256, 256)), sprites_dir / "dust_soft.png")
-    save_png(resize_image(sharp_mix, (256, 256)), sprites_dir / "dust_sharp.png")
-    save_png(resize_image(lensflare, (512, 512)), sprites_dir / "glow_soft.png")
-    save_png(make_light_streak(1024, 128, lensflare), sprites_dir / "light_streak.png")
-    save_png(
-        make_confetti_atlas_from_stamps(1024, 1024, [ball, blossom, spark, disc]),
+    graph.add(
+        sprites_dir / "dust_soft.png",
+        build_sprite_mix,
+        save_png,
+        [smoke, disc],
+        mix_size=512,
+        size=256,
+    )
+    graph.add(
+        sprites_dir / "dust_sharp.png",
+        build_sprite_mix,
+        save_png,
+        [snow, spark],
+        mix_size=512,
+        size=256,
+    )
+    graph.add(
+        sprites_dir / "glow_soft.png",
+        build_resized_rgba,
+        save_png,
+        [lensflare],
+        size=(512, 512),
+    )
+    graph.add(
         sprites_dir / "confetti_atlas.png",
+        build_confetti_atlas,
+        save_png,
+        [ball, blossom, spark, disc],
+        width=1024,
+        height=1024,
+        seed=SEED,
+        stream="confetti_atlas",
     )
+    # One atlas page for every particle/streak sprite: one request, one decode
+    # and one texture bind; the rects JSON tells the runtime where each one is.
+    # The gutter only covers bilinear taps and 4x4 blocks; the runtime samples
+    # the page without mipmaps, which 4 px gutters could not keep apart.
+    atlas_sprites = ["dust_soft", "dust_sharp", "glow_soft", "light_streak", "confetti_atlas"]
+    atlas_inputs = [sprites_dir / f"{name}.png" for name in atlas_sprites]
+    for output, build, save in (
+        (sprites_dir / "sprite_atlas.png", build_sprite_atlas, save_png),
+        (sprites_dir / "sprite_atlas.json", build_sprite_rects, save_json),
+    ):
+        graph.add(output, build, save, atlas_inputs, names=atlas_sprites, gutter=4)
 
-    noise_tex = load_rgba(DOWNLOAD_ROOT / "noise.png")
     transition_dir = RUNTIME_ROOT / "textures" / "transition"
-    save_webp(
-        make_waveform_mask(1024, 64, noise_tex).convert("RGB"),
+    graph.add(
         transition_dir / "waveform_mask.webp",
+        build_waveform_mask,
+        save_webp,
+        [noise],
+        width=1024,
+        height=64,
     )
-    save_webp(make_radial_burst(1024).convert("RGB"), transition_dir / "radial_burst_mask.webp")
-
-    save_webp(
-        resize_image(noise_tex.convert("RGB"), (512, 512)),
+    graph.add(
+        transition_dir / "waveform_flipbook.webp",
+        build_waveform_mask,
+        save_webp,
+        [noise],
+        width=1024,
+        height=64,
+        frames=WAVEFORM_FRAMES,
+    )
+    graph.add(
         RUNTIME_ROOT / "textures" / "noise" / "noise_tile.webp",
+        build_resized_rgb,
+        save_webp,
+        [noise],
+        size=(512, 512),
     )
 
     atmosphere_dir = RUNTIME_ROOT / "textures" / "atmosphere"
-    haze_a = make_haze_plate_from_source(
-        smoke,
-        (2048, 1024),
+    graph.add(
+        atmosphere_dir / "haze_a.webp",
+        build_haze_plate,
+        save_webp,
+        [smoke],
+        size=(2048, 1024),
         tint_black="#10243b",
         tint_white="#b9dcff",
         blur_radius=9.0,
         alpha_scale=0.72,
+        blur="pyramid",
     )
-    haze_b = make_haze_plate_from_source(
-        caustic_tex.convert("RGBA"),
-        (2048, 1024),
+    graph.add(
+        atmosphere_dir / "haze_b.webp",
+        build_haze_plate,
+        save_webp,
+        [caustic],
+        size=(2048, 1024),
         tint_black="#0f1e33",
         tint_white="#8cbde8",
         blur_radius=11.0,
         alpha_scale=0.6,
+        blur="pyramid",
     )
-    save_webp(haze_a.convert("RGB"), atmosphere_dir / "haze_a.webp")
-    save_webp(haze_b.convert("RGB"), atmosphere_dir / "haze_b.webp")
 
     overlays_dir = RUNTIME_ROOT / "overlays"
-    grain = resize_image(noise_tex.convert("RGB"), (1024, 1024))
-    save_webp(grain, overlays_dir / "film_grain.webp")
-    vignette = Image.new("RGBA", (2048, 2048), (0, 0, 0, 0))
-    vdraw = ImageDraw.Draw(vignette)
-    center = 1024
-    for i in range(14):
-        radius = int((i + 1) / 14 * center)
-        alpha = int((i / 13) ** 2.1 * 215)
-        vdraw.ellipse(
-            (center - radius, center - radius, center + radius, center + radius),
-            outline=(0, 0, 0, alpha),
-            width=8,
+    graph.add(
+        overlays_dir / "film_grain.webp",
+        build_resized_rgb,
+        save_webp,
+        [noise],
+        size=(1024, 1024),
+    )
+    graph.add(overlays_dir / "vignette.webp", make_vignette, save_webp, size=2048)
+    graph.add(
+        overlays_dir / "lens_dirt.webp",
+        build_lens_dirt,
+        save_webp,
+        [caustic, lensflare],
+        size=1024,
+        blur="pyramid",
+    )
+    graph.add(
+        RUNTIME_ROOT / "luts" / "cool_cinematic.png",
+        make_lut_strip,
+        save_png,
+        width=1024,
+        height=32,
+    )
+
+    hdr_dir = RUNTIME_ROOT / "hdr"
+    environments = {
+        "env_tunnel": DOWNLOAD_ROOT / "san_giuseppe_bridge_2k.hdr",
+        "env_stadium_night": DOWNLOAD_ROOT / "venice_sunset_1k.hdr",
+    }
+    for stem, source in environments.items():
+        graph.add(hdr_dir / f"{stem}_2k.hdr", source_path, copy_file, [source])
+        # Per-tier area-averaged levels stored as RGBE-in-PNG, plus a sidecar
+        # telling the runtime which file and size each tier loads.
+        for tier, width in ENV_TIER_WIDTHS.items():
+            graph.add(
+                hdr_dir / f"{stem}_rgbe_{tier}.png", build_env_level, save_png, [source], width=width
+            )
+        graph.add(
+            hdr_dir / f"{stem}_specular.png", build_env_specular, save_png, [source], **ENV_SPECULAR
+        )
+        # Irradiance SH and the specular strip let a low tier light the scene
+        # without downloading the map or running PMREM.
+        graph.add(
+            hdr_dir / f"{stem}.json",
+            build_env_sidecar,
+            save_json,
+            [source],
+            stem=stem,
+            tiers=ENV_TIER_WIDTHS,
+            specular=ENV_SPECULAR,
         )
-    vignette = vignette.filter(ImageFilter.GaussianBlur(radius=34))
-    save_webp(vignette.convert("RGB"), overlays_dir / "vignette.webp")
 
-    lens_dirt = ImageChops.multiply(
-        resize_image(caustic_tex.convert("RGBA"), (1024, 1024)),
-        resize_image(lensflare, (1024, 1024)),
-    ).filter(ImageFilter.GaussianBlur(radius=5))
-    save_webp(lens_dirt.convert("RGB"), overlays_dir / "lens_dirt.webp")
+    model_source = ROOT / "Assets" / "Meshy_AI_Tunnel_to_the_Field_0226040001_texture.glb"
+    if model_source.exists():
+        graph.add(RUNTIME_ROOT / "models" / "tunnel.glb", source_path, copy_file, [model_source])
+
+    # Every runtime texture gets a smaller rung per texture set below its own
+    # size (2k -> 1k -> 512 for a 2K texture), each resampled from the rung
+    # above, so low tiers never download bytes they would only minify away.
+    # src/assets/overlays is left out: the runtime loads none of its files, so
+    # rungs and tier bytes for them would describe downloads that never happen.
+    textures_root = RUNTIME_ROOT / "textures"
+    sides = texture_set_sides(CONFIG_ROOT / "visualProfiles.ts")
+    ladders = {
+        node.output: declare_ladder(graph, node, sides, declared_side(node.params))
+        for node in list(graph.nodes)
+        if node.save in (save_webp, save_png) and textures_root in node.output.parents
+    }
 
-    scanline = Image.new("RGB", (1024, 1024), (0, 0, 0))
-    sdraw = ImageDraw.Draw(scanline)
-    for y in range(0, 1024, 3):
-        value = 18 if y % 6 == 0 else 10
-        sdraw.line((0, y, 1024, y), fill=(value, value, value))
-    save_webp(scanline, overlays_dir / "scanline.webp")
+    # The hero plates and the curated textures are committed sources rather
+    # than generated, so only their rungs are derived.
+    hero_plates = (
+        "stadium_crowd_plate.webp",
+        "stadium_portal_plate_clean.png",
+        "stadium_tunnel_portal.png",
+    )
+    committed = [textures_root / "hero" / plate for plate in hero_plates]
+    committed += [RUNTIME_ROOT / path for path in sorted(CURATED_TEXTURES)]
+    committed_nodes = []
+    # Sizes of the committed sources, which are only read by their own ladders.
+    source_sizes = {}
+    for path in committed:
+        if not path.exists():
+            continue
+        with Image.open(path) as image:
+            source_sizes[path] = image.size
+        save = save_webp if path.suffix == ".webp" else save_png
+        node = Node(path, load_rgb, save, (path,))
+        ladders[path] = declare_ladder(graph, node, sides, max(source_sizes[path]))
+        committed_nodes.append(node)
+
+    # Every runtime WebP texture, generated or committed, and each of its rungs
+    # also ships as a block-compressed KTX2 with its mip chain, built from the
+    # same image; the WebP stays as the fallback. S3TC needs both sides to be
+    # multiples of 4, so a rung cut to other sizes (1024x683 and 512x342 from
+    # the 1536x1024 plates) keeps only its WebP.
+    for node in [*graph.nodes, *committed_nodes]:
+        if node.save is not save_webp or textures_root not in node.output.parents:
+            continue
+        size = declared_size(node.params)
+        if size is None and node.inputs:
+            size = source_sizes.get(node.inputs[0])
+        if size is not None and not block_aligned(size, node.params.get("cascade", ())):
+            continue
+        graph.add(
+            node.output.with_suffix(".ktx2"),
+            node.build,
+            ktx2_saver(node.output.stem),
+            node.inputs,
+            **node.params,
+        )
+    return ladders
 
-    save_png(make_lut_strip(1024, 32), RUNTIME_ROOT / "luts" / "cool_cinematic.png")
 
-    hdr_dir = RUNTIME_ROOT / "hdr"
-    shutil.copy2(DOWNLOAD_ROOT / "san_giuseppe_bridge_2k.hdr", hdr_dir / "env_tunnel_2k.hdr")
-    shutil.copy2(DOWNLOAD_ROOT / "venice_sunset_1k.hdr", hdr_dir / "env_stadium_night_2k.hdr")
+def write_sources_md(source_file: Path, lines: list[str]) -> None:
+    source_file.parent.mkdir(parents=True, exist_ok=True)
+    source_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
-    model_source = ROOT / "Assets" / "Meshy_AI_Tunnel_to_the_Field_0226040001_texture.glb"
-    if model_source.exists():
-        model_target = RUNTIME_ROOT / "models" / "tunnel.glb"
-        model_target.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(model_source, model_target)
-
-    tracked_runtime_files = [
-        "textures/tunnel/wall_albedo.webp",
-        "textures/tunnel/wall_normal.webp",
-        "textures/tunnel/wall_roughness.webp",
-        "textures/tunnel/wall_ao.webp",
-        "textures/tunnel/floor_albedo.webp",
-        "textures/tunnel/floor_normal.webp",
-        "textures/tunnel/floor_roughness.webp",
-        "textures/tunnel/floor_ao.webp",
-        "textures/tunnel/wall_albedo_1k.webp",
-        "textures/tunnel/wall_normal_1k.webp",
-        "textures/tunnel/wall_roughness_1k.webp",
-        "textures/tunnel/floor_albedo_1k.webp",
-        "textures/tunnel/floor_normal_1k.webp",
-        "textures/tunnel/floor_roughness_1k.webp",
-        "textures/lights/ceiling_emissive_strip.webp",
-        "textures/lights/portal_gradient.webp",
-        "textures/decals/grime_atlas.webp",
-        "textures/transition/waveform_mask.webp",
-        "textures/transition/radial_burst_mask.webp",
-        "textures/noise/noise_tile.webp",
-        "textures/atmosphere/haze_a.webp",
-        "textures/atmosphere/haze_b.webp",
-        "sprites/dust_soft.png",
-        "sprites/dust_sharp.png",
-        "sprites/glow_soft.png",
-        "sprites/light_streak.png",
-        "sprites/confetti_atlas.png",
-        "overlays/film_grain.webp",
-        "overlays/vignette.webp",
-        "overlays/lens_dirt.webp",
-        "overlays/scanline.webp",
-        "luts/cool_cinematic.png",
-        "hdr/env_tunnel_2k.hdr",
-        "hdr/env_stadium_night_2k.hdr",
-    ]
-
-    for rel_path in tracked_runtime_files:
-        copy_to_generated(rel_path)
-
-    if (RUNTIME_ROOT / "models" / "tunnel.glb").exists():
-        copy_to_generated("models/tunnel.glb")
+
+def output_root(path: Path) -> Path:
+    # Procedural versions of curated textures are written straight to the generated tree.
+    return RUNTIME_ROOT if RUNTIME_ROOT in path.parents else GENERATED_ROOT
+
+
+def copy_to_generated(rel_path: str) -> None:
+    src = RUNTIME_ROOT / rel_path
+    dst = GENERATED_ROOT / rel_path
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with TRACER.span("copy", rel_path) as span:
+        shutil.copy2(src, dst)
+        span.bytes_in = span.bytes_out = dst.stat().st_size
+
+
+def report_build(results: list[BuildResult], elapsed: float, explain: bool) -> None:
+    rebuilt = [result for result in results if result.rebuilt]
+    for result in results:
+        output = result.node.output
+        rel_path = output.relative_to(output_root(output)).as_posix()
+        if result.rebuilt:
+            print(f"{'rebuilt':>12}  {result.seconds:6.2f} s  {rel_path}")
+            if explain:
+                for reason in result.reasons:
+                    print(f"{'':>24}{reason}")
+        elif explain:
+            print(f"{'up to date':>12}  {'':>8}  {rel_path}")
+    print(f"Build graph: {len(rebuilt)} of {len(results)} outputs rebuilt in {elapsed:.2f} s")
+
+
+def report_encodes(reports: list[EncodeReport], elapsed: float) -> None:
+    for report in reports:
+        print(f"{'encoded':>12}  {report.summary(output_root(report.path))}")
+    if reports:
+        encode_seconds = sum(report.seconds for report in reports)
+        total_kb = sum(report.size for report in reports) / 1e3
+        print(
+            f"Encoded {len(reports)} files ({total_kb:.1f} kB) with {encode_seconds:.2f} s of "
+            f"encoder time in {elapsed:.2f} s wall"
+        )
+    tuned = [report for report in reports if report.baseline is not None]
+    if tuned:
+        before = sum(report.baseline for report in tuned)
+        after = sum(report.size for report in tuned)
+        print(
+            f"Quality search: {len(tuned)} WebPs {before / 1e3:.1f} kB at fixed quality -> "
+            f"{after / 1e3:.1f} kB ({after / before - 1:+.1%})"
+        )
+
+
+def report_sprite_atlas(rects_path: Path) -> None:
+    if not rects_path.exists():
+        return
+    rects = json.loads(rects_path.read_text(encoding="utf-8"))
+    count = len(rects["sprites"])
+    used = sum(frame[2] * frame[3] for frame in (s["frame"] for s in rects["sprites"].values()))
+    print(
+        f"Sprite atlas: {count} sprites on one {rects['width']}x{rects['height']} page "
+        f"({used / (rects['width'] * rects['height']):.0%} filled); {count} requests and "
+        f"texture binds -> 1"
+    )
+
+
+def report_environments(hdr_dir: Path) -> None:
+    for sidecar in sorted(hdr_dir.glob("*.json")):
+        verbatim = hdr_dir / f"{sidecar.stem}_2k.hdr"
+        tiers = json.loads(sidecar.read_text(encoding="utf-8"))["tiers"]
+        sizes = {tier: (ROOT / entry["path"].lstrip("/")).stat().st_size for tier, entry in tiers.items()}
+        summary = ", ".join(f"{tier} {size / 1e3:.0f} kB" for tier, size in sizes.items())
+        if verbatim.exists():
+            summary += f" (was {verbatim.stat().st_size / 1e3:.0f} kB of .hdr for every tier)"
+        print(f"Environment {sidecar.stem}: {summary}")
+
+
+def texture_variants(
+    ladders: dict[Path, dict[str, Path]], sides: dict[str, int]
+) -> dict[Path, dict[str, Path]]:
+    """The file each texture set loads per texture: its own rung or the next larger one."""
+    variants = {}
+    for base, rungs in ladders.items():
+        if not base.exists():
+            continue
+        choice = base
+        variants[base] = {}
+        for name in sorted(sides, key=sides.__getitem__, reverse=True):
+            if name in rungs and rungs[name].exists():
+                choice = rungs[name]
+            variants[base][name] = choice
+    return variants
+
+
+def runtime_url(path: Path) -> str:
+    return "/" + path.relative_to(ROOT).as_posix()
+
+
+def write_texture_tiers(ladders: dict[Path, dict[str, Path]]) -> None:
+    """Write the per-tier manifest the runtime resolves texture paths through."""
+    sides = texture_set_sides(CONFIG_ROOT / "visualProfiles.ts")
+    variants = texture_variants(ladders, sides)
+    tiers = {}
+    for tier, texture_set in texture_sets(CONFIG_ROOT / "visualProfiles.ts").items():
+        loaded = {chosen[texture_set] for chosen in variants.values()}
+        tiers[tier] = {"textureSet": texture_set, "bytes": sum(p.stat().st_size for p in loaded)}
+        print(
+            f"Texture downloads for {tier} ({texture_set}): {tiers[tier]['bytes'] / 1e6:.2f} MB "
+            f"in {len(loaded)} files"
+        )
+    manifest = {
+        "tiers": tiers,
+        "variants": {
+            runtime_url(base): {name: runtime_url(path) for name, path in chosen.items()}
+            for base, chosen in sorted(variants.items())
+        },
+    }
+    text = json.dumps(manifest, indent=2) + "\n"
+    if not TEXTURE_TIERS_PATH.exists() or TEXTURE_TIERS_PATH.read_text(encoding="utf-8") != text:
+        TEXTURE_TIERS_PATH.write_text(text, encoding="utf-8")
+
+
+def uncompressed_bytes(path: Path) -> int:
+    """GPU memory an image file takes as RGBA8 with its full mip chain."""
+    with Image.open(path) as image:
+        width, height = image.size
+    return sum(
+        max(1, width >> level) * max(1, height >> level) * 4
+        for level in range(level_count(width, height))
+    )
+
+
+def report_gpu_memory(results: list[BuildResult], ladders: dict[Path, dict[str, Path]]) -> None:
+    infos = {
+        result.node.output: read_ktx2(result.node.output)
+        for result in results
+        if result.node.output.suffix == ".ktx2" and result.node.output.exists()
+    }
+    if not infos:
+        return
+    budgets = {
+        tier: values["textureBudgetMB"] * (1 << 20)
+        for tier, values in technical_budgets(CONFIG_ROOT / "heroTransitionBeats.ts").items()
+    }
+    tier_sets = texture_sets(CONFIG_ROOT / "visualProfiles.ts")
+    # A rung cut to sizes S3TC cannot take has no KTX2, so the tiers that pick
+    # it load its WebP and hold it uncompressed.
+    variants = texture_variants(
+        {
+            base.with_suffix(".ktx2"): {
+                name: rung.with_suffix(".ktx2") if rung.with_suffix(".ktx2") in infos else rung
+                for name, rung in rungs.items()
+            }
+            for base, rungs in ladders.items()
+            if base.with_suffix(".ktx2") in infos
+        },
+        texture_set_sides(CONFIG_ROOT / "visualProfiles.ts"),
+    )
+    loaded_by = {
+        tier: {chosen[texture_set] for chosen in variants.values()}
+        for tier, texture_set in tier_sets.items()
+    }
+    footprints = {path: (info.rgba8_bytes, info.gpu_bytes) for path, info in infos.items()}
+    for paths in loaded_by.values():
+        for path in paths - footprints.keys():
+            footprints[path] = (uncompressed_bytes(path),) * 2
+
+    for path, info in infos.items():
+        saved = info.rgba8_bytes - info.gpu_bytes
+        # Savings are measured against the tightest budget of the tiers that load the asset.
+        tiers = [tier for tier, paths in loaded_by.items() if path in paths]
+        tightest = min(tiers, key=budgets.__getitem__, default=None)
+        share = f"{saved / budgets[tightest]:6.1%} of {tightest}" if tightest else "unused"
+        print(
+            f"{'gpu':>12}  {info.format_name}  {info.rgba8_bytes / (1 << 20):6.2f} -> "
+            f"{info.gpu_bytes / (1 << 20):5.2f} MiB  saves {saved / (1 << 20):6.2f} MiB "
+            f"({share} textureBudgetMB)  {path.relative_to(RUNTIME_ROOT).as_posix()}"
+        )
+    for tier, paths in loaded_by.items():
+        rgba8 = sum(footprints[path][0] for path in paths)
+        gpu = sum(footprints[path][1] for path in paths)
+        print(
+            f"GPU textures for {tier} ({tier_sets[tier]}): {rgba8 / (1 << 20):.1f} MiB as RGBA8 "
+            f"({rgba8 / budgets[tier]:.0%} of textureBudgetMB) -> {gpu / (1 << 20):.1f} MiB "
+            f"block-compressed ({gpu / budgets[tier]:.0%})"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fetch and generate free/open hero-transition assets.")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Use only the local download cache; fail if a source is not cached.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent downloads (default: {DEFAULT_WORKERS}).",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print why each derived file was rebuilt (or that it was up to date).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every derived file regardless of the fingerprint database.",
+    )
+    parser.add_argument(
+        "--encode-jobs",
+        type=int,
+        default=None,
+        help="Encoder processes (default: one per CPU; 0 encodes inline).",
+    )
+    parser.add_argument(
+        "--build-jobs",
+        type=int,
+        default=0,
+        help=(
+            "Build processes (default: 0 builds in this process and encodes on the encoder "
+            "pool). Each worker builds and encodes whole tasks: one pack or one texture ladder."
+        ),
+    )
+    parser.add_argument(
+        "--trace",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Record a span for every download, decode, generator, encode and copy; write them "
+            "as a Chrome trace (chrome://tracing, Perfetto) to PATH and print a per-stage summary."
+        ),
+    )
+    parser.add_argument(
+        "--image-cache-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES >> 20,
+        help=f"Memory cap for decoded and resized sources (default: {DEFAULT_MAX_BYTES >> 20}).",
+    )
+    parser.add_argument(
+        "--tile-jobs",
+        type=int,
+        default=None,
+        help="Threads for tiled blurs and composites (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--max-rss",
+        type=int,
+        default=None,
+        metavar="MB",
+        help=(
+            "Stream the in-process build: release each decoded source and texture build after "
+            "its last reader, and drop the caches before a build whenever resident memory is "
+            "over MB. Reports the peak at the end."
+        ),
+    )
+    parser.add_argument(
+        "--share-decoded",
+        action="store_true",
+        help="Back the image cache with memory-mapped arrays in a temp dir shared by workers.",
+    )
+    parser.add_argument(
+        "--tune-quality",
+        type=float,
+        nargs="?",
+        const=DEFAULT_TARGET,
+        default=None,
+        metavar="SSIM",
+        help=(
+            "Encode each WebP at the lowest quality (or lossless) whose decode keeps this SSIM "
+            f"against the source (default target: {DEFAULT_TARGET}) instead of a fixed quality."
+        ),
+    )
+    args = parser.parse_args()
+    if args.max_rss is not None and args.build_jobs > 0:
+        parser.error("--max-rss bounds the in-process build; it does not apply to --build-jobs")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.trace is not None:
+        TRACER.enable()
+    TILES.workers = args.tile_jobs
+    ensure_dirs([DOWNLOAD_ROOT, GENERATED_ROOT, RUNTIME_ROOT])
+
+    downloads = {
+        # ambientCG CC0 material packs
+        "Concrete013_2K-JPG.zip": "https://ambientcg.com/get?file=Concrete013_2K-JPG.zip",
+        "Concrete047A_2K-JPG.zip": "https://ambientcg.com/get?file=Concrete047A_2K-JPG.zip",
+        # Three.js example textures (open examples repository)
+        "disc.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/disc.png",
+        "spark1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/spark1.png",
+        "snowflake1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/snowflake1.png",
+        "ball.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/ball.png",
+        "blossom.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/sprites/blossom.png",
+        "lensflare0.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/lensflare/lensflare0.png",
+        "smoke1.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/opengameart/smoke1.png",
+        "caustic_free.jpg": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/opengameart/Caustic_Free.jpg",
+        "noise.png": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/noise.png",
+        "venice_sunset_1k.hdr": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/equirectangular/venice_sunset_1k.hdr",
+        "san_giuseppe_bridge_2k.hdr": "https://raw.githubusercontent.com/mrdoob/three.js/dev/examples/textures/equirectangular/san_giuseppe_bridge_2k.hdr",
+    }
+
+    cache = DownloadCache(DOWNLOAD_CACHE_ROOT, offline=args.offline)
+    download_all(cache, downloads, args.jobs)
+
+    graph = BuildGraph(BUILD_DB_PATH, ROOT)
+    ladders = declare_nodes(graph)
+    if args.tune_quality is not None:
+        tuned_save = partial(save_webp_tuned, target=args.tune_quality)
+        for node in graph.nodes:
+            if node.save is save_webp:
+                node.save = tuned_save
+    start = time.perf_counter()
+    if args.share_decoded:
+        IMAGES.shared_dir = Path(tempfile.mkdtemp(prefix="polish-decoded-"))
+    IMAGES.max_bytes = args.image_cache_mb << 20
+    try:
+        if args.build_jobs > 0:
+            results = graph.run_parallel(
+                args.build_jobs, force=args.force, group=task_group, setup=prepare_task
+            )
+            reports = [result.report for result in results if result.report is not None]
+        else:
+            planned = graph.plan(force=args.force)
+            want_channels(planned)
+            stream = None
+            if args.max_rss is not None:
+                stream = Stream(cached_by, release_cached, shed_caches, args.max_rss << 20)
+                stream.plan(planned)
+            with EncodeStage(args.encode_jobs) as encoder:
+                try:
+                    results = graph.run(force=args.force, encoder=encoder, stream=stream)
+                finally:
+                    ARCHIVES.close()
+                    print(f"Image cache: {IMAGES.stats()}")
+                reports = encoder.wait()
+            if stream is not None:
+                print(f"Memory: {stream.summary()}")
+    finally:
+        IMAGES.clear()
+        if IMAGES.shared_dir is not None:
+            shutil.rmtree(IMAGES.shared_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+    report_build(results, elapsed, args.explain)
+    report_encodes(reports, elapsed)
+    report_gpu_memory(results, ladders)
+    report_sprite_atlas(RUNTIME_ROOT / "sprites" / "sprite_atlas.json")
+    report_environments(RUNTIME_ROOT / "hdr")
+    write_texture_tiers(ladders)
+
+    # The generated tree keeps the procedural versions of curated textures, not their rungs.
+    curated = {
+        rung for path in CURATED_TEXTURES for rung in ladders.get(RUNTIME_ROOT / path, {}).values()
+    }
+    for result in results:
+        output = result.node.output
+        if output_root(output) != RUNTIME_ROOT or output in curated:
+            continue
+        rel_path = output.relative_to(RUNTIME_ROOT).as_posix()
+        if result.rebuilt or not (GENERATED_ROOT / rel_path).exists():
+            copy_to_generated(rel_path)
 
     write_sources_md(
         ASSETS_SOURCE_ROOT / "SOURCES.md",
@@ -473,6 +1168,11 @@ def main() -> None:
         ],
     )
 
+    if args.trace is not None:
+        TRACER.write_chrome_trace(args.trace)
+        for line in TRACER.summary():
+            print(line)
+        print(f"Trace: {len(TRACER.spans)} spans written to {args.trace}")
     print("Curated free/open hero-transition assets downloaded and generated.")
 
 
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from pathlib import Path
+import argparse
+import json
+import os
+import time
+
+from polish_assets.catalog import HashIndex, build_catalog, verify
+
+
+ROOT = Path(__file__).resolve().parents[1]
+# Hashes from the last run, inside the asset library; the catalog skips dot directories.
+HASH_INDEX_NAME = Path(".cache") / "catalog-hashes.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Regenerate the Assets.json asset catalog.")
+    parser.add_argument("--root", type=Path, default=ROOT, help="Repository root.")
+    parser.add_argument("--assets-dir", default="Assets", help="Asset library under the root.")
+    parser.add_argument("--output", default="Assets.json", help="Catalog path under the root.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Hashing threads (default: one per CPU).",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Rehash every cataloged file and report any that no longer match; writes nothing.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    root = args.root.resolve()
+    output = root / args.output
+    assets_path = root / args.assets_dir
+    if not assets_path.is_dir():
+        raise SystemExit(f"Assets directory not found: {assets_path}")
+    previous = json.loads(output.read_text(encoding="utf-8")) if output.exists() else None
+    start = time.perf_counter()
+
+    if args.verify:
+        if previous is None:
+            raise SystemExit(f"No catalog to verify at {output}")
+        problems = verify(root, previous, args.jobs)
+        for problem in problems:
+            print(problem)
+        elapsed = time.perf_counter() - start
+        print(
+            f"Verified {len(previous['assets'])} assets in {elapsed:.2f} s: "
+            f"{len(problems) or 'no'} mismatches."
+        )
+        return 1 if problems else 0
+
+    index = HashIndex(assets_path / HASH_INDEX_NAME)
+    catalog = build_catalog(root, args.assets_dir, index, args.jobs, previous)
+    index.save()
+    tmp_path = output.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(catalog, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, output)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Generated {args.output} with {len(catalog['assets'])} assets "
+        f"({index.hashed} hashed, the rest reused) in {elapsed:.2f} s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
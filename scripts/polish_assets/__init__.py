@@ -0,0 +1,6 @@
+"""Helpers for scripts/fetch-free-polish-assets.py.
+
+The fetch script stays the entry point; modules in this package hold the
+reusable pieces (array generators, caches, encoders) so benchmarks and
+other scripts can import them without executing the pipeline.
+"""
@@ -0,0 +1,117 @@
+"""Single-pass access to the ambientCG material packs.
+
+`MaterialArchive` opens a pack once and maps logical channel names
+(Color, NormalGL, Roughness, AmbientOcclusion) to zip members from one scan
+of the central directory. `decode_many` decodes several channels in a
+single pass over the file, in member offset order. Members stored without
+compression are handed to Pillow as a seekable stream straight out of the
+zip instead of being copied into a `BytesIO` first.
+
+`ArchiveIndex` shares those archives across build-graph nodes: channels
+registered with `want` are decoded together the first time any of them is
+taken, so every pack is read once however many outputs it feeds. A decoded
+channel is kept until it has been taken as many times as it was wanted.
+"""
+
+from __future__ import annotations
+
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Iterable
+import zipfile
+
+from PIL import Image
+
+from .tracing import TRACER, payload_bytes
+
+
+CHANNELS = ("Color", "NormalGL", "Roughness", "AmbientOcclusion")
+
+
+class MaterialArchive:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self.members: dict[str, zipfile.ZipInfo] = {}
+        for info in self._zip.infolist():
+            stem = Path(info.filename).stem
+            for channel in CHANNELS:
+                if stem.lower().endswith("_" + channel.lower()):
+                    self.members.setdefault(channel, info)
+
+    def __enter__(self) -> MaterialArchive:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def member(self, channel: str) -> zipfile.ZipInfo:
+        try:
+            return self.members[channel]
+        except KeyError:
+            raise FileNotFoundError(f"{channel} not found in {self.path}") from None
+
+    def decode(self, channel: str) -> Image.Image:
+        info = self.member(channel)
+        with TRACER.span("decode", f"{self.path.name}:{channel}", info.compress_size) as span:
+            if info.compress_type == zipfile.ZIP_STORED:
+                # Stored members are seekable in place; Pillow reads the zip directly.
+                with self._zip.open(info) as handle:
+                    image = Image.open(handle)
+                    image.load()
+            else:
+                image = Image.open(BytesIO(self._zip.read(info)))
+                image.load()
+            span.bytes_out = payload_bytes(image)
+        return image
+
+    def decode_many(self, channels: Iterable[str]) -> dict[str, Image.Image]:
+        infos = sorted({self.member(channel).header_offset: channel for channel in channels}.items())
+        return {channel: self.decode(channel) for _, channel in infos}
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class ArchiveIndex:
+    def __init__(self) -> None:
+        self._archives: dict[Path, MaterialArchive] = {}
+        self._wanted: dict[Path, dict[str, int]] = {}
+        self._decoded: dict[tuple[Path, str], Image.Image] = {}
+
+    def want(self, path: Path, channel: str) -> None:
+        wanted = self._wanted.setdefault(path, {})
+        wanted[channel] = wanted.get(channel, 0) + 1
+
+    def take(self, path: Path, channel: str, mode: str = "RGB") -> Image.Image:
+        """Return `channel` of the pack at `path`, converted to `mode`.
+
+        The first take for a pack decodes every still-wanted channel of it in
+        one pass; later takes reuse those images instead of decoding again.
+        """
+        wanted = self._wanted.setdefault(path, {})
+        image = self._decoded.get((path, channel))
+        if image is None:
+            decoded = self._archive(path).decode_many(set(wanted) | {channel})
+            image = decoded[channel]
+            self._decoded.update(((path, name), other) for name, other in decoded.items())
+        remaining = wanted.get(channel, 1) - 1
+        if remaining > 0:
+            wanted[channel] = remaining
+        else:
+            wanted.pop(channel, None)
+            del self._decoded[(path, channel)]
+        return image if image.mode == mode else image.convert(mode)
+
+    def close(self) -> None:
+        for archive in self._archives.values():
+            archive.close()
+        self._archives.clear()
+        self._wanted.clear()
+        self._decoded.clear()
+
+    def _archive(self, path: Path) -> MaterialArchive:
+        archive = self._archives.get(path)
+        if archive is None:
+            archive = self._archives[path] = MaterialArchive(path)
+        return archive
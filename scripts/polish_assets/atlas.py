@@ -0,0 +1,227 @@
+"""Sprite atlas packing.
+
+`pack` places sprites on the smallest power-of-two page that holds all of
+them, using MaxRects with the best-short-side-fit rule and optional 90
+degree rotation. Every sprite gets a `gutter` of edge-extruded pixels on
+each side, and sizes and positions stay multiples of `ALIGN`. That keeps
+neighbours from bleeding into each other down to mip level log2(gutter),
+and no 4x4 compression block straddles two sprites. Deeper mips do mix
+neighbours, and sprites drawn a few pixels wide reach them, so a page
+like the runtime's sprite atlas is sampled without mipmaps. A sprite
+touching the page border does not need an outer gutter there, because
+clamp-to-edge sampling already repeats the border pixel.
+
+`compose` draws the page and `uv_rects` describes each sprite for the
+runtime: the pixel frame, plus the offset/repeat/rotation a three.js
+texture needs to map a sprite's own 0..1 UVs onto its frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+import math
+
+import numpy as np
+from PIL import Image
+
+from .fields import array_to_image
+
+
+ALIGN = 4
+DEFAULT_GUTTER = 4
+DEFAULT_MAX_SIZE = 2048
+
+
+@dataclass(frozen=True)
+class Rect:
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class Placement:
+    x: int
+    y: int
+    width: int
+    height: int
+    rotated: bool = False
+
+    @property
+    def frame(self) -> tuple[int, int, int, int]:
+        """Pixel rect the sprite occupies on the page (rotated sprites are stored swapped)."""
+        if self.rotated:
+            return (self.x, self.y, self.height, self.width)
+        return (self.x, self.y, self.width, self.height)
+
+
+@dataclass
+class AtlasLayout:
+    width: int
+    height: int
+    gutter: int
+    placements: dict[str, Placement]
+
+    @property
+    def fill(self) -> float:
+        used = sum(p.width * p.height for p in self.placements.values())
+        return used / (self.width * self.height)
+
+
+class MaxRectsBin:
+    def __init__(self, width: int, height: int) -> None:
+        self.free = [Rect(0, 0, width, height)]
+
+    def find(
+        self, width: int, height: int, rotate: bool
+    ) -> tuple[tuple[int, int], Rect, bool] | None:
+        """Best short-side fit for a `width` x `height` rect, or None if nothing fits."""
+        best = None
+        for free in self.free:
+            for rotated, w, h in ((False, width, height), (True, height, width)):
+                if (rotated and not rotate) or w > free.width or h > free.height:
+                    continue
+                leftover = free.width - w, free.height - h
+                score = (min(leftover), max(leftover))
+                if best is None or score < best[0]:
+                    best = (score, Rect(free.x, free.y, w, h), rotated)
+        return best
+
+    def place(self, used: Rect) -> None:
+        split: list[Rect] = []
+        for free in self.free:
+            if not _overlaps(free, used):
+                split.append(free)
+                continue
+            if used.x > free.x:
+                split.append(Rect(free.x, free.y, used.x - free.x, free.height))
+            if used.x + used.width < free.x + free.width:
+                right = used.x + used.width
+                split.append(Rect(right, free.y, free.x + free.width - right, free.height))
+            if used.y > free.y:
+                split.append(Rect(free.x, free.y, free.width, used.y - free.y))
+            if used.y + used.height < free.y + free.height:
+                bottom = used.y + used.height
+                split.append(Rect(free.x, bottom, free.width, free.y + free.height - bottom))
+        # Drop free rects contained in another one (keeping one copy of duplicates).
+        self.free = [
+            rect
+            for i, rect in enumerate(split)
+            if not any(
+                _contains(other, rect) and (other != rect or j < i)
+                for j, other in enumerate(split)
+                if j != i
+            )
+        ]
+
+
+def pack(
+    sizes: dict[str, tuple[int, int]],
+    max_size: int = DEFAULT_MAX_SIZE,
+    gutter: int = DEFAULT_GUTTER,
+    rotate: bool = True,
+) -> AtlasLayout:
+    """Pack sprites of the given (width, height) onto the smallest page that fits."""
+    if gutter % ALIGN:
+        raise ValueError(f"gutter must be a multiple of {ALIGN}")
+    sides = [1 << power for power in range(2, max_size.bit_length())]
+    candidates = sorted(
+        ((width, height) for width in sides for height in sides),
+        key=lambda size: (size[0] * size[1], max(size), -size[0]),
+    )
+    for width, height in candidates:
+        placements = _try_pack(sizes, width, height, gutter, rotate)
+        if placements is not None:
+            return AtlasLayout(width, height, gutter, placements)
+    raise ValueError(f"sprites do not fit on a {max_size}x{max_size} atlas page")
+
+
+def compose(layout: AtlasLayout, sprites: dict[str, Image.Image]) -> Image.Image:
+    page = np.zeros((layout.height, layout.width, 4), dtype=np.uint8)
+    g = layout.gutter
+    for name, placement in layout.placements.items():
+        sprite = sprites[name].convert("RGBA")
+        if placement.rotated:
+            sprite = sprite.transpose(Image.Transpose.ROTATE_90)
+        padded = np.pad(np.asarray(sprite), ((g, g), (g, g), (0, 0)), mode="edge")
+        x, y, _, _ = placement.frame
+        top, left = max(0, y - g), max(0, x - g)
+        bottom = min(layout.height, y + sprite.height + g)
+        right = min(layout.width, x + sprite.width + g)
+        page[top:bottom, left:right] = padded[
+            top - (y - g) : bottom - (y - g), left - (x - g) : right - (x - g)
+        ]
+    return array_to_image(page)
+
+
+def uv_rects(layout: AtlasLayout) -> dict[str, dict[str, Any]]:
+    """Per-sprite frame and three.js texture transform (flipY, UV origin bottom-left)."""
+    rects = {}
+    for name, placement in sorted(layout.placements.items()):
+        x, y, w, h = placement.frame
+        if placement.rotated:
+            # Stored a quarter turn counter-clockwise; undo it with rotation -pi/2 about (0, 0).
+            offset = [(x + w) / layout.width, 1 - (y + h) / layout.height]
+            repeat = [w / layout.width, h / layout.height]
+            rotation = -math.pi / 2
+        else:
+            offset = [x / layout.width, 1 - (y + h) / layout.height]
+            repeat = [w / layout.width, h / layout.height]
+            rotation = 0.0
+        rects[name] = {
+            "frame": [x, y, w, h],
+            "rotated": placement.rotated,
+            "offset": [round(value, 6) for value in offset],
+            "repeat": [round(value, 6) for value in repeat],
+            "rotation": round(rotation, 6),
+        }
+    return rects
+
+
+def _try_pack(
+    sizes: dict[str, tuple[int, int]], width: int, height: int, gutter: int, rotate: bool
+) -> dict[str, Placement] | None:
+    # Pack padded rects into a bin grown by one gutter per side, then shift back,
+    # so sprites can sit flush against the page border.
+    bin_ = MaxRectsBin(width + 2 * gutter, height + 2 * gutter)
+    remaining = {name: _padded(size, gutter) for name, size in sizes.items()}
+    placements: dict[str, Placement] = {}
+    while remaining:
+        best = None
+        # Global best fit: of all remaining sprites, place the one that fits tightest.
+        for name, (w, h) in sorted(remaining.items(), key=lambda item: (-max(item[1]), item[0])):
+            found = bin_.find(w, h, rotate)
+            if found is not None and (best is None or found[0] < best[1][0]):
+                best = (name, found)
+        if best is None:
+            return None
+        name, (_, used, rotated) = best
+        bin_.place(used)
+        sprite_width, sprite_height = sizes[name]
+        placements[name] = Placement(used.x, used.y, sprite_width, sprite_height, rotated)
+        del remaining[name]
+    return placements
+
+
+def _padded(size: tuple[int, int], gutter: int) -> tuple[int, int]:
+    return tuple(-(-side // ALIGN) * ALIGN + 2 * gutter for side in size)
+
+
+def _overlaps(a: Rect, b: Rect) -> bool:
+    return (
+        a.x < b.x + b.width
+        and b.x < a.x + a.width
+        and a.y < b.y + b.height
+        and b.y < a.y + a.height
+    )
+
+
+def _contains(outer: Rect, inner: Rect) -> bool:
+    return (
+        outer.x <= inner.x
+        and outer.y <= inner.y
+        and inner.x + inner.width <= outer.x + outer.width
+        and inner.y + inner.height <= outer.y + outer.height
+    )
@@ -0,0 +1,175 @@
+"""BC1, BC3 and BC5 block compression in NumPy.
+
+These are the S3TC/RGTC formats every desktop GPU samples without decoding:
+BC1 (4 bpp) for opaque colour, BC3 (8 bpp) for colour with alpha and BC5
+(8 bpp, two channels) for tangent-space normals. Every 4x4 block is encoded
+independently, so whole images are compressed as one batch of blocks.
+
+BC1 colour endpoints start at the extremes of the block's principal axis
+and are then refit once by least squares to the palette indices that axis
+chose; whichever fit has the lower error is kept. BC4 channels (BC3 alpha
+and both halves of BC5) use the block's min and max with the 8-value
+palette, which is already the best range for that mode.
+
+Blocks are encoded in chunks of `CHUNK_BLOCKS` so the per-pixel distance
+arrays stay small however large the image is. Output is raw block data in
+row-major block order, the layout graphics APIs and KTX2 expect.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+import numpy as np
+
+
+BLOCK_BYTES = {"BC1": 8, "BC3": 16, "BC5": 16}
+CHUNK_BLOCKS = 1 << 14
+
+# Weight of endpoint 0 for each 4-colour BC1 palette index.
+_COLOR_WEIGHTS = np.array([1.0, 0.0, 2.0 / 3.0, 1.0 / 3.0], dtype=np.float32)
+_COLOR_SHIFTS = np.arange(16, dtype=np.uint64) * np.uint64(2)
+_CHANNEL_SHIFTS = np.arange(16, dtype=np.uint64) * np.uint64(3)
+
+
+def to_blocks(array: np.ndarray) -> np.ndarray:
+    """Split an (H, W, C) image into (blocks, 16, C), padding edges to 4x4."""
+    if array.ndim == 2:
+        array = array[..., None]
+    pad_y, pad_x = -array.shape[0] % 4, -array.shape[1] % 4
+    if pad_y or pad_x:
+        array = np.pad(array, ((0, pad_y), (0, pad_x), (0, 0)), mode="edge")
+    rows, cols, channels = array.shape[0] // 4, array.shape[1] // 4, array.shape[2]
+    blocks = array.reshape(rows, 4, cols, 4, channels).swapaxes(1, 2)
+    return blocks.reshape(rows * cols, 16, channels)
+
+
+def encode_bc1(array: np.ndarray) -> bytes:
+    """Encode the RGB channels of an (H, W, 3+) uint8 image as BC1."""
+    return _encode(array, lambda blocks: _encode_color(blocks[..., :3])[:, None])
+
+
+def encode_bc3(array: np.ndarray) -> bytes:
+    """Encode an (H, W, 4) uint8 image as BC3: BC4 alpha followed by BC1 colour."""
+    return _encode(
+        array,
+        lambda blocks: np.stack(
+            [_encode_channel(blocks[..., 3]), _encode_color(blocks[..., :3])], axis=1
+        ),
+    )
+
+
+def encode_bc5(array: np.ndarray) -> bytes:
+    """Encode the first two channels of an (H, W, 2+) uint8 image as BC5."""
+    return _encode(
+        array,
+        lambda blocks: np.stack(
+            [_encode_channel(blocks[..., 0]), _encode_channel(blocks[..., 1])], axis=1
+        ),
+    )
+
+
+ENCODERS: dict[str, Callable[[np.ndarray], bytes]] = {
+    "BC1": encode_bc1,
+    "BC3": encode_bc3,
+    "BC5": encode_bc5,
+}
+
+
+def _encode(array: np.ndarray, encode_chunk: Callable[[np.ndarray], np.ndarray]) -> bytes:
+    blocks = to_blocks(np.asarray(array, dtype=np.uint8))
+    words = [
+        encode_chunk(blocks[start : start + CHUNK_BLOCKS].astype(np.float32))
+        for start in range(0, len(blocks), CHUNK_BLOCKS)
+    ]
+    return np.concatenate(words).astype("<u8").tobytes()
+
+
+def _encode_color(pixels: np.ndarray) -> np.ndarray:
+    mean = pixels.mean(axis=1, keepdims=True)
+    centered = pixels - mean
+    covariance = np.einsum("nki,nkj->nij", centered, centered)
+    # Power iteration from the highest-variance column, which is non-zero
+    # whenever the block is not flat.
+    widest = covariance.diagonal(axis1=1, axis2=2).argmax(axis=1)
+    axis = np.take_along_axis(covariance, widest[:, None, None], axis=2)[..., 0]
+    for _ in range(6):
+        axis = np.einsum("nij,nj->ni", covariance, axis)
+        axis /= np.maximum(np.linalg.norm(axis, axis=1, keepdims=True), 1e-12)
+    projection = np.einsum("nki,ni->nk", centered, axis)
+    low = mean[:, 0] + projection.min(axis=1, keepdims=True) * axis
+    high = mean[:, 0] + projection.max(axis=1, keepdims=True) * axis
+    first = _fit_color(pixels, high, low)
+
+    refit = _fit_color(pixels, *_least_squares_endpoints(pixels, first))
+    better = refit[3] < first[3]
+    c0, c1, indices, _ = (np.where(_expand(better, a), b, a) for a, b in zip(first, refit))
+    packed_indices = (indices.astype(np.uint64) << _COLOR_SHIFTS).sum(axis=1, dtype=np.uint64)
+    return c0.astype(np.uint64) | (c1.astype(np.uint64) << np.uint64(16)) | (
+        packed_indices << np.uint64(32)
+    )
+
+
+def _fit_color(
+    pixels: np.ndarray, high: np.ndarray, low: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Quantize endpoints to RGB565 and pick the nearest 4-colour index per pixel."""
+    c0, c1 = _pack565(high), _pack565(low)
+    # 4-colour mode needs c0 > c1; equal endpoints fall back to index 0 below.
+    c0, c1 = np.maximum(c0, c1), np.minimum(c0, c1)
+    e0, e1 = _unpack565(c0), _unpack565(c1)
+    palette = np.stack([e0, e1, (2 * e0 + e1) / 3, (e0 + 2 * e1) / 3], axis=1)
+    distance = np.square(pixels[:, :, None, :] - palette[:, None, :, :]).sum(axis=3)
+    indices = distance.argmin(axis=2)
+    indices[c0 == c1] = 0
+    error = np.take_along_axis(distance, indices[..., None], axis=2).sum(axis=(1, 2))
+    return c0, c1, indices, error
+
+
+def _least_squares_endpoints(
+    pixels: np.ndarray, fit: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+) -> tuple[np.ndarray, np.ndarray]:
+    c0, c1, indices, _ = fit
+    a = _COLOR_WEIGHTS[indices]
+    b = 1.0 - a
+    aa, bb, ab = (a * a).sum(axis=1), (b * b).sum(axis=1), (a * b).sum(axis=1)
+    ax = np.einsum("nk,nkc->nc", a, pixels)
+    bx = np.einsum("nk,nkc->nc", b, pixels)
+    determinant = aa * bb - ab * ab
+    solvable = determinant > 1e-6
+    safe = np.where(solvable, determinant, 1.0)[:, None]
+    high = (ax * bb[:, None] - bx * ab[:, None]) / safe
+    low = (bx * aa[:, None] - ax * ab[:, None]) / safe
+    high = np.where(solvable[:, None], high, _unpack565(c0))
+    low = np.where(solvable[:, None], low, _unpack565(c1))
+    return np.clip(high, 0, 255), np.clip(low, 0, 255)
+
+
+def _encode_channel(values: np.ndarray) -> np.ndarray:
+    a0 = values.max(axis=1)
+    a1 = values.min(axis=1)
+    steps = np.arange(1, 7, dtype=np.float32) / 7
+    interpolated = a0[:, None] * (1 - steps) + a1[:, None] * steps
+    palette = np.concatenate([a0[:, None], a1[:, None], interpolated], axis=1)
+    indices = np.abs(values[:, :, None] - palette[:, None, :]).argmin(axis=2)
+    indices[a0 == a1] = 0
+    packed_indices = (indices.astype(np.uint64) << _CHANNEL_SHIFTS).sum(axis=1, dtype=np.uint64)
+    return a0.astype(np.uint64) | (a1.astype(np.uint64) << np.uint64(8)) | (
+        packed_indices << np.uint64(16)
+    )
+
+
+def _pack565(color: np.ndarray) -> np.ndarray:
+    r, g, b = np.rint(np.clip(color, 0, 255) * (31 / 255, 63 / 255, 31 / 255)).astype(np.int64).T
+    return (r << 11) | (g << 5) | b
+
+
+def _unpack565(packed: np.ndarray) -> np.ndarray:
+    r, g, b = (packed >> 11) & 31, (packed >> 5) & 63, packed & 31
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=1).astype(
+        np.float32
+    )
+
+
+def _expand(mask: np.ndarray, like: np.ndarray) -> np.ndarray:
+    return mask.reshape(mask.shape + (1,) * (like.ndim - 1))
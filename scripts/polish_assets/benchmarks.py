@@ -0,0 +1,127 @@
+"""Timing, memory and size measurements for the pipeline's generators and encoders.
+
+A case is a function of a size that does its setup (source images, RNG
+streams) and returns the zero-argument call to measure. `measure` times the
+best of `repeat` calls and records the process's peak resident memory
+above where it stood once setup was done, plus the bytes of what the call
+produced: pixel bytes for an image, file size for a written path, the
+sum of those for a list of results.
+`isolated` runs a measurement in a freshly spawned process, so one case's
+allocations and caches never show up in another's numbers.
+
+`compare` checks a run against a stored baseline with the same keys. A
+case regresses when its time, peak memory or output bytes grow by more
+than `threshold` (a fraction) over the baseline. Each metric also gets a
+small absolute allowance, so millisecond and kilobyte jitter on tiny cases
+does not count.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
+import json
+import multiprocessing
+import os
+import platform
+import time
+
+from PIL import Image
+
+from .memory import current_rss, peak_rss, reset_peak
+
+
+BASELINE_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+# Below these, differences are allocator and filesystem noise rather than regressions.
+_SLACK = {"seconds": 0.005, "peak_bytes": 4 << 20, "output_bytes": 64}
+
+Case = Callable[[int], Callable[[], Any]]
+
+
+@dataclass
+class Measurement:
+    case: str
+    size: int
+    seconds: float
+    peak_bytes: int
+    output_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}@{self.size}"
+
+
+def output_bytes(result: Any) -> int:
+    if isinstance(result, Image.Image):
+        return result.width * result.height * len(result.getbands())
+    if isinstance(result, Path):
+        return result.stat().st_size
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    if isinstance(result, (list, tuple)):
+        return sum(output_bytes(item) for item in result)
+    raise TypeError(f"cannot size a benchmark result of type {type(result).__name__}")
+
+
+def measure(case: Case, name: str, size: int, repeat: int = 3) -> Measurement:
+    call = case(size)
+    reset_peak()
+    base = current_rss()
+    best = float("inf")
+    for _ in range(repeat):
+        # Drop the previous result first so the peak never holds two of them.
+        result = None
+        start = time.perf_counter()
+        result = call()
+        best = min(best, time.perf_counter() - start)
+    peak = max(0, peak_rss() - base)
+    return Measurement(name, size, best, peak, output_bytes(result))
+
+
+def isolated(function: Callable[..., Measurement], *args: Any) -> Measurement:
+    """`function(*args)` in a new spawned process (importable functions only)."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        return executor.submit(function, *args).result()
+
+
+def compare(
+    current: list[Measurement], baseline: dict[str, Measurement], threshold: float
+) -> list[str]:
+    """One line per metric of `current` that grew past the baseline by more than `threshold`."""
+    regressions = []
+    for measurement in current:
+        before = baseline.get(measurement.key)
+        if before is None:
+            continue
+        for metric, slack in _SLACK.items():
+            old, new = getattr(before, metric), getattr(measurement, metric)
+            if new > old * (1 + threshold) + slack:
+                change = f"{new / max(old, 1e-9) - 1:+.0%}"
+                regressions.append(f"{measurement.key} {metric}: {old:,.4g} -> {new:,.4g} ({change})")
+    return regressions
+
+
+def save_results(path: Path, measurements: list[Measurement]) -> None:
+    data = {
+        "version": BASELINE_VERSION,
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "results": [asdict(measurement) for measurement in measurements],
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> dict[str, Measurement]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark baseline version {data.get('version')!r}")
+    measurements = (Measurement(**result) for result in data["results"])
+    return {measurement.key: measurement for measurement in measurements}
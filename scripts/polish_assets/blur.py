@@ -0,0 +1,105 @@
+"""Gaussian blur with an optional downsample-blur-upsample pyramid.
+
+Pillow's `GaussianBlur` is already a cascade of box blurs, so its cost
+does not depend on the radius. Instead it scales with the pixel count,
+and the large plates pay for every full-resolution pixel. `pyramid_blur`
+box-reduces the image by a power of two `f`, blurs the small image and
+scales it back up bilinearly. The reduce and the upsample blur the image
+a little as well.
+Their variances, (f² - 1) / 12 and f² / 6 + 1 / 12 in full-resolution
+pixels, are subtracted from sigma², so only the remainder is left for
+the blur at the small size. `f` is the largest factor that still leaves
+that blur a sigma of at least `MIN_SIGMA` small pixels. Below that, the
+box-shaped reduce would start to show through the result.
+
+Pillow's reduce and resize premultiply alpha, and `GaussianBlur` does not,
+so images with alpha go through the pyramid one band at a time. That keeps
+the colour under transparent pixels the same as the exact blur leaves it.
+
+Measured error against `GaussianBlur`, on 8-bit channels of 2048x1024 RGBA
+uniform noise, hard steps and the downloaded caustic texture at sigma 5-60:
+- the mean absolute difference is under `MEAN_ERROR_BOUND` levels (worst
+  0.52);
+- 99.9% of samples are within `P999_ERROR_BOUND` levels (worst 13);
+- the largest single difference is 29, on the caustic's bright lines.
+The haze and lens-dirt plates measure a mean of 0.3 levels or less, at
+roughly half the time of the exact blur. `tests/pipeline/test_blur.py`
+holds the bounds on smaller inputs of the same kinds.
+"""
+
+from __future__ import annotations
+
+import math
+
+from PIL import Image, ImageFilter
+
+
+METHODS = ("exact", "pyramid")
+MIN_SIGMA = 2.0
+MEAN_ERROR_BOUND = 1.0
+P999_ERROR_BOUND = 16
+_PREMULTIPLIED = ("LA", "RGBA")
+
+
+def pyramid_factor(sigma: float, min_sigma: float = MIN_SIGMA) -> int:
+    """Largest power-of-two reduction that leaves `min_sigma` for the small-image blur."""
+    factor = 1
+    while _residual_sigma(sigma, factor * 2) >= min_sigma:
+        factor *= 2
+    return factor
+
+
+def _residual_sigma(sigma: float, factor: int) -> float:
+    # Reduce (box of width f) plus bilinear upsample, in full-resolution pixel variance.
+    variance = sigma * sigma - (factor * factor - 1) / 12 - (factor * factor / 6 + 1 / 12)
+    return math.sqrt(variance) / factor if variance > 0 else 0.0
+
+
+def pyramid_blur(image: Image.Image, sigma: float, min_sigma: float = MIN_SIGMA) -> Image.Image:
+    factor = pyramid_factor(sigma, min_sigma)
+    if factor == 1:
+        return image.filter(ImageFilter.GaussianBlur(sigma))
+    if image.mode in _PREMULTIPLIED:
+        bands = [_pyramid(band, sigma, factor) for band in image.split()]
+        return Image.merge(image.mode, bands)
+    return _pyramid(image, sigma, factor)
+
+
+def _pyramid(image: Image.Image, sigma: float, factor: int) -> Image.Image:
+    width, height = image.size
+    small = image.reduce(factor).filter(ImageFilter.GaussianBlur(_residual_sigma(sigma, factor)))
+    # `box` maps the small image's exact extent, so widths that `factor` does not divide stay aligned.
+    return small.resize(
+        (width, height),
+        Image.Resampling.BILINEAR,
+        box=(0, 0, width / factor, height / factor),
+    )
+
+
+def blur_footprint(sigma: float, method: str = "exact") -> tuple[int, int]:
+    """(halo, alignment) that lets `tiles.tiled` blur tile by tile and match the whole image.
+
+    Pillow's Gaussian is three box passes whose radius it derives from
+    sigma. Each pass reads one pixel past the box's whole part, for its
+    fractional edge weight. A pyramid needs the reach of the small blur,
+    one small pixel for the reduce and one for the bilinear upsample, and
+    tiles aligned to its factor.
+    """
+    factor = pyramid_factor(sigma) if method == "pyramid" else 1
+    if factor == 1:
+        return _box_reach(sigma), 1
+    return factor * (_box_reach(_residual_sigma(sigma, factor)) + 2), factor
+
+
+def _box_reach(sigma: float) -> int:
+    # Box length from Pillow's BoxBlur.c (after Gwosdek et al. 2011), three passes.
+    length = math.sqrt(12 * sigma * sigma / 3 + 1)
+    return 3 * (math.floor((length - 1) / 2) + 1)
+
+
+def gaussian_blur(image: Image.Image, sigma: float, method: str = "exact") -> Image.Image:
+    if method == "exact":
+        return image.filter(ImageFilter.GaussianBlur(sigma))
+    if method == "pyramid":
+        return pyramid_blur(image, sigma)
+    raise ValueError(f"unknown blur method {method!r}; expected one of {', '.join(METHODS)}")
@@ -0,0 +1,561 @@
+"""Incremental build graph for the pipeline's derived runtime files.
+
+Each output is a `Node`: the files it reads, the function that builds it,
+the keyword parameters it is built with and the function that writes the
+result. `BuildGraph.run` fingerprints every node and rebuilds only those
+whose fingerprint or outputs changed since the last run, in dependency
+order (a node that reads another node's output runs after it).
+
+A fingerprint covers the node's parameters, the content hash of each input
+and the source of the build/save functions plus every module-level helper,
+class and constant they reach, so editing a generator or a constant it
+reads rebuilds exactly the nodes that use it.
+Input hashes are memoized by (size, mtime) in the fingerprint database,
+which keeps a no-op run down to a few `stat` calls per node.
+
+`BuildGraph.run_parallel` builds dirty nodes on a process pool instead.
+Nodes are grouped into tasks (by default one node per task), and a task is
+started as soon as every task producing one of its inputs has finished.
+Tasks share nothing but files, so the outputs are the same for any worker
+count as long as no generator draws on global state (see `rng.stream`).
+
+`BuildGraph.run` can also be given a `streaming.Stream`. It then releases
+each cached source after its last reader and keeps the process under an
+RSS cap between builds.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from pathlib import Path, PurePath
+from types import CodeType, FunctionType, ModuleType
+from typing import TYPE_CHECKING, Any, Callable
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import time
+
+from .download_cache import file_sha256
+from .encoding import EncodeReport, encode, is_encoder
+from .tracing import TRACER, Span, payload_bytes
+
+if TYPE_CHECKING:
+    from .encoding import EncodeStage
+    from .streaming import Stream
+
+
+DB_VERSION = 1
+
+
+@dataclass
+class Node:
+    output: Path
+    build: Callable[..., Any]
+    save: Callable[[Any, Path], None]
+    inputs: tuple[Path, ...] = ()
+    params: dict[str, Any] = field(default_factory=dict)
+
+    def run(self, encoder: EncodeStage | None = None) -> Future[Any] | None:
+        """Build and save the output; returns a future if saving was handed off."""
+        result = self._build()
+        if encoder is not None and encoder.handles(self.save):
+            return encoder.submit(self.save, result, self.output)
+        self._save(result)
+        return None
+
+    def run_here(self) -> EncodeReport | None:
+        """Build and save in this process; an encoder save returns its report."""
+        result = self._build()
+        if is_encoder(self.save):
+            report = encode(self.save, result, self.output)
+            report.trace()
+            return report
+        self._save(result)
+        return None
+
+    def _build(self) -> Any:
+        with TRACER.span("generate", self.output.name) as span:
+            result = self.build(*self.inputs, **self.params)
+            if TRACER.enabled:
+                span.bytes_in = sum(path.stat().st_size for path in self.inputs if path.exists())
+                span.bytes_out = payload_bytes(result)
+        return result
+
+    def _save(self, result: Any) -> None:
+        with TRACER.span("save", self.output.name, payload_bytes(result)) as span:
+            self.save(result, self.output)
+            span.bytes_out = self.output.stat().st_size
+
+
+@dataclass
+class BuildResult:
+    node: Node
+    reasons: list[str]
+    seconds: float = 0.0
+    # Set by `run_parallel`, which encodes in the worker that built the node.
+    report: EncodeReport | None = None
+
+    @property
+    def rebuilt(self) -> bool:
+        return bool(self.reasons)
+
+
+def _run_task(
+    nodes: list[Node], setup: Callable[[list[Node]], None] | None, trace: bool
+) -> tuple[list[tuple[float, EncodeReport | None]], list[Span]]:
+    if trace:
+        # Spans start over per task; the parent merges them into its own trace.
+        TRACER.enable()
+    if setup is not None:
+        setup(nodes)
+    timings = []
+    for node in nodes:
+        start = time.perf_counter()
+        report = node.run_here()
+        timings.append((time.perf_counter() - start, report))
+    return timings, TRACER.spans if trace else []
+
+
+def code_fingerprint(function: Callable[..., Any]) -> str:
+    """Hash `function`'s source and every function, class and constant it reaches by global name.
+
+    A `functools.partial` is followed into its function and any functions
+    bound as its arguments; its other bound arguments are hashed by `repr`.
+    A class is hashed by its source and followed into its bases and methods.
+    A constant is hashed by the module-level statement that defines it, not
+    by its value, so a cache kept in a global does not dirty nodes as it
+    fills, and the names in that statement are followed in turn. Default
+    argument values are hashed by `repr`, or followed if they are code.
+    """
+    digest = hashlib.sha256()
+    seen: set[int] = set()
+    defined: set[tuple[str, str]] = set()
+    pending: list[Any] = [function]
+
+    def follow_value(value: Any) -> None:
+        if isinstance(value, (FunctionType, type, partial)):
+            pending.append(value)
+        elif (text := _plain_repr(value)) is not None:
+            digest.update(text.encode("utf-8"))
+        elif not isinstance(value, ModuleType):
+            pending.append(type(value))
+
+    def follow_global(namespace: dict[str, Any], name: str) -> None:
+        if name not in namespace or (name.startswith("__") and name.endswith("__")):
+            return
+        value = namespace[name]
+        if isinstance(value, (FunctionType, type, partial, ModuleType)):
+            follow_value(value)
+            return
+        module_file = namespace.get("__file__") or ""
+        if (module_file, name) in defined:
+            return
+        defined.add((module_file, name))
+        definition = _definitions(module_file).get(name) if module_file else None
+        if definition is None:
+            follow_value(value)
+        elif isinstance(definition, tuple):
+            module_name, original = definition
+            if module_name.startswith("."):
+                package = namespace.get("__package__")
+                module_name = importlib.util.resolve_name(module_name, package)
+            module = sys.modules.get(module_name)
+            if module is not None and not _is_third_party(module):
+                follow_global(vars(module), original)
+        else:
+            for source, names in definition:
+                digest.update(source.encode("utf-8"))
+                for referenced in names:
+                    follow_global(namespace, referenced)
+
+    while pending:
+        current = inspect.unwrap(pending.pop())
+        if isinstance(current, partial):
+            pending.append(current.func)
+            for name, arg in (*enumerate(current.args), *sorted(current.keywords.items())):
+                if callable(arg):
+                    pending.append(arg)
+                else:
+                    digest.update(repr((name, arg)).encode("utf-8"))
+            continue
+        if id(current) in seen or not isinstance(current, (FunctionType, type)):
+            continue
+        seen.add(id(current))
+        if _is_third_party(current):
+            continue
+        digest.update(current.__qualname__.encode("utf-8"))
+        digest.update(_source(current))
+        if isinstance(current, type):
+            pending.extend(current.__mro__[1:])
+            pending.extend(_methods(current))
+            continue
+        for value in (*(current.__defaults__ or ()), *(current.__kwdefaults__ or {}).values()):
+            follow_value(value)
+        for name in sorted(_global_names(current.__code__)):
+            follow_global(current.__globals__, name)
+    return digest.hexdigest()
+
+
+def _global_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _methods(cls: type) -> list[Any]:
+    methods = []
+    for member in vars(cls).values():
+        if isinstance(member, (staticmethod, classmethod)):
+            methods.append(member.__func__)
+        elif isinstance(member, property):
+            methods += [member.fget, member.fset, member.fdel]
+        elif isinstance(member, FunctionType):
+            methods.append(member)
+    return methods
+
+
+@lru_cache(maxsize=None)
+def _source(code: FunctionType | type) -> bytes:
+    # Nodes share most of their helpers; each is read from its file once per process.
+    try:
+        return inspect.getsource(code).encode("utf-8")
+    except (OSError, TypeError):
+        return code.__code__.co_code if isinstance(code, FunctionType) else b""
+
+
+def _plain_repr(value: Any) -> str | None:
+    """`repr` of `value` if it is plain data that reads the same in every run, else None."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes, PurePath)):
+        return repr(value)
+    if isinstance(value, tuple):
+        items = [_plain_repr(item) for item in value]
+        return None if None in items else "(" + ", ".join(items) + ",)"
+    if isinstance(value, frozenset):
+        items = [_plain_repr(item) for item in value]
+        return None if None in items else "frozenset({" + ", ".join(sorted(items)) + "})"
+    return None
+
+
+def _definitions(path: str) -> dict[str, Any]:
+    """Module-level definitions in the file at `path`, by the name they bind.
+
+    An assignment maps to a list of (statement source, names it reads), one
+    per statement binding the name. A `from ... import` maps to a tuple of
+    (module, name in that module), with relative modules left relative.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    return _parsed_definitions(path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _parsed_definitions(path: str, size: int, mtime_ns: int) -> dict[str, Any]:
+    source = Path(path).read_text(encoding="utf-8")
+    lines = source.splitlines(keepends=True)
+    definitions: dict[str, Any] = {}
+    for statement in ast.parse(source).body:
+        if isinstance(statement, ast.ImportFrom):
+            module = "." * statement.level + (statement.module or "")
+            for alias in statement.names:
+                definitions[alias.asname or alias.name] = (module, alias.name)
+            continue
+        if isinstance(statement, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = statement.targets if isinstance(statement, ast.Assign) else [statement.target]
+            text = "".join(lines[statement.lineno - 1 : statement.end_lineno])
+            bound = {node.id for target in targets for node in ast.walk(target) if _is_name(node)}
+            read = sorted({node.id for node in ast.walk(statement) if _is_name(node)} - bound)
+            for name in sorted(bound):
+                entry = definitions.get(name)
+                if not isinstance(entry, list):
+                    entry = definitions[name] = []
+                entry.append((text, read))
+    return definitions
+
+
+def _is_name(node: ast.AST) -> bool:
+    return isinstance(node, ast.Name)
+
+
+def _is_third_party(code: Any) -> bool:
+    """Whether `code` (a function, class or module) comes from the standard library or a package."""
+    try:
+        path = inspect.getsourcefile(code) or ""
+    except TypeError:
+        # Built-ins have no source file, and neither does a class whose module was
+        # loaded without being registered in `sys.modules`.
+        return isinstance(code, ModuleType) or code.__module__ in sys.builtin_module_names
+    return "site-packages" in path or "dist-packages" in path or path.startswith(
+        os.path.dirname(os.__file__)
+    )
+
+
+class BuildGraph:
+    def __init__(self, db_path: Path, root: Path) -> None:
+        self.db_path = db_path
+        self.root = root
+        self.nodes: list[Node] = []
+        self.db: dict[str, Any] = {"version": DB_VERSION, "files": {}, "nodes": {}}
+        if db_path.exists():
+            loaded = json.loads(db_path.read_text(encoding="utf-8"))
+            if loaded.get("version") == DB_VERSION:
+                self.db = loaded
+        self._code_cache: dict[int, str] = {}
+
+    def add(
+        self,
+        output: Path,
+        build: Callable[..., Any],
+        save: Callable[[Any, Path], None],
+        inputs: tuple[Path, ...] | list[Path] = (),
+        **params: Any,
+    ) -> Node:
+        node = Node(output, build, save, tuple(inputs), params)
+        self.nodes.append(node)
+        return node
+
+    def run(
+        self,
+        force: bool = False,
+        encoder: EncodeStage | None = None,
+        stream: Stream | None = None,
+    ) -> list[BuildResult]:
+        """Rebuild dirty nodes; with `encoder`, saves overlap later builds.
+
+        A node whose save was handed to `encoder` is recorded once its file
+        exists, and any node reading that file waits for it first. With
+        `stream`, set up by `stream.plan(self.plan(force))`, each build is
+        reported to `stream.done`. When the stream is over its RSS cap
+        before a build, pending saves are finished and its caches are shed.
+        """
+        results = []
+        pending: dict[Path, tuple[Future[Any], Node, str, dict[str, Any]]] = {}
+
+        def finish(path: Path) -> None:
+            future, node, fingerprint, parts = pending.pop(path)
+            future.result()
+            self._record(node, fingerprint, parts)
+
+        try:
+            for node in self._ordered():
+                for path in node.inputs:
+                    if path in pending:
+                        finish(path)
+                fingerprint, parts = self._fingerprint(node)
+                reasons = ["forced"] if force else self._dirty_reasons(node, fingerprint, parts)
+                result = BuildResult(node, reasons)
+                if reasons:
+                    if stream is not None and stream.over_cap():
+                        # A pending save holds its image until it is encoded.
+                        for path in list(pending):
+                            finish(path)
+                        stream.shed()
+                    start = time.perf_counter()
+                    future = node.run(encoder)
+                    result.seconds = time.perf_counter() - start
+                    if future is None:
+                        self._record(node, fingerprint, parts)
+                    else:
+                        pending[node.output] = (future, node, fingerprint, parts)
+                    if stream is not None:
+                        stream.done(node)
+                results.append(result)
+            for path in list(pending):
+                finish(path)
+        finally:
+            # Persist whatever finished so a failed run does not redo it.
+            self._prune()
+            self.save()
+        return results
+
+    def run_parallel(
+        self,
+        workers: int,
+        force: bool = False,
+        group: Callable[[Node], Any] | None = None,
+        setup: Callable[[list[Node]], None] | None = None,
+    ) -> list[BuildResult]:
+        """Rebuild dirty nodes on `workers` processes.
+
+        Dirty nodes with the same `group(node)` key run as one task, in
+        dependency order, so they can share what that worker has decoded.
+        `setup(nodes)` runs in the worker before each task. Each node is
+        recorded when its task finishes, and an encoder save is done in the
+        worker, with its report on the node's result.
+        """
+        ordered = self._ordered()
+        planned = self._planned(force)
+        results = {id(node): BuildResult(node, planned.get(id(node), [])) for node in ordered}
+        tasks: dict[Any, list[Node]] = {}
+        for node in ordered:
+            if id(node) in planned:
+                tasks.setdefault(id(node) if group is None else group(node), []).append(node)
+        producers = {node.output: key for key, nodes in tasks.items() for node in nodes}
+        waiting = {
+            key: {producers[path] for node in nodes for path in node.inputs if path in producers}
+            - {key}
+            for key, nodes in tasks.items()
+        }
+        try:
+            with ProcessPoolExecutor(workers) as executor:
+                running: dict[Future[Any], Any] = {}
+                while True:
+                    for key in [key for key, blockers in waiting.items() if not blockers]:
+                        del waiting[key]
+                        task = executor.submit(_run_task, tasks[key], setup, TRACER.enabled)
+                        running[task] = key
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = running.pop(future)
+                        timings, spans = future.result()
+                        TRACER.spans.extend(spans)
+                        for node, (seconds, report) in zip(tasks[key], timings):
+                            results[id(node)].seconds = seconds
+                            results[id(node)].report = report
+                            self._record(node, *self._fingerprint(node))
+                        for blockers in waiting.values():
+                            blockers.discard(key)
+            if waiting:
+                stuck = sorted(str(node.output) for key in waiting for node in tasks[key])
+                raise ValueError(f"build tasks depend on each other: {stuck}")
+        finally:
+            self._prune()
+            self.save()
+        return [results[id(node)] for node in ordered]
+
+    def plan(self, force: bool = False) -> list[Node]:
+        """Nodes `run` is expected to rebuild, without building anything.
+
+        Nodes reading the output of a planned node are planned too, since
+        their input will change once it is rebuilt.
+        """
+        planned = self._planned(force)
+        return [node for node in self._ordered() if id(node) in planned]
+
+    def _planned(self, force: bool) -> dict[int, list[str]]:
+        planned: dict[int, list[str]] = {}
+        planned_outputs: set[Path] = set()
+        for node in self._ordered():
+            if force:
+                reasons = ["forced"]
+            else:
+                reasons = self._dirty_reasons(node, *self._fingerprint(node))
+                upstream = [path for path in node.inputs if path in planned_outputs]
+                reasons = reasons or [f"input rebuilt: {self._key(path)}" for path in upstream]
+            if reasons:
+                planned[id(node)] = reasons
+                planned_outputs.add(node.output)
+        return planned
+
+    def save(self) -> None:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.db_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self.db, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.db_path)
+
+    def _record(self, node: Node, fingerprint: str, parts: dict[str, Any]) -> None:
+        self.db["nodes"][self._key(node.output)] = {
+            "fingerprint": fingerprint,
+            **parts,
+            "output": self._stat(node.output),
+        }
+
+    def _prune(self) -> None:
+        outputs = {self._key(node.output) for node in self.nodes}
+        inputs = {self._key(path) for node in self.nodes for path in node.inputs}
+        self.db["nodes"] = {k: v for k, v in self.db["nodes"].items() if k in outputs}
+        self.db["files"] = {k: v for k, v in self.db["files"].items() if k in inputs}
+
+    def _ordered(self) -> list[Node]:
+        producers = {node.output: node for node in self.nodes}
+        ordered: list[Node] = []
+        state: dict[int, str] = {}
+
+        def visit(node: Node) -> None:
+            mark = state.get(id(node))
+            if mark == "done":
+                return
+            if mark == "visiting":
+                raise ValueError(f"dependency cycle through {node.output}")
+            state[id(node)] = "visiting"
+            for path in node.inputs:
+                if path in producers:
+                    visit(producers[path])
+            state[id(node)] = "done"
+            ordered.append(node)
+
+        for node in self.nodes:
+            visit(node)
+        return ordered
+
+    def _fingerprint(self, node: Node) -> tuple[str, dict[str, Any]]:
+        parts = {
+            "code": hashlib.sha256(
+                (self._code(node.build) + self._code(node.save)).encode("utf-8")
+            ).hexdigest(),
+            "params": json.loads(json.dumps(node.params, sort_keys=True, default=repr)),
+            "inputs": {self._key(path): self._file_hash(path) for path in node.inputs},
+        }
+        encoded = json.dumps(parts, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest(), parts
+
+    def _dirty_reasons(self, node: Node, fingerprint: str, parts: dict[str, Any]) -> list[str]:
+        record = self.db["nodes"].get(self._key(node.output))
+        if record is None:
+            return ["new node"]
+        if not node.output.exists():
+            return ["output missing"]
+        if self._stat(node.output) != record["output"]:
+            return ["output modified outside the pipeline"]
+        if record["fingerprint"] == fingerprint:
+            return []
+        reasons = []
+        if record.get("code") != parts["code"]:
+            reasons.append("generator code changed")
+        old_params, new_params = record.get("params", {}), parts["params"]
+        for name in sorted(old_params.keys() | new_params.keys()):
+            if old_params.get(name) != new_params.get(name):
+                reasons.append(f"param {name}: {old_params.get(name)!r} -> {new_params.get(name)!r}")
+        old_inputs, new_inputs = record.get("inputs", {}), parts["inputs"]
+        reasons += [f"input changed: {p}" for p, d in new_inputs.items() if old_inputs.get(p) != d]
+        reasons += [f"input removed: {p}" for p in old_inputs if p not in new_inputs]
+        return reasons or ["fingerprint changed"]
+
+    def _code(self, function: Callable[..., Any]) -> str:
+        key = id(function)
+        if key not in self._code_cache:
+            self._code_cache[key] = code_fingerprint(function)
+        return self._code_cache[key]
+
+    def _file_hash(self, path: Path) -> str:
+        if not path.exists():
+            return "missing"
+        key = self._key(path)
+        stat = self._stat(path)
+        cached = self.db["files"].get(key)
+        if cached and cached["stat"] == stat:
+            return cached["sha256"]
+        digest = file_sha256(path)
+        self.db["files"][key] = {"stat": stat, "sha256": digest}
+        return digest
+
+    def _stat(self, path: Path) -> list[int]:
+        stat = path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _key(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return path.resolve().as_posix()
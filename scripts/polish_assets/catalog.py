@@ -0,0 +1,218 @@
+"""The `Assets.json` catalog: every file under `Assets/` with its hash and tags.
+
+`build_catalog` walks the assets directory and returns the document that
+`scripts/generate-assets-json.ps1` used to write: the same fields per
+asset, ids, tags and lookup lists. Files are ordered by lower-cased path,
+as PowerShell's `Sort-Object FullName` orders them, so ids that need a
+`_2` suffix keep it. Directories whose names start with a dot are caches,
+not assets, and are skipped.
+
+Hashing is incremental. `HashIndex` keeps each file's SHA-256 under its
+relative path together with the (size, mtime) it was computed at, in the
+same layout as the build graph's file table. Only new or changed files
+are read again. They are hashed on a thread pool from memory-mapped
+reads, and `hashlib` releases the GIL while it digests a mapping, so
+large files hash on several cores at once. `verify` rehashes every
+recorded asset the same way and reports the ones that no longer match.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable
+import hashlib
+import json
+import mmap
+import os
+import re
+import time
+
+
+INDEX_VERSION = 1
+CATALOG_VERSION = 1
+NOTES = [
+    "This file is the canonical asset catalog for the repository.",
+    "Use sourcePath values for source media in Assets/.",
+    "Copy or optimize into src/assets/ only when needed for runtime.",
+]
+TYPES = {
+    ".mp4": "video",
+    ".mov": "video",
+    ".webm": "video",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".png": "image",
+    ".webp": "image",
+    ".avif": "image",
+    ".svg": "vector",
+}
+# Filename patterns and the tag each adds, in the order the tags are listed.
+TAG_PATTERNS = [
+    ("brand", r"logo|brand|wordmark|medianetwork"),
+    ("logo", r"logo"),
+    ("hero", r"hero|splash"),
+    ("transition", r"transition|streak|confetti|energy"),
+    ("sora", r"sora"),
+    ("thumbnail", r"hq|thumb|thumbnail"),
+    ("marketing", r"report|email"),
+    ("generated", r"chatgpt|generated"),
+]
+VIDEO_TAGS = ["reference", "hero", "transition"]
+
+
+def sha256_mapped(path: Path) -> str:
+    """SHA-256 of `path`, read through a memory mapping."""
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def hash_files(paths: Iterable[Path], workers: int | None = None) -> dict[Path, str]:
+    paths = list(paths)
+    with ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        return dict(zip(paths, executor.map(sha256_mapped, paths)))
+
+
+class HashIndex:
+    """File hashes kept across runs, keyed by path and valid while (size, mtime) hold."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.files: dict[str, dict[str, Any]] = {}
+        self.hashed = 0
+        if path.exists():
+            loaded = json.loads(path.read_text(encoding="utf-8"))
+            if loaded.get("version") == INDEX_VERSION:
+                self.files = loaded["files"]
+
+    def digests(self, files: dict[str, Path], workers: int | None = None) -> dict[str, str]:
+        """SHA-256 of each file in `files` (key -> path), hashing only the changed ones."""
+        stats = {key: _stat(path) for key, path in files.items()}
+        stale = [key for key in files if self.files.get(key, {}).get("stat") != stats[key]]
+        fresh = hash_files((files[key] for key in stale), workers)
+        for key in stale:
+            self.files[key] = {"stat": stats[key], "sha256": fresh[files[key]]}
+        self.hashed = len(stale)
+        # Entries for files that are gone would only grow the index.
+        self.files = {key: self.files[key] for key in files}
+        return {key: self.files[key]["sha256"] for key in files}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        data = {"version": INDEX_VERSION, "files": self.files}
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def slug(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", value.lower()).strip("_") or "asset"
+
+
+def asset_type(extension: str) -> str:
+    return TYPES.get(extension.lower(), "file")
+
+
+def asset_tags(filename: str, kind: str) -> list[str]:
+    name = filename.lower()
+    tags = [tag for tag, pattern in TAG_PATTERNS if re.search(pattern, name)]
+    if kind == "video":
+        tags += VIDEO_TAGS
+    return list(dict.fromkeys(tags)) or ["reference"]
+
+
+def asset_files(root: Path, assets_dir: Path) -> dict[str, Path]:
+    """Files under `assets_dir` by their `/`-separated path relative to `root`, in catalog order."""
+    files = {}
+    for directory, subdirs, names in os.walk(assets_dir):
+        subdirs[:] = [name for name in subdirs if not name.startswith(".")]
+        for name in names:
+            path = Path(directory) / name
+            files[path.relative_to(root).as_posix()] = path
+    return {key: files[key] for key in sorted(files, key=str.lower)}
+
+
+def build_catalog(
+    root: Path,
+    assets_dir: str,
+    index: HashIndex,
+    workers: int | None = None,
+    previous: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """The catalog of `root / assets_dir`; `previous`'s timestamp is kept if no asset changed."""
+    files = asset_files(root, root / assets_dir)
+    digests = index.digests(files, workers)
+    assets = []
+    used: set[str] = set()
+    for relative, path in files.items():
+        kind = asset_type(path.suffix)
+        base = slug(path.stem)
+        asset_id, suffix = base, 2
+        while asset_id in used:
+            asset_id, suffix = f"{base}_{suffix}", suffix + 1
+        used.add(asset_id)
+        assets.append(
+            {
+                "id": asset_id,
+                "filename": path.name,
+                "sourcePath": relative,
+                "type": kind,
+                "extension": path.suffix.lower(),
+                "sizeBytes": path.stat().st_size,
+                "sha256": digests[relative],
+                "tags": asset_tags(path.name, kind),
+            }
+        )
+
+    def tagged(*tags: str) -> list[str]:
+        return [asset["id"] for asset in assets if any(tag in asset["tags"] for tag in tags)]
+
+    brand, hero, transition = tagged("brand"), tagged("hero", "sora"), tagged("transition", "sora")
+    grouped = set(brand + hero + transition)
+    if previous is not None and previous.get("assets") == assets:
+        generated = previous["generatedAtUtc"]
+    else:
+        generated = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return {
+        "version": CATALOG_VERSION,
+        "generatedAtUtc": generated,
+        "root": assets_dir.replace("\\", "/"),
+        "notes": NOTES,
+        "assets": assets,
+        "lookup": {
+            "brand": brand,
+            "heroReference": hero,
+            "transitionReference": transition,
+            "miscReference": [asset["id"] for asset in assets if asset["id"] not in grouped],
+        },
+    }
+
+
+def verify(root: Path, catalog: dict[str, Any], workers: int | None = None) -> list[str]:
+    """Problems with the catalog's files, in catalog order: missing, resized or changed content."""
+    problems: dict[str, str] = {}
+    present = {}
+    for asset in catalog["assets"]:
+        source = asset["sourcePath"]
+        path = root / source
+        if not path.is_file():
+            problems[source] = f"{source}: missing"
+        elif path.stat().st_size != asset["sizeBytes"]:
+            recorded = asset["sizeBytes"]
+            problems[source] = f"{source}: {path.stat().st_size} bytes, recorded {recorded}"
+        else:
+            present[path] = asset
+    for path, digest in hash_files(present, workers).items():
+        if digest != present[path]["sha256"]:
+            source = present[path]["sourcePath"]
+            problems[source] = f"{source}: sha256 {digest} does not match"
+    order = [asset["sourcePath"] for asset in catalog["assets"]]
+    return [problems[source] for source in order if source in problems]
+
+
+def _stat(path: Path) -> list[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
@@ -0,0 +1,65 @@
+"""Anti-aliased rasterizing of parametric curves, one column per sample.
+
+A curve here is a height for every pixel column, such as a sum of
+sinusoids. `sinusoid_sum` evaluates all the columns of every animation
+frame in one array expression. `line_coverage` turns those heights into
+anti-aliased coverage. In each column it takes the exact fraction of each
+pixel's row span [r, r + 1] that falls inside the line. The line's
+vertical half-width grows with the local slope, sqrt(1 + slope²), so the
+line keeps its thickness along steep stretches and has no gaps between
+columns there.
+
+Each term of a sum advances a whole number of periods over the frames,
+so frame `frames` would equal frame 0 and the baked sequence loops without
+a seam. `flipbook` stacks the frames top to bottom into one strip. That
+layout is what a flipbook material samples with `repeat`/`offset`, and what
+a texture array takes as its slices.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+import math
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Sinusoid:
+    amplitude: float
+    # Radians per pixel column.
+    frequency: float
+    phase: float = 0.0
+    # Whole periods the term moves through over one animation loop.
+    cycles: int = 1
+
+
+def sinusoid_sum(width: int, terms: Sequence[Sinusoid], frames: int = 1) -> np.ndarray:
+    """Float64 (frames, width): the sum of `terms` at every column of every frame."""
+    if frames < 1:
+        raise ValueError("need at least one frame")
+    columns = np.arange(width, dtype=np.float64)[np.newaxis, :]
+    loop = np.arange(frames, dtype=np.float64)[:, np.newaxis] * (2 * math.pi / frames)
+    total = np.zeros((frames, width))
+    for term in terms:
+        total += term.amplitude * np.sin(term.frequency * columns + term.phase + term.cycles * loop)
+    return total
+
+
+def line_coverage(centers: np.ndarray, height: int, half_width: float) -> np.ndarray:
+    """Float32 (..., height, width) coverage of a line through `centers` (..., width).
+
+    `centers` are in pixel units, with row r spanning [r, r + 1).
+    """
+    slope = np.gradient(centers, axis=-1) if centers.shape[-1] > 1 else np.zeros_like(centers)
+    reach = (half_width * np.sqrt(1 + slope * slope))[..., np.newaxis, :]
+    middle = centers[..., np.newaxis, :]
+    rows = np.arange(height, dtype=np.float64)[:, np.newaxis]
+    coverage = np.minimum(rows + 1, middle + reach) - np.maximum(rows, middle - reach)
+    return np.clip(coverage, 0, 1).astype(np.float32)
+
+
+def flipbook(frames: np.ndarray) -> np.ndarray:
+    """(frames, height, width, ...) as one (frames * height, width, ...) strip, frame 0 on top."""
+    return np.ascontiguousarray(frames.reshape(-1, *frames.shape[2:]))
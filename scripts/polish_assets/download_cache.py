@@ -0,0 +1,228 @@
+"""Content-addressed cache for the pipeline's source downloads.
+
+Bodies are stored once under `objects/<sha256[:2]>/<sha256>` and indexed by
+URL together with the validators the server sent (ETag, Last-Modified).
+A warm entry is revalidated with a conditional GET; a 304 reuses the
+stored object, and with `offline=True` (or when the network is down) the
+cache is used without any request. Every reuse re-checks the object's hash
+against the index, so a corrupted object is discarded and fetched again.
+Requests go through a shared `ConnectionPool`, and one cache may be used
+from several download threads at once.
+
+Bodies are streamed in fixed-size chunks to `partial/<sha256(url)>` and
+renamed into the object store once complete. If a transfer drops, the
+partial file is kept and the next attempt resumes it with a Range request
+guarded by If-Range, so memory stays constant and progress is not lost.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import threading
+
+from .http_pool import TRANSIENT_ERRORS, ConnectionPool
+
+
+HASH_CHUNK = 1 << 20
+STREAM_CHUNK = 1 << 16
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    sha256: str
+    size: int
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def file_sha256(path: Path) -> str:
+    return _prefix_digest(path, path.stat().st_size).hexdigest()
+
+
+def _prefix_digest(path: Path, length: int) -> hashlib._Hash:
+    digest = hashlib.sha256()
+    if length:
+        with path.open("rb") as handle:
+            while length > 0 and (chunk := handle.read(min(HASH_CHUNK, length))):
+                digest.update(chunk)
+                length -= len(chunk)
+    return digest
+
+
+def _range_validator(etag: str | None, last_modified: str | None) -> str | None:
+    # If-Range needs a strong validator; a weak ETag could splice two versions.
+    if etag and not etag.startswith("W/"):
+        return etag
+    return last_modified
+
+
+class DownloadCache:
+    def __init__(
+        self, root: Path, offline: bool = False, pool: ConnectionPool | None = None
+    ) -> None:
+        self.root = root
+        self.offline = offline
+        self.pool = pool or ConnectionPool()
+        self._lock = threading.RLock()
+        self.index_path = root / "index.json"
+        self.entries: dict[str, CacheEntry] = {}
+        if self.index_path.exists():
+            raw = json.loads(self.index_path.read_text(encoding="utf-8"))
+            self.entries = {url: CacheEntry(**entry) for url, entry in raw.items()}
+
+    def object_path(self, sha256: str) -> Path:
+        return self.root / "objects" / sha256[:2] / sha256
+
+    def fetch(self, url: str, out_path: Path, expected_sha256: str | None = None) -> str:
+        """Make `out_path` hold the current body of `url`.
+
+        Returns how the file was obtained: "downloaded", "not-modified",
+        "offline" or "stale" (network failed, warm cache used).
+        """
+        entry = self._verified_entry(url)
+        if expected_sha256 and entry and entry.sha256 != expected_sha256:
+            entry = None
+
+        if self.offline:
+            if entry is None:
+                raise DownloadError(f"{url} is not cached and offline mode is on")
+            self._materialize(entry, out_path)
+            return "offline"
+
+        for attempt in range(self.pool.retries + 1):
+            try:
+                fresh = self._stream(url, entry, expected_sha256)
+                break
+            except TRANSIENT_ERRORS as error:
+                # An interrupted body stays in the partial file, so the next
+                # attempt resumes it with a Range request.
+                if attempt < self.pool.retries and self._partial_path(url).exists():
+                    continue
+                if entry is None:
+                    raise DownloadError(f"{url} failed: {error}") from error
+                self._materialize(entry, out_path)
+                return "stale"
+
+        if fresh is None:
+            self._materialize(entry, out_path)
+            return "not-modified"
+        with self._lock:
+            self.entries[url] = fresh
+            self.save()
+        self._materialize(fresh, out_path)
+        return "downloaded"
+
+    def save(self) -> None:
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            payload = {url: asdict(entry) for url, entry in sorted(self.entries.items())}
+            tmp_path = self.index_path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+            os.replace(tmp_path, self.index_path)
+
+    def _verified_entry(self, url: str) -> CacheEntry | None:
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        object_path = self.object_path(entry.sha256)
+        if object_path.exists() and object_path.stat().st_size == entry.size:
+            if file_sha256(object_path) == entry.sha256:
+                return entry
+        object_path.unlink(missing_ok=True)
+        with self._lock:
+            self.entries.pop(url, None)
+            self.save()
+        return None
+
+    def _partial_path(self, url: str) -> Path:
+        return self.root / "partial" / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _stream(
+        self, url: str, entry: CacheEntry | None, expected_sha256: str | None
+    ) -> CacheEntry | None:
+        """Stream `url` into its partial file and promote it to an object.
+
+        Returns None when the server answers 304 for `entry`. Memory use is
+        one STREAM_CHUNK buffer regardless of the body size.
+        """
+        partial = self._partial_path(url)
+        meta_path = partial.with_suffix(".json")
+        offset = partial.stat().st_size if partial.exists() else 0
+        validator = None
+        if offset and meta_path.exists():
+            validator = json.loads(meta_path.read_text(encoding="utf-8")).get("validator")
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        if validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+
+        with self.pool.request(url, headers) as response:
+            if response.status == 304 and entry is not None:
+                return None
+            if response.status == 200:
+                offset = 0
+            elif response.status != 206 or not validator:
+                raise DownloadError(f"{url} returned HTTP {response.status}")
+            etag = response.getheader("ETag")
+            last_modified = response.getheader("Last-Modified")
+
+            partial.parent.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(
+                json.dumps({"validator": _range_validator(etag, last_modified)}),
+                encoding="utf-8",
+            )
+            digest = _prefix_digest(partial, offset)
+            buffer = bytearray(STREAM_CHUNK)
+            view = memoryview(buffer)
+            with partial.open("r+b" if offset else "wb") as handle:
+                handle.seek(offset)
+                handle.truncate()
+                while count := response.readinto(buffer):
+                    digest.update(view[:count])
+                    handle.write(view[:count])
+            if response.length:
+                # readinto() reports a dropped connection as EOF, not an error.
+                raise http.client.IncompleteRead(b"", response.length)
+
+        sha256 = digest.hexdigest()
+        size = partial.stat().st_size
+        meta_path.unlink(missing_ok=True)
+        if expected_sha256 and sha256 != expected_sha256:
+            partial.unlink(missing_ok=True)
+            raise DownloadError(f"{url} sha256 {sha256} does not match expected {expected_sha256}")
+        self._store(partial, sha256)
+        return CacheEntry(url, sha256, size, etag, last_modified)
+
+    def _store(self, source: Path, sha256: str) -> None:
+        object_path = self.object_path(sha256)
+        if object_path.exists():
+            source.unlink()
+            return
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, object_path)
+
+    def _materialize(self, entry: CacheEntry, out_path: Path) -> None:
+        if out_path.exists() and out_path.stat().st_size == entry.size:
+            if file_sha256(out_path) == entry.sha256:
+                return
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        shutil.copyfile(self.object_path(entry.sha256), tmp_path)
+        os.replace(tmp_path, out_path)
@@ -0,0 +1,167 @@
+"""Image encoders and the multi-core encoding stage.
+
+`save_webp`, `save_png` and the KTX2 savers are the pipeline's encoders;
+`save_webp_tuned` searches per image for the smallest WebP that still meets
+an SSIM target (see `quality`).
+They are slow on purpose (WebP method 6, optimized PNG, block compression
+of a full mip chain), so `EncodeStage` runs them in a process pool while
+the main process keeps building the next image. At most `max_in_flight`
+decoded images wait for a worker at any time, which bounds memory, and
+reports are kept in submission order so the summary is the same on every
+run whatever order the workers finish in.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+import os
+import threading
+import time
+
+from PIL import Image
+
+from .ktx2 import save_ktx2_linear, save_ktx2_normal, save_ktx2_srgb
+from .quality import DEFAULT_TARGET, TunedEncode, tune_webp
+from .tracing import TRACER, payload_bytes
+
+
+def save_webp(image: Image.Image, out_path: Path, quality: int = 92) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(out_path, format="WEBP", quality=quality, method=6)
+
+
+def save_png(image: Image.Image, out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(out_path, format="PNG", optimize=True)
+
+
+def save_webp_tuned(
+    image: Image.Image, out_path: Path, target: float = DEFAULT_TARGET
+) -> TunedEncode:
+    tuned = tune_webp(image, target)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(tuned.data)
+    return tuned
+
+
+ENCODERS = (
+    save_webp,
+    save_webp_tuned,
+    save_png,
+    save_ktx2_srgb,
+    save_ktx2_linear,
+    save_ktx2_normal,
+)
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@dataclass
+class EncodeReport:
+    path: Path
+    seconds: float
+    size: int
+    pixels: int
+    # Set by tuned encoders: the setting chosen and the fixed-quality size it replaced.
+    setting: str = ""
+    baseline: int | None = None
+    # When and where the encode ran and what it was given, so the parent can trace it.
+    start: float = 0.0
+    pid: int = 0
+    raw_bytes: int = 0
+
+    def trace(self) -> None:
+        TRACER.record(
+            "encode", self.path.name, self.start, self.seconds, self.pid, self.raw_bytes, self.size
+        )
+
+    def summary(self, root: Path) -> str:
+        tuned = ""
+        if self.baseline is not None:
+            tuned = f"  {self.setting:>8} (was {self.baseline / 1e3:.1f} kB)"
+        return (
+            f"{self.seconds:7.2f} s  {self.size / 1e3:9.1f} kB  "
+            f"{self.size * 8 / max(self.pixels, 1):5.2f} bpp  {self.path.relative_to(root).as_posix()}"
+            f"{tuned}"
+        )
+
+
+def is_encoder(save: Callable[..., Any]) -> bool:
+    return (save.func if isinstance(save, partial) else save) in ENCODERS
+
+
+def encode(
+    save: Callable[[Image.Image, Path], None], image: Image.Image, out_path: Path
+) -> EncodeReport:
+    start = time.perf_counter()
+    result = save(image, out_path)
+    seconds = time.perf_counter() - start
+    report = EncodeReport(out_path, seconds, out_path.stat().st_size, image.width * image.height)
+    report.start, report.pid, report.raw_bytes = start, os.getpid(), payload_bytes(image)
+    if isinstance(result, TunedEncode):
+        report.setting, report.baseline = result.setting, result.baseline
+    return report
+
+
+class EncodeStage:
+    """Run encoder calls on a process pool sized to the machine.
+
+    With `workers=0` every job is encoded inline on submit, which is handy
+    for debugging and gives the same files.
+    """
+
+    def __init__(self, workers: int | None = None, max_in_flight: int | None = None) -> None:
+        self.workers = available_cpus() if workers is None else workers
+        self.reports: list[EncodeReport] = []
+        self._futures: list[Future[EncodeReport]] = []
+        self._executor = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+        self._slots = threading.BoundedSemaphore(max_in_flight or max(2, self.workers * 2))
+
+    def __enter__(self) -> EncodeStage:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def handles(self, save: Callable[..., Any]) -> bool:
+        return is_encoder(save)
+
+    def submit(
+        self, save: Callable[[Image.Image, Path], None], image: Image.Image, out_path: Path
+    ) -> Future[EncodeReport]:
+        if self._executor is None:
+            future: Future[EncodeReport] = Future()
+            future.set_result(encode(save, image, out_path))
+        else:
+            # Blocks once max_in_flight images are queued, so the producer
+            # cannot run arbitrarily far ahead of the encoders.
+            self._slots.acquire()
+            future = self._executor.submit(encode, save, image, out_path)
+            future.add_done_callback(lambda _: self._slots.release())
+        if TRACER.enabled:
+            future.add_done_callback(_trace_encode)
+        self._futures.append(future)
+        return future
+
+    def wait(self) -> list[EncodeReport]:
+        """Wait for every submitted job; reports come back in submission order."""
+        self.reports = [future.result() for future in self._futures]
+        return self.reports
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _trace_encode(future: Future[EncodeReport]) -> None:
+    if future.exception() is None:
+        future.result().trace()
@@ -0,0 +1,175 @@
+"""Array-backed procedural fields.
+
+Each generator computes its whole field as one NumPy array and hands the
+buffer to Pillow with `array_to_image`, which maps L/RGBA/RGBX arrays
+without copying. Results are byte-identical to the per-pixel loops they
+replace, including the random stream consumed by `noise_field`.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Protocol
+
+import numpy as np
+from PIL import Image
+
+
+class RandomState(Protocol):
+    def getstate(self) -> tuple: ...
+
+    def setstate(self, state: tuple) -> None: ...
+
+
+_BUFFER_MODES = {1: "L", 4: "RGBA"}
+_BAND_ROWS = 64
+
+
+def array_to_image(array: np.ndarray, mode: str | None = None) -> Image.Image:
+    """Wrap a C-contiguous uint8 array as a Pillow image without copying.
+
+    2-D arrays map to "L" and (h, w, 4) arrays to "RGBA" or, when `mode`
+    is "RGBX", to an RGB image padded to Pillow's native 32-bit layout.
+    The image is read-only and keeps a reference to `array`.
+    """
+    if array.dtype != np.uint8 or not array.flags.c_contiguous:
+        array = np.ascontiguousarray(array, dtype=np.uint8)
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    mode = mode or _BUFFER_MODES.get(channels)
+    if mode is None or (mode == "RGBX" and channels != 4):
+        raise ValueError(f"unsupported array shape for zero-copy image: {array.shape}")
+    height, width = array.shape[:2]
+    return Image.frombuffer(mode, (width, height), array, "raw", mode, 0, 1)
+
+
+def _mt_bit_generator(state: tuple) -> np.random.MT19937:
+    _, internal, _ = state
+    bit_generator = np.random.MT19937()
+    bit_generator.state = {
+        "bit_generator": "MT19937",
+        "state": {"key": np.array(internal[:624], dtype=np.uint32), "pos": internal[624]},
+    }
+    return bit_generator
+
+
+def python_randint_array(count: int, upper: int, rng: RandomState = random) -> np.ndarray:
+    """Draw `count` values of `rng.randint(0, upper)` in one vectorized pass.
+
+    Python's randint rejection-samples `getrandbits(k)`, and getrandbits(k)
+    for k <= 32 is the top k bits of one Mersenne Twister word. Replaying the
+    same twister state through NumPy gives the same words, so accepting the
+    same ones reproduces the sequence exactly. `rng` is advanced past the
+    consumed words so later draws are unaffected.
+    """
+    bound = upper + 1
+    bits = bound.bit_length()
+    if bits > 32:
+        raise ValueError("python_randint_array supports bounds up to 2**32")
+    state = rng.getstate()
+    bit_generator = _mt_bit_generator(state)
+    start = bit_generator.state
+    out = np.empty(count, dtype=np.uint32)
+    filled = 0
+    consumed = 0
+    while filled < count:
+        need = count - filled
+        # Oversample by the rejection rate so one batch is almost always enough.
+        batch = int(need * (1 << bits) / bound * 1.02) + 64
+        words = (bit_generator.random_raw(batch) >> (32 - bits)).astype(np.uint32)
+        accepted = np.flatnonzero(words < bound)
+        if accepted.size >= need:
+            out[filled:] = words[accepted[:need]]
+            consumed += int(accepted[need - 1]) + 1
+            filled = count
+        else:
+            out[filled : filled + accepted.size] = words[accepted]
+            filled += accepted.size
+            consumed += batch
+
+    bit_generator.state = start
+    bit_generator.random_raw(consumed)
+    end = bit_generator.state["state"]
+    version, _, gauss_next = state
+    rng.setstate((version, tuple(int(v) for v in end["key"]) + (int(end["pos"]),), gauss_next))
+    return out
+
+
+def noise_field(width: int, height: int, amount: int = 255, rng: RandomState = random) -> np.ndarray:
+    return python_randint_array(width * height, amount, rng).astype(np.uint8).reshape(height, width)
+
+
+def radial_falloff(
+    width: int,
+    height: int,
+    center: tuple[float, float] = (0.5, 0.5),
+    aspect: float = 1.0,
+    power: float = 1.0,
+    rows: slice = slice(None),
+) -> np.ndarray:
+    """Float64 (height, width) field: 0 at `center`, rising to 1 on an ellipse and beyond.
+
+    `center` is a fraction of the image size. The ellipse's horizontal
+    radius is half the width and `aspect` is its width over its height.
+    The normalized distance is clamped to 1 and raised to `power`.
+    `rows` selects a band of rows to compute.
+    """
+    center_x, center_y = center[0] * width, center[1] * height
+    radius_x = width / 2
+    radius_y = radius_x / aspect
+    across = (np.arange(width, dtype=np.float64) - center_x) / radius_x
+    down = (np.arange(height, dtype=np.float64)[rows] - center_y) / radius_y
+    # One temporary for the band, reused in place for every step after the outer sum.
+    field = np.square(across)[np.newaxis, :] + np.square(down)[:, np.newaxis]
+    np.sqrt(field, out=field)
+    np.minimum(field, 1.0, out=field)
+    if power != 1.0:
+        np.power(field, power, out=field)
+    return field
+
+
+def radial_gradient_field(
+    width: int,
+    height: int,
+    inner: tuple[int, int, int, int],
+    outer: tuple[int, int, int, int],
+    center: tuple[float, float] = (0.5, 0.5),
+    aspect: float = 1.0,
+    power: float = 1.0,
+    darkness: float = 1.0,
+) -> np.ndarray:
+    """RGBA uint8 field blending from `inner` at the center towards `outer` at the edge.
+
+    The blend weight is `darkness` times `radial_falloff`, so a darkness
+    below 1 stops short of `outer`. Channels where `inner` and `outer`
+    agree are filled without touching the falloff.
+    """
+    field = np.empty((height, width, 4), dtype=np.uint8)
+    # Row bands keep the float temporaries in cache on large fields.
+    for start in range(0, height, _BAND_ROWS):
+        rows = slice(start, start + _BAND_ROWS)
+        glow = radial_falloff(width, height, center, aspect, power, rows)
+        if darkness != 1.0:
+            glow *= darkness
+        np.subtract(1.0, glow, out=glow)
+        band = field[rows]
+        for channel, (near, far) in enumerate(zip(inner, outer)):
+            if near == far:
+                band[..., channel] = near
+            else:
+                band[..., channel] = far + glow * (near - far)
+    return field
+
+
+def portal_gradient_field(size: int) -> np.ndarray:
+    return radial_gradient_field(size, size, inner=(184, 248, 254, 255), outer=(26, 74, 126, 255))
+
+
+def lut_strip_field(width: int, height: int) -> np.ndarray:
+    u = (np.arange(width, dtype=np.float64) / max(1, width - 1))[np.newaxis, :]
+    v = (np.arange(height, dtype=np.float64) / max(1, height - 1))[:, np.newaxis]
+    field = np.empty((height, width, 4), dtype=np.uint8)
+    field[..., 0] = np.minimum(255, (u**0.9) * 255)
+    field[..., 1] = np.minimum(255, ((u * 0.8 + v * 0.2) ** 1.0) * 255)
+    field[..., 2] = np.minimum(255, ((u * 0.58 + (1 - v) * 0.42) ** 1.1) * 255)
+    field[..., 3] = 255
+    return field
@@ -0,0 +1,163 @@
+"""Radiance RGBE environment maps: decode, downsample and compact encoding.
+
+`read_hdr` parses a Radiance `.hdr` (flat or new-style run-length encoded
+scanlines, `-Y h +X w` orientation) into a float32 (h, w, 3) array, and
+`write_hdr` writes one back run-length encoded. RGBE bytes decode the way
+three.js's RGBELoader decodes them, `byte * 2 ** (exponent - 136)`.
+
+`downsample` halves an equirect map, averaging each 2x2 block by solid
+angle: the two rows of a block cover different bands of latitude, so they
+are weighted by the area of those bands rather than equally. That keeps
+the total radiance, and with it the lighting the map produces, the same at
+every level.
+
+`rgbe_image` packs a float map into the same four RGBE bytes as an RGBA
+image, so it can be stored losslessly as PNG. PNG's deflate does about as
+well as RLE on these bytes, and the runtime can decode it with the same
+arithmetic as an `.hdr`.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from .fields import array_to_image
+
+
+_MAGIC = (b"#?RADIANCE", b"#?RGBE")
+
+
+def read_hdr(path: Path) -> np.ndarray:
+    data = path.read_bytes()
+    if not data.startswith(_MAGIC):
+        raise ValueError(f"{path} is not a Radiance HDR file")
+    header_end = data.index(b"\n\n") + 2
+    for line in data[:header_end].decode("ascii", "replace").splitlines():
+        if line.startswith("FORMAT=") and line != "FORMAT=32-bit_rle_rgbe":
+            raise ValueError(f"{path}: unsupported {line}")
+    resolution_end = data.index(b"\n", header_end)
+    fields = data[header_end:resolution_end].split()
+    if len(fields) != 4 or fields[0] != b"-Y" or fields[2] != b"+X":
+        raise ValueError(f"{path}: unsupported orientation {data[header_end:resolution_end]!r}")
+    height, width = int(fields[1]), int(fields[3])
+    rgbe = _read_scanlines(memoryview(data)[resolution_end + 1 :], width, height, path)
+    return rgbe_to_float(rgbe)
+
+
+def _read_scanlines(data: memoryview, width: int, height: int, path: Path) -> np.ndarray:
+    if not 8 <= width < 0x8000 or bytes(data[:2]) != b"\x02\x02":
+        flat = np.frombuffer(data, dtype=np.uint8, count=width * height * 4)
+        return flat.reshape(height, width, 4)
+    rgbe = np.empty((height, 4, width), dtype=np.uint8)
+    pos = 0
+    for y in range(height):
+        if bytes(data[pos : pos + 2]) != b"\x02\x02" or (data[pos + 2] << 8 | data[pos + 3]) != width:
+            raise ValueError(f"{path}: bad scanline header at row {y}")
+        pos += 4
+        for channel in range(4):
+            row = rgbe[y, channel]
+            x = 0
+            while x < width:
+                count = data[pos]
+                if count > 128:
+                    count -= 128
+                    row[x : x + count] = data[pos + 1]
+                    pos += 2
+                else:
+                    if count == 0:
+                        raise ValueError(f"{path}: zero-length run at row {y}")
+                    row[x : x + count] = data[pos + 1 : pos + 1 + count]
+                    pos += 1 + count
+                x += count
+            if x != width:
+                raise ValueError(f"{path}: run overflows row {y}")
+    return rgbe.transpose(0, 2, 1)
+
+
+def rgbe_to_float(rgbe: np.ndarray) -> np.ndarray:
+    exponent = rgbe[..., 3].astype(np.int32)
+    scale = np.where(exponent > 0, np.ldexp(np.float32(1), exponent - 136), 0).astype(np.float32)
+    return rgbe[..., :3].astype(np.float32) * scale[..., None]
+
+
+def float_to_rgbe(array: np.ndarray) -> np.ndarray:
+    brightest = array.max(axis=-1)
+    mantissa, exponent = np.frexp(brightest)
+    visible = brightest > 1e-32
+    scale = np.where(visible, mantissa * 256 / np.where(visible, brightest, 1), 0)
+    rgbe = np.zeros((*array.shape[:-1], 4), dtype=np.uint8)
+    rgbe[..., :3] = np.clip(array * scale[..., None], 0, 255).astype(np.uint8)
+    rgbe[..., 3] = np.where(visible, exponent + 128, 0)
+    return rgbe
+
+
+def write_hdr(array: np.ndarray, out_path: Path) -> None:
+    height, width = array.shape[:2]
+    rgbe = float_to_rgbe(array)
+    chunks = [b"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n", f"-Y {height} +X {width}\n".encode()]
+    for row in rgbe:
+        chunks.append(bytes((2, 2, width >> 8, width & 255)))
+        for channel in row.T:
+            chunks.append(_rle(channel))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(b"".join(chunks))
+
+
+def _rle(values: np.ndarray) -> bytes:
+    # Runs of 4+ equal bytes are encoded as runs; everything else as literals.
+    out = bytearray()
+    starts = np.flatnonzero(np.diff(values.astype(np.int16), prepend=-1))
+    lengths = np.diff(starts, append=len(values))
+    literal = bytearray()
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        if length < 4:
+            literal += values[start : start + length].tobytes()
+            continue
+        for i in range(0, len(literal), 128):
+            out += bytes((len(literal[i : i + 128]),)) + literal[i : i + 128]
+        literal.clear()
+        for i in range(0, length, 127):
+            out += bytes((128 + min(127, length - i), int(values[start])))
+    for i in range(0, len(literal), 128):
+        out += bytes((len(literal[i : i + 128]),)) + literal[i : i + 128]
+    return bytes(out)
+
+
+def row_solid_angles(height: int, width: int) -> np.ndarray:
+    """Solid angle of one pixel in each row of an equirect map."""
+    edges = np.linspace(np.pi / 2, -np.pi / 2, height + 1)
+    return (np.sin(edges[:-1]) - np.sin(edges[1:])) * (2 * np.pi / width)
+
+
+def downsample(array: np.ndarray) -> np.ndarray:
+    """Halve an equirect map, averaging 2x2 blocks by solid angle."""
+    height, width = array.shape[:2]
+    if height % 2 or width % 2:
+        raise ValueError(f"cannot halve a {width}x{height} map")
+    weights = row_solid_angles(height, width).astype(np.float32)
+    weighted = array * weights[:, None, None]
+    blocks = weighted.reshape(height // 2, 2, width // 2, 2, -1).sum(axis=(1, 3))
+    block_weights = weights.reshape(height // 2, 2).sum(axis=1) * 2
+    return blocks / block_weights[:, None, None]
+
+
+def levels(array: np.ndarray, widths: list[int] | tuple[int, ...]) -> dict[int, np.ndarray]:
+    """Area-averaged levels at each of `widths` (no wider than the source)."""
+    out = {}
+    current = array
+    for width in sorted(widths, reverse=True):
+        if width > array.shape[1]:
+            continue
+        while current.shape[1] > width:
+            current = downsample(current)
+        if current.shape[1] != width:
+            raise ValueError(f"{array.shape[1]} px wide map has no {width} px level")
+        out[width] = current
+    return out
+
+
+def rgbe_image(array: np.ndarray) -> Image.Image:
+    return array_to_image(float_to_rgbe(array))
@@ -0,0 +1,164 @@
+"""Keep-alive HTTP connections shared across download threads.
+
+`ConnectionPool.request` hands out one idle connection per (scheme, host,
+port) when available and returns it to the pool once the response body has
+been read to the end, so repeated fetches from the same host reuse a single
+TCP/TLS session. Redirects are followed, and connection failures or
+retryable statuses (429, 5xx) are retried with exponential backoff.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator
+from urllib.parse import urljoin, urlsplit
+import http.client
+import random
+import ssl
+import threading
+import time
+
+
+USER_AGENT = "Mozilla/5.0"
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (OSError, http.client.HTTPException)
+
+HostKey = tuple[str, str, int]
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        max_idle_per_host: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        max_redirects: int = 5,
+    ) -> None:
+        self.max_idle_per_host = max_idle_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._idle: dict[HostKey, list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    @contextmanager
+    def request(
+        self, url: str, headers: dict[str, str] | None = None
+    ) -> Iterator[http.client.HTTPResponse]:
+        """GET `url`, following redirects, and yield the final response.
+
+        The response may have any status; callers decide what a 304 or 404
+        means. Read the body inside the `with` block: a connection whose body
+        was not fully consumed is closed instead of being reused.
+        """
+        headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        for _ in range(self.max_redirects + 1):
+            key, target = self._split(url)
+            connection, response = self._send_with_retries(key, target, headers)
+            location = response.getheader("Location")
+            if response.status in REDIRECT_STATUSES and location:
+                response.read()
+                self._release(key, connection, response)
+                url = urljoin(url, location)
+                continue
+            try:
+                yield response
+            finally:
+                self._release(key, connection, response)
+            return
+        raise http.client.HTTPException(f"too many redirects for {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _split(self, url: str) -> tuple[HostKey, str]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        return (parts.scheme, parts.hostname or "", port), target
+
+    def _send_with_retries(
+        self, key: HostKey, target: str, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        for attempt in range(self.retries + 1):
+            final = attempt == self.retries
+            try:
+                connection, response = self._send(key, target, headers)
+            except TRANSIENT_ERRORS:
+                if final:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or final:
+                    return connection, response
+                response.read()
+                self._release(key, connection, response)
+            # Full jitter keeps concurrent workers from retrying in lockstep.
+            time.sleep(random.uniform(0, self.backoff * (2**attempt)))
+        raise AssertionError("unreachable")
+
+    def _send(
+        self, key: HostKey, target: str, headers: dict[str, str]
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        connection = self._acquire(key)
+        if connection is not None:
+            try:
+                return connection, self._roundtrip(connection, target, headers)
+            except TRANSIENT_ERRORS:
+                # The server may have dropped the idle keep-alive connection;
+                # that is not a failed attempt, so go again on a fresh one.
+                connection.close()
+        connection = self._connect(key)
+        try:
+            return connection, self._roundtrip(connection, target, headers)
+        except TRANSIENT_ERRORS:
+            connection.close()
+            raise
+
+    def _roundtrip(
+        self, connection: http.client.HTTPConnection, target: str, headers: dict[str, str]
+    ) -> http.client.HTTPResponse:
+        connection.request("GET", target, headers=headers)
+        return connection.getresponse()
+
+    def _connect(self, key: HostKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(
+                host, port, timeout=self.timeout, context=self._ssl_context
+            )
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key: HostKey) -> http.client.HTTPConnection | None:
+        with self._lock:
+            idle = self._idle.get(key)
+            return idle.pop() if idle else None
+
+    def _release(
+        self,
+        key: HostKey,
+        connection: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+    ) -> None:
+        if not response.isclosed() and response.length == 0:
+            response.read()
+        if not response.isclosed() or response.will_close:
+            connection.close()
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
@@ -0,0 +1,185 @@
+"""Decoded-image cache with memoized resizes.
+
+`ImageCache.load` decodes a source file once per (content hash, mode) and
+`ImageCache.resize` memoizes LANCZOS resizes of any image the cache handed
+out, keyed by that image's key plus the target size. `ImageCache.memo`
+holds generated images the same way, so a derivative ladder can be cut
+from one build. Entries are evicted least-recently-used once their decoded
+size passes `max_bytes`. `release` and `forget` drop a source or a memoized
+build, with everything resized from it, once the caller knows it has no
+further use for them.
+
+Cached images are shared, so callers must treat them as read-only (every
+Pillow operation the pipeline uses returns a new image). With `shared_dir`
+set, decoded pixels are also written there as `.npy` arrays and mapped back
+with `np.load(mmap_mode="r")`; worker processes pointing at the same
+directory map the same pages instead of decoding their own copies. L and
+RGBA images use the mapping directly. RGB is stored padded to RGBX, Pillow's
+in-memory layout, and converted on load, which is a copy but not a decode.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+import hashlib
+import os
+import pickle
+
+import numpy as np
+from PIL import Image
+
+from .download_cache import file_sha256
+from .fields import array_to_image
+from .tracing import TRACER, payload_bytes
+
+
+DEFAULT_MAX_BYTES = 768 << 20
+_BYTES_PER_PIXEL = {"L": 1, "RGB": 4, "RGBA": 4}
+
+ImageKey = tuple[object, ...]
+
+
+def resize_image(image: Image.Image, size: tuple[int, int]) -> Image.Image:
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+class ImageCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, shared_dir: Path | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.shared_dir = shared_dir
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[ImageKey, Image.Image] = OrderedDict()
+        self._keys: dict[int, ImageKey] = {}
+        self._file_hashes: dict[Path, tuple[int, int, str]] = {}
+
+    def load(self, path: Path, mode: str) -> Image.Image:
+        key = (self._file_hash(path), mode)
+        return self._get(key, lambda: _decode(path, mode))
+
+    def memo(self, key: ImageKey, make: Callable[[], Image.Image]) -> Image.Image:
+        """Return the image `make` builds, cached under `key` like a decoded source."""
+        return self._get(("memo",) + tuple(key), make)
+
+    def resize(self, image: Image.Image, size: tuple[int, int]) -> Image.Image:
+        """LANCZOS-resize `image`, memoized when `image` came from this cache."""
+        parent = self._keys.get(id(image))
+        if parent is None:
+            return resize_image(image, size)
+        return self._get(parent + (tuple(size),), lambda: resize_image(image, size))
+
+    def release(self, path: Path) -> int:
+        """Drop every decode of the file at `path` and their resizes; returns the bytes freed."""
+        cached = self._file_hashes.get(path)
+        if cached is None:
+            return 0
+        return self._drop(lambda key: key[0] == cached[2])
+
+    def forget(self, key: ImageKey) -> int:
+        """Drop the image `memo` cached under `key` and its resizes; returns the bytes freed."""
+        root = ("memo",) + tuple(key)
+        # A resize key is its parent's key plus a size tuple, however many resizes deep.
+        return self._drop(
+            lambda key: key[: len(root)] == root
+            and all(isinstance(part, tuple) for part in key[len(root) :])
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys.clear()
+        self.bytes = 0
+
+    def stats(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, {len(self._entries)} images, "
+            f"{self.bytes / (1 << 20):.1f} MiB resident"
+        )
+
+    def _get(self, key: ImageKey, make: Callable[[], Image.Image]) -> Image.Image:
+        image = self._entries.get(key)
+        if image is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return image
+        self.misses += 1
+        image = self._shared(key, make) if self.shared_dir is not None else make()
+        self._entries[key] = image
+        self._keys[id(image)] = key
+        self.bytes += _nbytes(image)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._keys.pop(id(evicted), None)
+            self.bytes -= _nbytes(evicted)
+        return image
+
+    def _drop(self, matches: Callable[[ImageKey], bool]) -> int:
+        freed = 0
+        for key in [key for key in self._entries if matches(key)]:
+            image = self._entries.pop(key)
+            self._keys.pop(id(image), None)
+            freed += _nbytes(image)
+        self.bytes -= freed
+        return freed
+
+    def _shared(self, key: ImageKey, make: Callable[[], Image.Image]) -> Image.Image:
+        token = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+        path = self.shared_dir / f"{token}.npy"
+        info_path = path.with_suffix(".info")
+        if not path.exists():
+            image = make()
+            if image.mode not in _BYTES_PER_PIXEL:
+                return image
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Mode and metadata (ICC profile, dpi) ride along so encoders see the same image.
+            _atomic_write(info_path, pickle.dumps((image.mode, image.info)))
+            with BytesIO() as buffer:
+                np.save(buffer, _to_array(image))
+                _atomic_write(path, buffer.getbuffer())
+        array = np.load(path, mmap_mode="r")
+        mode, info = pickle.loads(info_path.read_bytes())
+        if mode == "RGB":
+            image = array_to_image(array, "RGBX").convert("RGB")
+        else:
+            image = array_to_image(array)
+        image.info = info
+        return image
+
+    def _file_hash(self, path: Path) -> str:
+        stat = path.stat()
+        cached = self._file_hashes.get(path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        digest = file_sha256(path)
+        self._file_hashes[path] = (stat.st_size, stat.st_mtime_ns, digest)
+        return digest
+
+
+def _atomic_write(path: Path, data: bytes | memoryview) -> None:
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _decode(path: Path, mode: str) -> Image.Image:
+    with TRACER.span("decode", path.name) as span, Image.open(path) as image:
+        span.bytes_in = path.stat().st_size
+        converted = image.convert(mode)
+        span.bytes_out = payload_bytes(converted)
+        return converted
+
+
+def _to_array(image: Image.Image) -> np.ndarray:
+    if image.mode != "RGB":
+        return np.asarray(image)
+    # Pillow stores RGB as 4 bytes per pixel; padding lets it map the file as-is.
+    padded = np.full((image.height, image.width, 4), 255, dtype=np.uint8)
+    padded[..., :3] = np.asarray(image)
+    return padded
+
+
+def _nbytes(image: Image.Image) -> int:
+    return image.width * image.height * _BYTES_PER_PIXEL.get(image.mode, 4)
@@ -0,0 +1,267 @@
+"""KTX2 texture containers with offline mip chains.
+
+WebP and PNG textures have to be decoded on the main thread and mipmapped
+by the driver after upload, and they sit in GPU memory as RGBA8. A KTX2
+container holds block-compressed data for every mip level, so the runtime
+uploads it as-is and the GPU keeps it at 4 or 8 bits per pixel.
+
+`mip_chain` builds every level down to 1x1 with a 2x2 box filter in the
+space the texture is sampled in: sRGB colour is averaged in linear light
+and normals are renormalized after each step. The `save_ktx2_*` functions
+pick the block format from the texture's role (BC5 for normals, BC3 when
+there is alpha, BC1 otherwise) and are encoders in the `encoding` sense,
+so they run on the encode pool like WebP.
+
+`read_ktx2` returns enough of the header to report GPU memory against the
+uncompressed RGBA8 footprint the same texture would have had.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+import math
+import struct
+
+import numpy as np
+from PIL import Image
+
+from .bcn import BLOCK_BYTES, ENCODERS
+
+
+IDENTIFIER = b"\xabKTX 20\xbb\r\n\x1a\n"
+WRITER = "scripts/fetch-free-polish-assets.py"
+
+VK_FORMATS = {
+    ("BC1", False): 131,  # VK_FORMAT_BC1_RGB_UNORM_BLOCK
+    ("BC1", True): 132,  # VK_FORMAT_BC1_RGB_SRGB_BLOCK
+    ("BC3", False): 137,  # VK_FORMAT_BC3_UNORM_BLOCK
+    ("BC3", True): 138,  # VK_FORMAT_BC3_SRGB_BLOCK
+    ("BC5", False): 141,  # VK_FORMAT_BC5_UNORM_BLOCK
+}
+FORMAT_NAMES = {vk_format: name for (name, _), vk_format in VK_FORMATS.items()}
+
+# Khronos Data Format colour models and sample channel ids for each format.
+_DF_MODELS = {"BC1": 128, "BC3": 130, "BC5": 132}
+_DF_SAMPLES = {"BC1": (0,), "BC3": (15, 0), "BC5": (0, 1)}
+_DF_ALPHA_CHANNEL = 15
+_DF_SAMPLE_LINEAR = 0x10
+_DF_PRIMARIES_BT709 = 1
+_DF_TRANSFER_LINEAR, _DF_TRANSFER_SRGB = 1, 2
+
+
+@dataclass
+class Ktx2Info:
+    vk_format: int
+    width: int
+    height: int
+    level_bytes: list[int]
+
+    @property
+    def format_name(self) -> str:
+        return FORMAT_NAMES.get(self.vk_format, str(self.vk_format))
+
+    @property
+    def gpu_bytes(self) -> int:
+        return sum(self.level_bytes)
+
+    @property
+    def rgba8_bytes(self) -> int:
+        """GPU memory the same mip chain takes uncompressed."""
+        return sum(
+            max(1, self.width >> level) * max(1, self.height >> level) * 4
+            for level in range(len(self.level_bytes))
+        )
+
+
+def level_count(width: int, height: int) -> int:
+    return int(math.log2(max(width, height))) + 1
+
+
+def mip_chain(array: np.ndarray, kind: str) -> list[np.ndarray]:
+    """Every mip level of an (H, W, C) uint8 image, base level first.
+
+    `kind` is "srgb" (colour, averaged in linear light), "linear" (data) or
+    "normal" (tangent-space normals in RGB, renormalized per level).
+    """
+    height, width = array.shape[:2]
+    levels = [array]
+    current = _to_working(array, kind)
+    for _ in range(1, level_count(width, height)):
+        current = _halve(current)
+        if kind == "normal":
+            current = _normalize(current)
+        levels.append(_from_working(current, kind))
+    return levels
+
+
+def encode_levels(image: Image.Image, kind: str) -> tuple[str, list[bytes]]:
+    """Choose the block format for `image` and compress its whole mip chain."""
+    if kind == "normal":
+        block_format, array = "BC5", np.asarray(image.convert("RGB"))
+    elif image.mode in ("RGBA", "LA") and image.getextrema()[-1][0] < 255:
+        block_format, array = "BC3", np.asarray(image.convert("RGBA"))
+    else:
+        block_format, array = "BC1", np.asarray(image.convert("RGB"))
+    encode = ENCODERS[block_format]
+    return block_format, [encode(level) for level in mip_chain(array, kind)]
+
+
+def write_ktx2(
+    out_path: Path,
+    block_format: str,
+    srgb: bool,
+    width: int,
+    height: int,
+    levels: list[bytes],
+) -> None:
+    vk_format = VK_FORMATS[(block_format, srgb)]
+    dfd = _data_format_descriptor(block_format, srgb)
+    kvd = _key_value(b"KTXwriter", WRITER.encode("utf-8") + b"\0")
+
+    level_index_size = 24 * len(levels)
+    dfd_offset = len(IDENTIFIER) + 9 * 4 + 4 * 4 + 2 * 8 + level_index_size
+    kvd_offset = dfd_offset + len(dfd)
+    alignment = math.lcm(BLOCK_BYTES[block_format], 4)
+
+    # Level data is stored smallest mip first; the index lists base level first.
+    offset = kvd_offset + len(kvd)
+    body = bytearray()
+    placed: dict[int, int] = {}
+    for level in reversed(range(len(levels))):
+        padding = -(offset + len(body)) % alignment
+        body += b"\0" * padding
+        placed[level] = offset + len(body)
+        body += levels[level]
+
+    header = struct.pack(
+        "<9I",
+        vk_format,
+        1,  # typeSize is 1 for block-compressed formats
+        width,
+        height,
+        0,  # pixelDepth
+        0,  # layerCount
+        1,  # faceCount
+        len(levels),
+        0,  # supercompressionScheme: none
+    )
+    index = struct.pack("<4I2Q", dfd_offset, len(dfd), kvd_offset, len(kvd), 0, 0)
+    level_index = b"".join(
+        struct.pack("<3Q", placed[level], len(data), len(data)) for level, data in enumerate(levels)
+    )
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_suffix(f"{out_path.suffix}.tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(IDENTIFIER + header + index + level_index + dfd + kvd)
+        handle.write(body)
+    tmp_path.replace(out_path)
+
+
+def read_ktx2(path: Path) -> Ktx2Info:
+    with path.open("rb") as handle:
+        head = handle.read(len(IDENTIFIER) + 9 * 4 + 4 * 4 + 2 * 8)
+        if head[: len(IDENTIFIER)] != IDENTIFIER:
+            raise ValueError(f"{path} is not a KTX2 file")
+        vk_format, _, width, height, _, _, _, levels, _ = struct.unpack_from(
+            "<9I", head, len(IDENTIFIER)
+        )
+        level_index = handle.read(24 * max(levels, 1))
+    level_bytes = [
+        struct.unpack_from("<3Q", level_index, 24 * level)[1] for level in range(max(levels, 1))
+    ]
+    return Ktx2Info(vk_format, width, height, level_bytes)
+
+
+def save_ktx2(image: Image.Image, out_path: Path, kind: str) -> None:
+    block_format, levels = encode_levels(image, kind)
+    write_ktx2(out_path, block_format, kind == "srgb", image.width, image.height, levels)
+
+
+def save_ktx2_srgb(image: Image.Image, out_path: Path) -> None:
+    save_ktx2(image, out_path, "srgb")
+
+
+def save_ktx2_linear(image: Image.Image, out_path: Path) -> None:
+    save_ktx2(image, out_path, "linear")
+
+
+def save_ktx2_normal(image: Image.Image, out_path: Path) -> None:
+    save_ktx2(image, out_path, "normal")
+
+
+def _data_format_descriptor(block_format: str, srgb: bool) -> bytes:
+    samples = b""
+    for position, channel in enumerate(_DF_SAMPLES[block_format]):
+        qualifiers = _DF_SAMPLE_LINEAR if srgb and channel == _DF_ALPHA_CHANNEL else 0
+        samples += struct.pack(
+            "<HBB4BII", position * 64, 63, channel | qualifiers, 0, 0, 0, 0, 0, 0xFFFFFFFF
+        )
+    block_size = 24 + len(samples)
+    block = struct.pack(
+        "<IHH4B4B8B",
+        0,  # vendorId 0 (Khronos), descriptorType 0 (basic)
+        2,  # versionNumber
+        block_size,
+        _DF_MODELS[block_format],
+        _DF_PRIMARIES_BT709,
+        _DF_TRANSFER_SRGB if srgb else _DF_TRANSFER_LINEAR,
+        0,  # straight alpha
+        3,  # texelBlockDimension is stored minus one: 4x4x1x1
+        3,
+        0,
+        0,
+        BLOCK_BYTES[block_format],
+        *(0,) * 7,
+    )
+    return struct.pack("<I", 4 + block_size) + block + samples
+
+
+def _key_value(key: bytes, value: bytes) -> bytes:
+    entry = key + b"\0" + value
+    return struct.pack("<I", len(entry)) + entry + b"\0" * (-len(entry) % 4)
+
+
+def _to_working(array: np.ndarray, kind: str) -> np.ndarray:
+    values = array.astype(np.float32) / 255
+    if kind == "srgb":
+        values[..., :3] = _srgb_to_linear(values[..., :3])
+    elif kind == "normal":
+        values = _normalize(values * 2 - 1)
+    return values
+
+
+def _from_working(values: np.ndarray, kind: str) -> np.ndarray:
+    if kind == "srgb":
+        values = values.copy()
+        values[..., :3] = _linear_to_srgb(values[..., :3])
+    elif kind == "normal":
+        values = (values + 1) / 2
+    return np.rint(np.clip(values, 0, 1) * 255).astype(np.uint8)
+
+
+def _halve(values: np.ndarray) -> np.ndarray:
+    """2x2 box filter; odd trailing rows and columns are dropped, as GL sizes round down."""
+    height, width = values.shape[:2]
+    if height > 1:
+        values = (values[0 : height & ~1 : 2] + values[1 : height & ~1 : 2]) / 2
+    if width > 1:
+        values = (values[:, 0 : width & ~1 : 2] + values[:, 1 : width & ~1 : 2]) / 2
+    return values
+
+
+def _normalize(values: np.ndarray) -> np.ndarray:
+    normals = values[..., :3]
+    length = np.linalg.norm(normals, axis=-1, keepdims=True)
+    values = values.copy()
+    values[..., :3] = np.where(length > 1e-6, normals / np.maximum(length, 1e-6), (0, 0, 1))
+    return values
+
+
+def _srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(values: np.ndarray) -> np.ndarray:
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
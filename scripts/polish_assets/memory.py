@@ -0,0 +1,95 @@
+"""Resident set size of this process, without third-party dependencies.
+
+`current_rss` and `peak_rss` read /proc on Linux, `getrusage` on macOS
+(which has no cheap current figure, so the peak stands in for it) and
+`GetProcessMemoryInfo` on Windows. `reset_peak` clears the kernel's
+high-water mark where Linux allows it (`/proc/self/clear_refs`), so a
+measurement's peak is not hidden by what ran before it. Elsewhere it
+returns False and the peak covers the whole process lifetime. `trim` asks
+glibc to hand freed heap pages back to the kernel. Without that, memory
+freed by dropping images can stay resident and still count against RSS.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+
+_STATUS = Path("/proc/self/status")
+
+
+def current_rss() -> int:
+    if sys.platform == "win32":
+        return _windows_counters().WorkingSetSize
+    if _STATUS.exists():
+        return _status_kib("VmRSS") << 10
+    return peak_rss()
+
+
+def peak_rss() -> int:
+    if sys.platform == "win32":
+        return _windows_counters().PeakWorkingSetSize
+    if _STATUS.exists():
+        return _status_kib("VmHWM") << 10
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak << 10
+
+
+def reset_peak() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def trim() -> bool:
+    """Return free heap pages to the kernel where glibc is present; False where it is not."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+        libc.malloc_trim(0)
+    except (OSError, AttributeError):
+        return False
+    return True
+
+
+def _status_kib(field: str) -> int:
+    for line in _STATUS.read_text(encoding="ascii").splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1])
+    raise ValueError(f"{field} missing from {_STATUS}")
+
+
+def _windows_counters():  # pragma: no cover - exercised on Windows only
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        raise OSError(ctypes.get_last_error(), "GetProcessMemoryInfo failed")
+    return counters
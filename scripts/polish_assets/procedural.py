@@ -0,0 +1,430 @@
+"""Procedural textures described as JSON layer stacks and rendered as array kernels.
+
+A spec names the output size, the output mode ("RGB" or "RGBA") and a
+list of layers. Each layer is drawn in order onto a premultiplied float32
+RGBA canvas. Most layers are a weight field (coverage times alpha) and a
+colour, composited with one array-wide "over":
+
+- `fill`: the whole canvas in one colour.
+- `gradient`: a `linear` ramp between colour stops along x or y, or a
+  `radial` blend from `fields.radial_gradient_field` (center, aspect,
+  power, darkness).
+- `band`: a strip across the canvas with exact anti-aliased edges.
+  `steps` > 1 nests narrower bands inside it, with alpha falling off by
+  (step / steps) ** `falloff`.
+- `stripes`: whole-pixel lines every `period` pixels, for scanline-style
+  patterns.
+- `rays`: `count` evenly spaced rays from `inner` to a random length in
+  `outer`, with a random width and alpha per ray, drawn from the named RNG
+  stream. Each pixel is shaded by its nearest ray only, which holds while
+  rays are narrower than their spacing.
+- `image`: a named input image, resized and optionally blurred, stamped
+  at fractional positions.
+
+Three layers act on the canvas itself:
+
+- `noise`: multiplies colour by 1 - strength * u, where u is uniform
+  noise from the named stream.
+- `blur`: a Gaussian blur of the premultiplied canvas (`blur.gaussian_blur`,
+  so `method` can be "pyramid"). Blurring premultiplied colour avoids
+  dark fringes at transparent edges.
+- `tint`: maps luminance between a `black` and a `white` colour and keeps
+  alpha.
+
+Lengths are fractions of the canvas: x and y positions of width and
+height, band widths of the axis they cross, and ray and image sizes of the
+short side. Stripe periods and widths are in pixels. Colours are 0-255
+RGBA. An "RGB" result is the canvas composited over black.
+
+Until a layer varies in both directions, the canvas is kept as a single
+pixel, a column or a row that broadcasts over the image. A scanline or
+banded texture is drawn, blurred and converted as one line of pixels and
+only expanded to full size at the end. Pillow's blur clamps at the
+edges, so a blurred profile is exactly a profile of the blurred image.
+The canvas is narrowed the same way across channels: while all four
+premultiplied channels are equal, as they are for white layers over
+transparency, it holds one channel and is blurred as a single "L" band.
+A blur leaves the canvas as the Pillow image it blurred, and an opaque
+radial gradient as an image of its field's bytes; either is turned back
+into floats only if a later layer draws on it.
+
+`render_batch` renders a list of specs in one pass. Specs of the same size
+share one `_Grid`, which keeps the coordinate axes and the polar and
+radial fields it has computed, so the variants of a texture reuse the
+same kernels.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+import json
+import math
+
+import numpy as np
+from PIL import Image
+
+from .blur import blur_footprint, gaussian_blur
+from .fields import array_to_image, radial_gradient_field
+from .image_cache import resize_image
+from .rng import stream as rng_stream
+from .stamps import composite_over, premultiply, to_image
+
+
+SPEC_VERSION = 1
+MODES = ("RGB", "RGBA")
+LAYERS = ("fill", "gradient", "band", "stripes", "rays", "image", "noise", "blur", "tint")
+_SPEC_KEYS = {"output", "width", "height", "mode", "inputs", "layers"}
+# ITU-R 601 luma, as Pillow's "L" conversion uses.
+_LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def load_specs(path: Path) -> dict[str, dict[str, Any]]:
+    """The `textures` of a spec file, checked by `validate`."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("version") != SPEC_VERSION:
+        raise ValueError(f"{path}: unsupported procedural spec version {data.get('version')!r}")
+    specs = data["textures"]
+    for name, spec in specs.items():
+        validate(spec, name)
+    return specs
+
+
+def validate(spec: Mapping[str, Any], name: str = "spec") -> None:
+    unknown = set(spec) - _SPEC_KEYS
+    if unknown:
+        raise ValueError(f"{name}: unknown keys {sorted(unknown)}")
+    for key in ("width", "height", "layers"):
+        if key not in spec:
+            raise ValueError(f"{name}: missing {key!r}")
+    if spec.get("mode", "RGBA") not in MODES:
+        raise ValueError(f"{name}: mode must be one of {', '.join(MODES)}")
+    for index, layer in enumerate(spec["layers"]):
+        if layer.get("op") not in LAYERS:
+            raise ValueError(f"{name}: layer {index} has unknown op {layer.get('op')!r}")
+
+
+def render(
+    spec: Mapping[str, Any], images: Mapping[str, Image.Image] | None = None, seed: int = 0
+) -> Image.Image:
+    return render_batch([spec], images, seed)[0]
+
+
+def render_batch(
+    specs: Sequence[Mapping[str, Any]],
+    images: Mapping[str, Image.Image] | None = None,
+    seed: int = 0,
+) -> list[Image.Image]:
+    grids: dict[tuple[int, int], _Grid] = {}
+    results = []
+    for spec in specs:
+        validate(spec)
+        size = (spec["width"], spec["height"])
+        grid = grids.get(size)
+        if grid is None:
+            grid = grids[size] = _Grid(*size)
+        canvas = np.zeros((1, 1, 1), dtype=np.float32)
+        for layer in spec["layers"]:
+            canvas = _apply(canvas, grid, layer, images or {}, seed)
+        results.append(_finish(canvas, grid, spec.get("mode", "RGBA")))
+    return results
+
+
+class _Grid:
+    """Pixel-centre coordinates of one canvas size, and the fields computed from them."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.short = min(width, height)
+        self.across = np.arange(width, dtype=np.float32) + 0.5
+        self.down = np.arange(height, dtype=np.float32) + 0.5
+        self._fields: dict[tuple[Any, ...], Any] = {}
+
+    def polar(self, center: Sequence[float]) -> tuple[np.ndarray, np.ndarray]:
+        """Radius in pixels and angle in [-pi, pi] of every pixel centre around `center`."""
+        key = ("polar", *center)
+        if key not in self._fields:
+            dx = self.across[np.newaxis, :] - center[0] * self.width
+            dy = self.down[:, np.newaxis] - center[1] * self.height
+            radius = np.sqrt(np.square(dx) + np.square(dy))
+            self._fields[key] = (radius, np.arctan2(dy, dx))
+        return self._fields[key]
+
+    def radial(self, layer: Mapping[str, Any]) -> np.ndarray:
+        """The layer's straight RGBA radial field as bytes; shared, so not to be written."""
+        key = ("radial", json.dumps(layer, sort_keys=True))
+        if key not in self._fields:
+            self._fields[key] = radial_gradient_field(
+                self.width,
+                self.height,
+                inner=tuple(layer["inner"]),
+                outer=tuple(layer["outer"]),
+                center=tuple(layer.get("center", (0.5, 0.5))),
+                aspect=layer.get("aspect", 1.0),
+                power=layer.get("power", 1.0),
+                darkness=layer.get("darkness", 1.0),
+            )
+        return self._fields[key]
+
+
+def _apply(
+    canvas: np.ndarray | Image.Image,
+    grid: _Grid,
+    layer: Mapping[str, Any],
+    images: Mapping[str, Image.Image],
+    seed: int,
+) -> np.ndarray | Image.Image:
+    """The canvas after `layer`; it may be a new array, broadcast to a larger shape, or an image."""
+    op = layer["op"]
+    if op == "blur":
+        return _blur(canvas, layer)
+    if isinstance(canvas, Image.Image):
+        canvas = _to_float(canvas)
+    if op == "fill":
+        return _over(canvas, np.ones((1, 1), dtype=np.float32), layer["color"])
+    if op == "gradient":
+        return _gradient(canvas, grid, layer)
+    if op == "band":
+        return _band(canvas, grid, layer)
+    if op == "stripes":
+        return _stripes(canvas, grid, layer)
+    if op == "rays":
+        return _rays(canvas, grid, layer, seed)
+    if op == "image":
+        return _image(canvas, grid, layer, images)
+    if op == "noise":
+        return _noise(canvas, grid, layer, seed)
+    return _tint(canvas, layer)
+
+
+def _full(canvas: np.ndarray, grid: _Grid) -> np.ndarray:
+    return np.ascontiguousarray(np.broadcast_to(canvas, (grid.height, grid.width, 4)))
+
+
+def _over(canvas: np.ndarray, weight: np.ndarray, color: Sequence[float]) -> np.ndarray:
+    """Straight `color` composited over the canvas with per-pixel `weight` (coverage x alpha)."""
+    if len(color) > 3:
+        weight = weight * (color[3] / 255)
+    if canvas.shape[2] == 1 and all(channel == 255 for channel in color[:3]):
+        # Opaque white is 1 in every channel, so a one-channel canvas stays one channel.
+        return _blend(canvas, weight[..., np.newaxis], np.float32(1))
+    target = np.append(np.asarray(color[:3], dtype=np.float32) * (1 / 255), np.float32(1))
+    return _blend(canvas, weight[..., np.newaxis], target)
+
+
+def _blend(canvas: np.ndarray, weight: np.ndarray, target: np.ndarray) -> np.ndarray:
+    # Premultiplied "over" of opaque `target` at `weight`: canvas + weight * (target - canvas).
+    # While the canvas is a profile, the difference is too, and only the product is full size.
+    result = weight * (target - canvas)
+    result += canvas
+    return result
+
+
+def _interval(centres: np.ndarray, low: float, high: float) -> np.ndarray:
+    """Fraction of each unit pixel around `centres` that lies inside [low, high]."""
+    return np.clip(np.minimum(centres + 0.5, high) - np.maximum(centres - 0.5, low), 0, 1)
+
+
+def _along(grid: _Grid, axis: str) -> tuple[np.ndarray, int, tuple[slice | None, ...]]:
+    if axis == "x":
+        return grid.across, grid.width, (np.newaxis, slice(None))
+    if axis == "y":
+        return grid.down, grid.height, (slice(None), np.newaxis)
+    raise ValueError(f"axis must be 'x' or 'y', not {axis!r}")
+
+
+def _gradient(
+    canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any]
+) -> np.ndarray | Image.Image:
+    kind = layer.get("kind", "linear")
+    if kind == "radial":
+        if layer["inner"][3] == layer["outer"][3] == 255:
+            # Opaque everywhere: the gradient replaces whatever was under it.
+            return array_to_image(grid.radial(layer))
+        field = grid.radial(layer).astype(np.float32)
+        field *= 1 / 255
+    elif kind == "linear":
+        centres, length, expand = _along(grid, layer.get("axis", "x"))
+        positions = [stop[0] for stop in layer["stops"]]
+        colors = np.array([stop[1] for stop in layer["stops"]], dtype=np.float32) * (1 / 255)
+        field = np.stack(
+            [np.interp(centres / length, positions, colors[:, channel]) for channel in range(4)],
+            axis=-1,
+        ).astype(np.float32)[expand]
+    else:
+        raise ValueError(f"gradient kind must be 'linear' or 'radial', not {kind!r}")
+    # The field is straight RGBA; its alpha is the weight of its opaque colour.
+    target = field.copy()
+    target[..., 3] = 1
+    return _blend(canvas, field[..., 3:], target)
+
+
+def _band(canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any]) -> np.ndarray:
+    centres, length, expand = _along(grid, layer.get("axis", "y"))
+    center = layer.get("center", 0.5) * length
+    half_width = layer["half_width"] * length
+    steps = layer.get("steps", 1)
+    falloff = layer.get("falloff", 1.0)
+    for step in range(steps, 0, -1):
+        fraction = step / steps
+        reach = half_width * fraction
+        coverage = _interval(centres, center - reach, center + reach) * fraction**falloff
+        canvas = _over(canvas, coverage[expand], layer["color"])
+    return canvas
+
+
+def _stripes(canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any]) -> np.ndarray:
+    _, length, expand = _along(grid, layer.get("axis", "y"))
+    phase = (np.arange(length) - layer.get("offset", 0)) % layer["period"]
+    coverage = (phase < layer.get("thickness", 1)).astype(np.float32)
+    return _over(canvas, coverage[expand], layer["color"])
+
+
+def _rays(canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any], seed: int) -> np.ndarray:
+    rng = rng_stream(seed, layer["stream"])
+    count = layer["count"]
+    outer_low, outer_high = layer["outer"]
+    # Per ray: tip + 0.5, half width + 0.5 and alpha.
+    rays = np.empty((3, count), dtype=np.float32)
+    for ray in range(count):
+        rays[0, ray] = (outer_low + rng.random() * (outer_high - outer_low)) * grid.short + 0.5
+        rays[2, ray] = rng.randint(*layer["alpha"]) / 255
+        rays[1, ray] = rng.randint(*layer["width"]) / 2 + 0.5
+    radius, angle = grid.polar(layer.get("center", (0.5, 0.5)))
+    spacing = 2 * math.pi / count
+    offset = angle * np.float32(1 / spacing)
+    nearest = np.rint(offset)
+    offset -= nearest
+    offset *= np.float32(spacing)
+    across = np.sin(offset)
+    np.abs(across, out=across)
+    across *= radius
+    # Only pixels within the widest half width of their nearest ray's centre line are shaded.
+    shaded = np.flatnonzero(across < rays[1].max())
+    radius, offset, across = radius.ravel()[shaded], offset.ravel()[shaded], across.ravel()[shaded]
+    # Angles in [-pi, pi] round to rays -reach..reach; the tables repeat around the circle
+    # so that the shifted index needs no modulo.
+    reach = count // 2 + 1
+    rays = rays[:, np.arange(-reach, reach + 1) % count]
+    index = nearest.ravel()[shaded].astype(np.intp)
+    index += reach
+    along = np.cos(offset, out=offset)
+    along *= radius
+    # Coverage across the ray, then from `inner` out along it, then up to its tip.
+    coverage = rays[1][index]
+    coverage -= across
+    np.clip(coverage, 0, 1, out=coverage)
+    inner = np.float32(layer["inner"] * grid.short - 0.5)
+    coverage *= np.clip(along - inner, 0, 1, out=across)
+    tip = rays[0][index]
+    tip -= along
+    coverage *= np.clip(tip, 0, 1, out=tip)
+    coverage *= rays[2][index]
+    weight = np.zeros(angle.shape, dtype=np.float32)
+    weight.ravel()[shaded] = coverage
+    return _over(canvas, weight, layer.get("color", (255, 255, 255, 255)))
+
+
+def _image(
+    canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any], images: Mapping[str, Image.Image]
+) -> np.ndarray:
+    name = layer["input"]
+    if name not in images:
+        raise ValueError(f"image layer needs input {name!r}")
+    side = max(1, round(layer["size"] * grid.short))
+    spots = [
+        (int(x * grid.width) - side // 2, int(y * grid.height) - side // 2) for x, y in layer["at"]
+    ]
+    # Only the part of the stamp that lands on the canvas somewhere is drawn.
+    box = (
+        max(0, min(-left for left, _ in spots)),
+        max(0, min(-top for _, top in spots)),
+        min(side, max(grid.width - left for left, _ in spots)),
+        min(side, max(grid.height - top for _, top in spots)),
+    )
+    canvas = _full(canvas, grid)
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return canvas
+    stamp = resize_image(images[name].convert("RGBA"), (side, side))
+    # That part is blurred with the blur's reach around it, as `tiles.tiled` cuts a tile, so
+    # it matches the same crop of the whole blurred stamp.
+    sigma, method = layer.get("blur"), layer.get("method", "exact")
+    halo, align = blur_footprint(sigma, method) if sigma else (0, 1)
+    padded = (
+        max(0, (box[0] - halo) // align * align),
+        max(0, (box[1] - halo) // align * align),
+        min(side, -(-(box[2] + halo) // align) * align),
+        min(side, -(-(box[3] + halo) // align) * align),
+    )
+    stamp = stamp.crop(padded)
+    if sigma:
+        stamp = gaussian_blur(stamp, sigma, method)
+    left, top = box[0] - padded[0], box[1] - padded[1]
+    tile = premultiply(stamp.crop((left, top, left + box[2] - box[0], top + box[3] - box[1])))
+    for x, y in spots:
+        composite_over(canvas, tile, x + box[0], y + box[1])
+    return canvas
+
+
+def _noise(canvas: np.ndarray, grid: _Grid, layer: Mapping[str, Any], seed: int) -> np.ndarray:
+    generator = np.random.default_rng(rng_stream(seed, layer["stream"]).getrandbits(64))
+    noise = generator.random((grid.height, grid.width), dtype=np.float32)
+    noise *= -layer.get("strength", 1.0)
+    noise += 1
+    canvas = _full(canvas, grid)
+    canvas[..., :3] *= noise[..., np.newaxis]
+    return canvas
+
+
+def _blur(canvas: np.ndarray | Image.Image, layer: Mapping[str, Any]) -> Image.Image:
+    if not isinstance(canvas, Image.Image):
+        if canvas.shape[:2] == (1, 1):
+            return canvas
+        # Pillow blurs each band on its own: a blur of premultiplied bytes is a premultiplied blur.
+        canvas = _bytes_image(canvas)
+    # A one-pixel profile has nothing to gain from the pyramid.
+    method = layer.get("method", "exact") if 1 not in canvas.size else "exact"
+    return gaussian_blur(canvas, layer["sigma"], method)
+
+
+def _tint(canvas: np.ndarray, layer: Mapping[str, Any]) -> np.ndarray:
+    canvas = np.broadcast_to(canvas, (*canvas.shape[:2], 4))
+    alpha = canvas[..., 3:]
+    straight = np.divide(canvas[..., :3], alpha, out=np.zeros_like(canvas[..., :3]), where=alpha > 0)
+    luma = (straight @ _LUMA)[..., np.newaxis]
+    black = np.asarray(layer["black"][:3], dtype=np.float32) * (1 / 255)
+    white = np.asarray(layer["white"][:3], dtype=np.float32) * (1 / 255)
+    tinted = canvas.copy()
+    tinted[..., :3] = (black + luma * (white - black)) * alpha
+    return tinted
+
+
+def _finish(canvas: np.ndarray | Image.Image, grid: _Grid, mode: str) -> Image.Image:
+    # Converted at the canvas's own (possibly profile) size, then widened by a nearest resize.
+    if mode == "RGBA":
+        if isinstance(canvas, Image.Image):
+            canvas = _to_float(canvas)
+        image = to_image(np.broadcast_to(canvas, (*canvas.shape[:2], 4)))
+    else:
+        # Premultiplied colour is already the canvas composited over black.
+        image = canvas if isinstance(canvas, Image.Image) else _bytes_image(canvas)
+        image = image.convert("RGB")
+    if image.size != (grid.width, grid.height):
+        image = image.resize((grid.width, grid.height), Image.Resampling.NEAREST)
+    return image
+
+
+def _bytes_image(canvas: np.ndarray) -> Image.Image:
+    """The canvas as bytes: "L" for one channel, "RGBA" (premultiplied) for four."""
+    scaled = canvas * 255
+    scaled += 0.5
+    np.clip(scaled, 0, 255, out=scaled)
+    quantized = scaled.astype(np.uint8)
+    return array_to_image(quantized[..., 0] if quantized.shape[2] == 1 else quantized)
+
+
+def _to_float(image: Image.Image) -> np.ndarray:
+    canvas = np.asarray(image, dtype=np.float32)
+    canvas *= 1 / 255
+    return canvas.reshape(image.height, image.width, -1)
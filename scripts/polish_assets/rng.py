@@ -0,0 +1,20 @@
+"""Named random streams for the procedural generators.
+
+A generator drawing from the global `random` module gets values that
+depend on whatever drew before it, so its output changes with build order
+and cannot be produced in another process. `stream(seed, name)` gives
+each generator a `random.Random` of its own, seeded from a hash of the run
+seed and the generator's name. Its draws then depend only on those two
+values, and a build comes out byte-identical on one worker or many, in any
+completion order.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+
+
+def stream(seed: int, name: str) -> random.Random:
+    digest = hashlib.sha256(f"{seed}:{name}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest, "big"))
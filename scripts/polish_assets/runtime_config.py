@@ -0,0 +1,56 @@
+"""Read runtime budgets and tiers from the app's TypeScript config.
+
+The pipeline reports against the numbers the app enforces, so it reads them
+from `src/config` rather than keeping copies. The config files are plain
+object literals; these helpers parse just the shapes they need and raise
+`ValueError` if the shape changes, instead of reporting against stale data.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import re
+
+
+_NUMBER_FIELD = re.compile(r"(\w+):\s*(-?[\d.]+)\s*,")
+_TIER_BLOCK = re.compile(r"(\w+):\s*\{([^{}]*)\}")
+_TIER_TEXTURE_SET = re.compile(r"tier:\s*'(\w+)',\s*textureSet:\s*'(\w+)'")
+_TEXTURE_SET_TYPE = re.compile(r"export type TextureSet =([^\n]*)")
+_TEXTURE_SET_NAME = re.compile(r"'(\d+)(k?)'")
+
+
+def technical_budgets(path: Path) -> dict[str, dict[str, float]]:
+    """`TECHNICAL_BUDGETS` from heroTransitionBeats.ts, keyed by tier."""
+    source = path.read_text(encoding="utf-8")
+    match = re.search(r"export const TECHNICAL_BUDGETS = \{(.*?)\n\} as const", source, re.S)
+    if match is None:
+        raise ValueError(f"TECHNICAL_BUDGETS not found in {path}")
+    budgets = {
+        tier: {name: float(value) for name, value in _NUMBER_FIELD.findall(body + ",")}
+        for tier, body in _TIER_BLOCK.findall(match.group(1))
+    }
+    if not budgets:
+        raise ValueError(f"TECHNICAL_BUDGETS in {path} has no tiers")
+    return budgets
+
+
+def texture_sets(path: Path) -> dict[str, str]:
+    """Base `textureSet` of each device tier from visualProfiles.ts."""
+    sets = dict(_TIER_TEXTURE_SET.findall(path.read_text(encoding="utf-8")))
+    if not sets:
+        raise ValueError(f"no tier textureSet entries found in {path}")
+    return sets
+
+
+def texture_set_sides(path: Path) -> dict[str, int]:
+    """Long side in pixels of every `TextureSet` in visualProfiles.ts ('2k' -> 2048)."""
+    match = _TEXTURE_SET_TYPE.search(path.read_text(encoding="utf-8"))
+    if match is None:
+        raise ValueError(f"TextureSet type not found in {path}")
+    sides = {
+        number + kilo: int(number) * (1024 if kilo else 1)
+        for number, kilo in _TEXTURE_SET_NAME.findall(match.group(1))
+    }
+    if not sides:
+        raise ValueError(f"TextureSet in {path} has no sizes")
+    return sides
@@ -0,0 +1,96 @@
+"""Offline lighting terms for equirect environment maps.
+
+`project_sh` integrates a map into 9 L2 spherical-harmonic coefficients per
+colour channel: a sum over every pixel of radiance times basis function
+times the pixel's solid angle. The basis, its order and the direction
+convention are three.js's (`SphericalHarmonics3.getBasisAt`, equirect
+`u = atan2(z, x)`, `v = asin(y)`), so the coefficients load straight into a
+`LightProbe`, whose shader applies the cosine-lobe convolution to turn them
+into irradiance. `irradiance` does the same on the CPU.
+
+`prefilter_specular` convolves a small copy of the map with a normalized
+Phong lobe per roughness, a cheap stand-in for a PMREM level that needs
+no GPU pass at load time.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+# Cosine-lobe convolution per SH band (Ramamoorthi and Hanrahan 2001).
+BAND_FACTORS = np.array([np.pi] + [2 * np.pi / 3] * 3 + [np.pi / 4] * 5)
+_CHUNK = 256
+
+
+def equirect_directions(height: int, width: int) -> tuple[np.ndarray, np.ndarray]:
+    """Unit direction (h, w, 3) at each pixel centre and each pixel's solid angle (h, w)."""
+    u = (np.arange(width) + 0.5) / width
+    v = 1 - (np.arange(height) + 0.5) / height
+    phi = (u - 0.5) * 2 * np.pi
+    latitude = (v - 0.5) * np.pi
+    cos_lat = np.cos(latitude)[:, None]
+    directions = np.stack(
+        np.broadcast_arrays(
+            cos_lat * np.cos(phi)[None, :],
+            np.sin(latitude)[:, None],
+            cos_lat * np.sin(phi)[None, :],
+        ),
+        axis=-1,
+    )
+    edges = np.linspace(np.pi / 2, -np.pi / 2, height + 1)
+    row_angles = (np.sin(edges[:-1]) - np.sin(edges[1:])) * (2 * np.pi / width)
+    return directions, np.broadcast_to(row_angles[:, None], (height, width))
+
+
+def sh_basis(directions: np.ndarray) -> np.ndarray:
+    directions = np.asarray(directions, dtype=np.float64)
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+    return np.stack(
+        [
+            np.full_like(x, 0.282095),
+            0.488603 * y,
+            0.488603 * z,
+            0.488603 * x,
+            1.092548 * x * y,
+            1.092548 * y * z,
+            0.315392 * (3 * z * z - 1),
+            1.092548 * x * z,
+            0.546274 * (x * x - y * y),
+        ],
+        axis=-1,
+    )
+
+
+def project_sh(array: np.ndarray) -> np.ndarray:
+    """L2 SH coefficients (9, 3) of an equirect radiance map."""
+    directions, solid_angles = equirect_directions(*array.shape[:2])
+    weighted = array.astype(np.float64) * solid_angles[..., None]
+    return np.einsum("hwk,hwc->kc", sh_basis(directions), weighted)
+
+
+def irradiance(coefficients: np.ndarray, normals: np.ndarray) -> np.ndarray:
+    """Irradiance at unit `normals` (..., 3) from radiance SH `coefficients` (9, 3)."""
+    return sh_basis(normals) @ (coefficients * BAND_FACTORS[:, None])
+
+
+def phong_exponent(roughness: float) -> float:
+    alpha = max(roughness, 0.05) ** 2
+    return 2 / alpha**2 - 2
+
+
+def prefilter_specular(array: np.ndarray, width: int, roughness: float) -> np.ndarray:
+    """Equirect map `width` px wide, each pixel the lobe-weighted mean of `array` around it."""
+    height = width // 2
+    source_directions, source_angles = equirect_directions(*array.shape[:2])
+    source = source_directions.reshape(-1, 3)
+    radiance = array.reshape(-1, 3).astype(np.float64) * source_angles.reshape(-1, 1)
+    angles = source_angles.reshape(-1)
+    exponent = phong_exponent(roughness)
+    targets = equirect_directions(height, width)[0].reshape(-1, 3)
+    out = np.empty((len(targets), 3))
+    for start in range(0, len(targets), _CHUNK):
+        cosines = targets[start : start + _CHUNK] @ source.T
+        lobe = np.where(cosines > 0, np.abs(cosines) ** exponent, 0)
+        out[start : start + _CHUNK] = (lobe @ radiance) / (lobe @ angles)[:, None]
+    return out.reshape(height, width, 3).astype(np.float32)
@@ -0,0 +1,88 @@
+"""Bounded-memory execution of a build graph run.
+
+By default a run keeps decoded sources and memoized builds in the image
+cache until its LRU byte cap pushes them out. That can happen long after
+the last node that needed them has finished. `Stream` is given the nodes a
+run is about to build, in order. It finds the last of them to use each
+cached object, such as an input file or a texture's memoized full-size
+build; a `keys(node)` callback names these objects. `BuildGraph.run` calls
+`done(node)` after every build, and whatever that node was the last user
+of is released right away.
+
+With `max_rss` set, `BuildGraph.run` also checks `over_cap` before every
+build. Over the cap, it first waits for the saves it handed to the encoder
+pool, since each pending save holds its image until it is encoded. It then
+calls `shed`, which drops every cache, collects garbage and trims the heap.
+Nodes still build one at a time in dependency order, so the cap bounds what
+is held between builds. A single generator's own working set is not split.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable
+import gc
+
+from .memory import current_rss, peak_rss, reset_peak, trim
+
+if TYPE_CHECKING:
+    from .build_graph import Node
+
+
+def last_uses(
+    nodes: Iterable[Node], keys: Callable[[Node], Iterable[Hashable]]
+) -> dict[int, list[Hashable]]:
+    """For each node's id, the keys it uses that no later node in `nodes` does."""
+    last: dict[Hashable, int] = {}
+    for node in nodes:
+        for key in keys(node):
+            last[key] = id(node)
+    by_node: dict[int, list[Hashable]] = {}
+    for key, node_id in last.items():
+        by_node.setdefault(node_id, []).append(key)
+    return by_node
+
+
+class Stream:
+    def __init__(
+        self,
+        keys: Callable[[Node], Iterable[Hashable]],
+        release: Callable[[Hashable], int],
+        shed: Callable[[], None],
+        max_rss: int | None = None,
+    ) -> None:
+        self.keys = keys
+        self.release = release
+        self.max_rss = max_rss
+        self.released_bytes = 0
+        self.sheds = 0
+        self._shed = shed
+        self._last: dict[int, list[Hashable]] = {}
+        self._peak_reset = False
+
+    def plan(self, nodes: Iterable[Node]) -> None:
+        """Start a run that builds `nodes` in this order."""
+        self._last = last_uses(nodes, self.keys)
+        self._peak_reset = reset_peak()
+
+    def done(self, node: Node) -> None:
+        for key in self._last.pop(id(node), ()):
+            self.released_bytes += self.release(key)
+
+    def over_cap(self) -> bool:
+        return self.max_rss is not None and current_rss() > self.max_rss
+
+    def shed(self) -> None:
+        self._shed()
+        gc.collect()
+        trim()
+        self.sheds += 1
+
+    def summary(self) -> str:
+        cap = "" if self.max_rss is None else f", cap {self.max_rss / (1 << 20):.0f} MiB"
+        # Where the kernel's high-water mark cannot be reset, it includes the downloads.
+        scope = "" if self._peak_reset else " (whole process)"
+        return (
+            f"peak RSS {peak_rss() / (1 << 20):.1f} MiB{scope}{cap}, "
+            f"{self.released_bytes / (1 << 20):.1f} MiB released after last use, "
+            f"caches shed {self.sheds} times"
+        )
@@ -0,0 +1,110 @@
+"""Tiled image operations with halos, run on a thread pool.
+
+`tiled(operation, *images, halo=...)` cuts the canvas into squares of
+`tile` pixels. For each square it crops every input with `halo` extra
+pixels on each side, clamped at the canvas edges, and calls `operation` on
+the crops. The margin is then cut off the result and the square is pasted
+into the output. A square's pixels match what `operation` gives for the
+whole canvas wherever the operation reads no further than `halo` pixels
+from the pixel it writes. Pointwise operations such as a multiply, a tint
+or an alpha map need no halo, and `blur.blur_footprint` gives the reach of
+a blur. A tile at the canvas edge stops where the canvas does, so the
+edge handling is the same as in the whole-image call.
+
+Chaining several steps in one `operation` keeps every intermediate at tile
+size; only the inputs and the output exist at full size. The tiles run on
+a thread pool of `workers` threads (default: one per CPU). Pillow releases
+the GIL inside its filters, resamplers and point operations, so the tiles
+of one image spread across cores. With `align`, tile origins and their
+halos land on multiples of `align`, which keeps a pyramid's reduced grid
+the same as the whole image's.
+
+The tiled result matches the whole-image call exactly wherever the halo
+covers the operation's reach. For the pipeline's blurs, `blur_footprint`
+gives that reach and tests/pipeline/test_tiles.py checks the match.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+import math
+import os
+
+from PIL import Image
+
+
+DEFAULT_TILE = 512
+
+Box = tuple[int, int, int, int]
+
+
+def tile_boxes(
+    size: tuple[int, int], tile: int = DEFAULT_TILE, halo: int = 0, align: int = 1
+) -> Iterator[tuple[Box, Box]]:
+    """(square, cropped) boxes covering `size`, row by row; the crop adds the halo."""
+    width, height = size
+    tile = math.ceil(tile / align) * align
+    halo = math.ceil(halo / align) * align
+    for top in range(0, height, tile):
+        for left in range(0, width, tile):
+            square = (left, top, min(left + tile, width), min(top + tile, height))
+            cropped = (
+                max(0, left - halo),
+                max(0, top - halo),
+                min(width, square[2] + halo),
+                min(height, square[3] + halo),
+            )
+            yield square, cropped
+
+
+def tiled(
+    operation: Callable[..., Image.Image],
+    *images: Image.Image,
+    halo: int = 0,
+    align: int = 1,
+    tile: int = DEFAULT_TILE,
+    workers: int | None = None,
+) -> Image.Image:
+    """`operation(*images)`, computed one halo-padded tile at a time."""
+    size = images[0].size
+    if any(image.size != size for image in images):
+        raise ValueError(f"tiled inputs differ in size: {[image.size for image in images]}")
+    boxes = list(tile_boxes(size, tile, halo, align))
+    if len(boxes) == 1:
+        return operation(*images)
+
+    def run(boxes: tuple[Box, Box]) -> tuple[Box, Image.Image]:
+        square, cropped = boxes
+        result = operation(*(image.crop(cropped) for image in images))
+        left, top = cropped[:2]
+        return square, result.crop(
+            (square[0] - left, square[1] - top, square[2] - left, square[3] - top)
+        )
+
+    out = None
+    with ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+        for square, result in executor.map(run, boxes):
+            if out is None:
+                out = Image.new(result.mode, size)
+            out.paste(result, square[:2])
+    return out
+
+
+class Tiler:
+    """`tiled` with the tile size and worker count fixed for a run."""
+
+    def __init__(self, tile: int = DEFAULT_TILE, workers: int | None = None) -> None:
+        self.tile = tile
+        self.workers = workers
+
+    def __call__(
+        self,
+        operation: Callable[..., Image.Image],
+        *images: Image.Image,
+        halo: int = 0,
+        align: int = 1,
+    ) -> Image.Image:
+        return tiled(
+            operation, *images, halo=halo, align=align, tile=self.tile, workers=self.workers
+        )
@@ -0,0 +1,179 @@
+"""Span tracing for pipeline runs, exportable as a Chrome trace.
+
+`TRACER` is off until `enable()` is called. While it is off, `span()`
+returns one shared no-op span, so instrumented code pays a method call
+and a flag check per span. When it is on, each span records:
+
+- its wall time, process and thread;
+- the change in resident set size across it;
+- the bytes in and out that the instrumented code sets on it.
+
+Spans nest by time, so a generate span contains the decode spans it caused.
+
+Work done in pool processes is added after the fact with `record`, using
+the start time and duration the worker reports back. `time.perf_counter`
+is a system-wide monotonic clock, so worker times line up with the
+parent's.
+
+`write_chrome_trace` writes the trace-event JSON that chrome://tracing
+and Perfetto load. `summary` totals the spans per stage.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import json
+import os
+import threading
+import time
+
+from PIL import Image
+
+from .memory import current_rss
+
+
+@dataclass
+class Span:
+    category: str
+    name: str
+    start: float
+    pid: int
+    tid: int
+    seconds: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    rss_delta: int | None = None
+
+
+class _LiveSpan:
+    def __init__(self, tracer: Tracer, span: Span) -> None:
+        self._tracer = tracer
+        self._span = span
+        self._rss = 0
+
+    def __enter__(self) -> Span:
+        self._rss = current_rss()
+        self._span.start = time.perf_counter()
+        return self._span
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._span.seconds = time.perf_counter() - self._span.start
+        self._span.rss_delta = current_rss() - self._rss
+        self._tracer.spans.append(self._span)
+
+
+class _NullSpan:
+    # Shared by every span while tracing is off; attribute writes land here and are ignored.
+    bytes_in = 0
+    bytes_out = 0
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.origin = 0.0
+        self.spans: list[Span] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.spans = []
+
+    def span(self, category: str, name: str, bytes_in: int = 0) -> Any:
+        """Context manager timing one stage; set `bytes_out` (and `bytes_in`) on what it yields."""
+        if not self.enabled:
+            return _NULL_SPAN
+        span = Span(category, name, 0.0, os.getpid(), threading.get_native_id(), bytes_in=bytes_in)
+        return _LiveSpan(self, span)
+
+    def record(
+        self,
+        category: str,
+        name: str,
+        start: float,
+        seconds: float,
+        pid: int,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+    ) -> None:
+        """Add a span timed elsewhere, e.g. in a pool process."""
+        if self.enabled:
+            self.spans.append(Span(category, name, start, pid, 0, seconds, bytes_in, bytes_out))
+
+    def write_chrome_trace(self, path: Path) -> None:
+        main = os.getpid()
+        events: list[dict[str, Any]] = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "args": {"name": "pipeline" if pid == main else f"worker {pid}"},
+            }
+            for pid in sorted({span.pid for span in self.spans} | {main})
+        ]
+        for span in self.spans:
+            args: dict[str, Any] = {"bytes_in": span.bytes_in, "bytes_out": span.bytes_out}
+            if span.rss_delta is not None:
+                args["rss_delta_kib"] = span.rss_delta >> 10
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - self.origin) * 1e6, 1),
+                    "dur": round(span.seconds * 1e6, 1),
+                    "pid": span.pid,
+                    "tid": span.tid,
+                    "args": args,
+                }
+            )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        path.write_text(json.dumps(trace), encoding="utf-8")
+
+    def summary(self, slowest: int = 5) -> list[str]:
+        """Per-stage totals (inclusive of nested spans), then the slowest spans."""
+        stages: dict[str, list[Span]] = {}
+        for span in self.spans:
+            stages.setdefault(span.category, []).append(span)
+        lines = [
+            f"{'stage':<10} {'spans':>6} {'total s':>9} {'max s':>8} "
+            f"{'MB in':>9} {'MB out':>9} {'max RSS +MiB':>13}"
+        ]
+        for category, spans in sorted(stages.items(), key=lambda item: -_total(item[1])):
+            deltas = [span.rss_delta for span in spans if span.rss_delta is not None]
+            growth = f"{max(deltas) / (1 << 20):13.1f}" if deltas else f"{'-':>13}"
+            lines.append(
+                f"{category:<10} {len(spans):>6} {_total(spans):>9.2f} "
+                f"{max(span.seconds for span in spans):>8.2f} "
+                f"{sum(span.bytes_in for span in spans) / 1e6:>9.2f} "
+                f"{sum(span.bytes_out for span in spans) / 1e6:>9.2f} {growth}"
+            )
+        for span in sorted(self.spans, key=lambda span: -span.seconds)[:slowest]:
+            lines.append(f"{'slowest':<10} {span.seconds:>6.2f} s  {span.category}  {span.name}")
+        return lines
+
+
+def _total(spans: list[Span]) -> float:
+    return sum(span.seconds for span in spans)
+
+
+def payload_bytes(value: Any) -> int:
+    """Uncompressed size of a build result, for spans' bytes in/out."""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    return 0
+
+
+TRACER = Tracer()
@@ -9,6 +9,10 @@ import { TourStopsSection } from '../../sections/TourStopsSection'
 import { FeaturedStoriesSection } from '../../sections/FeaturedStoriesSection'
 import { PlaceholderNextSection } from '../../sections/PlaceholderNextSection'
 import { useReducedMotion } from '../../three/hooks/useReducedMotion'
+import {
+  AtlasSpritesContext,
+  useAtlasSpriteTextures,
+} from '../../three/hooks/useAtlasSprites'
 import { useDeviceTier } from '../../three/hooks/useDeviceTier'
 import { tourStops } from '../../data/tourStops'
 import { featuredStories } from '../../data/featuredStories'
@@ -49,6 +53,8 @@ function smoothstep(value: number, edge0: number, edge1: number) {
 export function PageShell() {
   const reducedMotion = useReducedMotion()
   const deviceTier = useDeviceTier()
+  // Loaded here, above the scene switch, so the atlas survives hero -> transition.
+  const atlasSprites = useAtlasSpriteTextures()
   const polishV2Enabled =
     import.meta.env.VITE_HERO_TRANSITION_POLISH_V2 !== 'false'
   const [heroProgress, setHeroProgress] = useState(0)
@@ -222,7 +228,9 @@ export function PageShell() {
         >
           <color attach="background" args={['#05070d']} />
           <Suspense fallback={null}>
-            {activeScene}
+            <AtlasSpritesContext.Provider value={atlasSprites}>
+              {activeScene}
+            </AtlasSpritesContext.Provider>
             <ScenePostFx
               enabled={postFxEnabled}
               section={postFxSection}
@@ -8,7 +8,7 @@ import {
 import { HERO_AB_TUNING } from './heroABTuning'
 
 export type DeviceTierKey = 'low' | 'mid' | 'high'
-export type TextureSet = '1k' | '2k'
+export type TextureSet = '512' | '1k' | '2k'
 
 export type PostFxProfile = {
   enabled: boolean
@@ -249,7 +249,8 @@ export function resolveVisualProfile(
   }
 
   if (options.isMobile) {
-    profile.textureSet = '1k'
+    // Cap at 1k without lifting a tier that already loads smaller rungs.
+    profile.textureSet = profile.textureSet === '2k' ? '1k' : profile.textureSet
     profile.particleCap = Math.min(profile.particleCap, TECHNICAL_BUDGETS.low.particleCap)
     profile.allowPostFx = false
     profile.postFx.enabled = false
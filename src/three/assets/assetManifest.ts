@@ -1,4 +1,5 @@
 import type { TextureSet } from '../../config/visualProfiles'
+import textureTiers from '../../assets/textures/texture_tiers.json'
 
 export type AssetKind =
   | 'texture'
@@ -26,7 +27,9 @@ export type AssetKey =
   | 'glow_soft'
   | 'light_streak'
   | 'confetti_atlas'
+  | 'sprite_atlas'
   | 'waveform_mask'
+  | 'waveform_flipbook'
   | 'noise_tile'
   | 'haze_plate_a'
   | 'haze_plate_b'
@@ -144,12 +147,26 @@ export const ASSET_MANIFEST: Record<AssetKey, AssetEntry> = {
     path: '/src/assets/sprites/confetti_atlas.png',
     optional: true,
   },
+  sprite_atlas: {
+    key: 'sprite_atlas',
+    kind: 'sprite',
+    path: '/src/assets/sprites/sprite_atlas.png',
+    optional: true,
+    notes: 'Packed dust/glow/streak/confetti sprites; UV rects in sprite_atlas.json.',
+  },
   waveform_mask: {
     key: 'waveform_mask',
     kind: 'texture',
     path: '/src/assets/textures/transition/waveform_mask.webp',
     optional: true,
   },
+  waveform_flipbook: {
+    key: 'waveform_flipbook',
+    kind: 'texture',
+    path: '/src/assets/textures/transition/waveform_flipbook.webp',
+    optional: true,
+    notes: '16 looping 1024x64 waveform frames stacked top to bottom; WaveformLines steps through them.',
+  },
   noise_tile: {
     key: 'noise_tile',
     kind: 'texture',
@@ -258,18 +275,12 @@ export function getAssetPath(key: AssetKey) {
   return ASSET_MANIFEST[key].path
 }
 
+// Generated by scripts/fetch-free-polish-assets.py: for every texture, the rung each
+// texture set loads (its own size or the next larger one that exists).
+const TEXTURE_VARIANTS: Record<string, Partial<Record<TextureSet, string>>> =
+  textureTiers.variants
+
 export function getTextureVariantPath(key: AssetKey, textureSet: TextureSet) {
   const base = getAssetPath(key)
-  if (textureSet === '2k') {
-    return base
-  }
-
-  if (base.includes('/textures/')) {
-    const extensionIndex = base.lastIndexOf('.')
-    if (extensionIndex > -1) {
-      return `${base.slice(0, extensionIndex)}_1k${base.slice(extensionIndex)}`
-    }
-  }
-
-  return base
+  return TEXTURE_VARIANTS[base]?.[textureSet] ?? base
 }
@@ -0,0 +1,30 @@
+import spriteAtlasRects from '../../assets/sprites/sprite_atlas.json'
+
+export type SpriteKey =
+  | 'dust_soft'
+  | 'dust_sharp'
+  | 'glow_soft'
+  | 'light_streak'
+  | 'confetti_atlas'
+
+export type SpriteRect = {
+  frame: number[]
+  rotated: boolean
+  offset: number[]
+  repeat: number[]
+  rotation: number
+}
+
+export type SpriteAtlas = {
+  width: number
+  height: number
+  gutter: number
+  sprites: Record<SpriteKey, SpriteRect>
+}
+
+// Generated by scripts/fetch-free-polish-assets.py alongside sprite_atlas.png.
+export const SPRITE_ATLAS: SpriteAtlas = spriteAtlasRects
+
+export function getSpriteRect(key: SpriteKey) {
+  return SPRITE_ATLAS.sprites[key]
+}
@@ -1,5 +1,5 @@
 import { useFrame } from '@react-three/fiber'
-import { useMemo, useRef } from 'react'
+import { useEffect, useMemo, useRef } from 'react'
 import {
   AdditiveBlending,
   MathUtils,
@@ -12,8 +12,14 @@ type WaveformLinesProps = {
   intensity: number
   reducedMotion: boolean
   maskTexture?: Texture | null
+  flipbookTexture?: Texture | null
 }
 
+// waveform_flipbook.webp holds WAVEFORM_FRAMES (scripts/fetch-free-polish-assets.py) frames of
+// one loop, stacked top to bottom.
+const FLIPBOOK_FRAMES = 16
+const FLIPBOOK_FPS = 12
+
 type WaveLine = {
   y: number
   z: number
@@ -25,6 +31,7 @@ export function WaveformLines({
   intensity,
   reducedMotion,
   maskTexture,
+  flipbookTexture,
 }: WaveformLinesProps) {
   const lineRefs = useRef<Mesh[]>([])
   const lines = useMemo<WaveLine[]>(
@@ -38,6 +45,28 @@ export function WaveformLines({
     [],
   )
 
+  const lineMasks = useMemo(() => {
+    if (!flipbookTexture) {
+      return null
+    }
+
+    return lines.map(() => {
+      // Clones share the strip's image, so all lines sample one upload at their own frame.
+      const texture = flipbookTexture.clone()
+      texture.repeat.set(1, 1 / FLIPBOOK_FRAMES)
+      texture.needsUpdate = true
+      return texture
+    })
+  }, [flipbookTexture, lines])
+
+  useEffect(() => {
+    return () => {
+      for (const texture of lineMasks ?? []) {
+        texture.dispose()
+      }
+    }
+  }, [lineMasks])
+
   useFrame((state, delta) => {
     const elapsed = state.clock.elapsedTime
     const swayAmplitude = reducedMotion ? 0.01 : 0.018 + intensity * 0.085
@@ -68,34 +97,47 @@ export function WaveformLines({
 
       const material = mesh.material as MeshBasicMaterial
       material.opacity = opacityBase * (1 - index * 0.09)
+
+      const lineMask = lineMasks?.[index]
+      if (lineMask) {
+        const start = Math.round((config.phase / (Math.PI * 2)) * FLIPBOOK_FRAMES)
+        const frame = reducedMotion
+          ? start % FLIPBOOK_FRAMES
+          : (start + Math.floor(elapsed * FLIPBOOK_FPS)) % FLIPBOOK_FRAMES
+        // Frame 0 is the top of the strip; texture v runs bottom to top.
+        lineMask.offset.y = 1 - (frame + 1) / FLIPBOOK_FRAMES
+      }
     }
   })
 
   return (
     <group>
-      {lines.map((line, index) => (
-        <mesh
-          key={index}
-          position={[0, line.y, line.z]}
-          ref={(mesh) => {
-            if (mesh) {
-              lineRefs.current[index] = mesh
-            }
-          }}
-        >
-          <planeGeometry args={[line.width, 0.03]} />
-          <meshBasicMaterial
-            color="#8fcbff"
-            transparent
-            opacity={0.08}
-            map={maskTexture ?? undefined}
-            alphaMap={maskTexture ?? undefined}
-            alphaTest={maskTexture ? 0.02 : 0}
-            blending={AdditiveBlending}
-            depthWrite={false}
-          />
-        </mesh>
-      ))}
+      {lines.map((line, index) => {
+        const mask = lineMasks?.[index] ?? maskTexture ?? undefined
+        return (
+          <mesh
+            key={index}
+            position={[0, line.y, line.z]}
+            ref={(mesh) => {
+              if (mesh) {
+                lineRefs.current[index] = mesh
+              }
+            }}
+          >
+            <planeGeometry args={[line.width, 0.03]} />
+            <meshBasicMaterial
+              color="#8fcbff"
+              transparent
+              opacity={0.08}
+              map={mask}
+              alphaMap={mask}
+              alphaTest={mask ? 0.02 : 0}
+              blending={AdditiveBlending}
+              depthWrite={false}
+            />
+          </mesh>
+        )
+      })}
     </group>
   )
 }
@@ -0,0 +1,54 @@
+import { createContext, useContext, useEffect, useMemo } from 'react'
+import type { Texture } from 'three'
+import { getAssetPath } from '../assets/assetManifest'
+import { SPRITE_ATLAS, type SpriteKey } from '../assets/spriteAtlas'
+import { useOptionalTexture } from './useOptionalTexture'
+
+export type AtlasSprites = Record<SpriteKey, Texture>
+
+const ATLAS_OPTIONS = { mipmaps: false }
+
+// Provided above the scene switch, so the hero and transition scenes share one
+// load, decode and upload of the atlas page instead of each loading it on mount.
+export const AtlasSpritesContext = createContext<AtlasSprites | null>(null)
+
+export function useAtlasSpriteTextures(): AtlasSprites | null {
+  // The 4 px gutters only keep sprites apart down to mip level 2, and the point
+  // sprites that sample the page are a few pixels wide, so it is sampled unmipped.
+  const atlas = useOptionalTexture(getAssetPath('sprite_atlas'), ATLAS_OPTIONS)
+
+  const sprites = useMemo(() => {
+    if (!atlas) {
+      return null
+    }
+
+    const entries = Object.entries(SPRITE_ATLAS.sprites).map(([key, rect]) => {
+      // Clones share the atlas image, so every sprite is one upload and one bind.
+      const texture = atlas.clone()
+      texture.offset.set(rect.offset[0], rect.offset[1])
+      texture.repeat.set(rect.repeat[0], rect.repeat[1])
+      texture.center.set(0, 0)
+      texture.rotation = rect.rotation
+      texture.needsUpdate = true
+      return [key, texture]
+    })
+
+    return Object.fromEntries(entries) as AtlasSprites
+  }, [atlas])
+
+  useEffect(() => {
+    return () => {
+      if (sprites) {
+        for (const texture of Object.values(sprites)) {
+          texture.dispose()
+        }
+      }
+    }
+  }, [sprites])
+
+  return sprites
+}
+
+export function useAtlasSprites(): AtlasSprites | null {
+  return useContext(AtlasSpritesContext)
+}
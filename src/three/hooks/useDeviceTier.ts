@@ -1,4 +1,5 @@
 import { useEffect, useState } from 'react'
+import type { TextureSet } from '../../config/visualProfiles'
 
 export type DeviceTier = 'low' | 'mid' | 'high'
 
@@ -9,7 +10,7 @@ export type DeviceTierState = {
   particleMultiplier: number
   allowHeavyEffects: boolean
   allowPostFx: boolean
-  textureSet: '1k' | '2k'
+  textureSet: TextureSet
   particleCap: number
 }
 
@@ -1,9 +1,17 @@
 import { useEffect, useState } from 'react'
-import { RepeatWrapping, SRGBColorSpace, Texture, TextureLoader } from 'three'
+import {
+  LinearFilter,
+  RepeatWrapping,
+  SRGBColorSpace,
+  Texture,
+  TextureLoader,
+} from 'three'
 
 type OptionalTextureOptions = {
   srgb?: boolean
   repeat?: [number, number]
+  // false samples the base level only, for atlases whose gutters do not survive mips.
+  mipmaps?: boolean
 }
 
 export function useOptionalTexture(
@@ -41,6 +49,11 @@ export function useOptionalTexture(
           nextTexture.repeat.set(options.repeat[0], options.repeat[1])
         }
 
+        if (options?.mipmaps === false) {
+          nextTexture.generateMipmaps = false
+          nextTexture.minFilter = LinearFilter
+        }
+
         loadedTexture = nextTexture
         setLoaded({ src, texture: nextTexture })
       },
@@ -63,7 +76,7 @@ export function useOptionalTexture(
         loadedTexture.dispose()
       }
     }
-  }, [src, options?.srgb, options?.repeat])
+  }, [src, options?.srgb, options?.repeat, options?.mipmaps])
 
   if (!src) {
     return null
@@ -22,8 +22,9 @@ import {
 } from '../../config/heroTransitionBeats'
 import { HERO_AB_TUNING } from '../../config/heroABTuning'
 import type { VisualProfile } from '../../config/visualProfiles'
-import { getAssetPath, getTextureVariantPath } from '../assets/assetManifest'
+import { getTextureVariantPath } from '../assets/assetManifest'
 import { DustParticles } from '../effects/DustParticles'
+import { useAtlasSprites } from '../hooks/useAtlasSprites'
 import type { DeviceTier } from '../hooks/useDeviceTier'
 import { useOptionalTexture } from '../hooks/useOptionalTexture'
 
@@ -144,24 +145,40 @@ export function HeroScene({
   const floorAo = useOptionalTexture(
     getTextureVariantPath('tunnel_floor_ao', visualProfile.textureSet),
   )
-  const portalGradient = useOptionalTexture(getAssetPath('portal_gradient'), {
-    srgb: true,
-  })
+  const portalGradient = useOptionalTexture(
+    getTextureVariantPath('portal_gradient', visualProfile.textureSet),
+    { srgb: true },
+  )
   const stadiumCrowdPlate = useOptionalTexture(
     getTextureVariantPath('stadium_crowd_plate', visualProfile.textureSet),
     { srgb: true },
   )
-  const ceilingStrip = useOptionalTexture(getAssetPath('ceiling_emissive_strip'), {
-    srgb: true,
-  })
-  const hazePlateA = useOptionalTexture(getAssetPath('haze_plate_a'), { srgb: true })
-  const hazePlateB = useOptionalTexture(getAssetPath('haze_plate_b'), { srgb: true })
-  const grimeAtlas = useOptionalTexture(getAssetPath('grime_decal_atlas'), { srgb: true })
-  const noiseTile = useOptionalTexture(getAssetPath('noise_tile'))
-  const radialBurstMask = useOptionalTexture(getAssetPath('radial_burst_mask'))
-  const dustSoftTexture = useOptionalTexture(getAssetPath('dust_soft'))
-  const dustSharpTexture = useOptionalTexture(getAssetPath('dust_sharp'))
-  const glowTexture = useOptionalTexture(getAssetPath('glow_soft'))
+  const ceilingStrip = useOptionalTexture(
+    getTextureVariantPath('ceiling_emissive_strip', visualProfile.textureSet),
+    { srgb: true },
+  )
+  const hazePlateA = useOptionalTexture(
+    getTextureVariantPath('haze_plate_a', visualProfile.textureSet),
+    { srgb: true },
+  )
+  const hazePlateB = useOptionalTexture(
+    getTextureVariantPath('haze_plate_b', visualProfile.textureSet),
+    { srgb: true },
+  )
+  const grimeAtlas = useOptionalTexture(
+    getTextureVariantPath('grime_decal_atlas', visualProfile.textureSet),
+    { srgb: true },
+  )
+  const noiseTile = useOptionalTexture(
+    getTextureVariantPath('noise_tile', visualProfile.textureSet),
+  )
+  const radialBurstMask = useOptionalTexture(
+    getTextureVariantPath('radial_burst_mask', visualProfile.textureSet),
+  )
+  const atlasSprites = useAtlasSprites()
+  const dustSoftTexture = atlasSprites?.dust_soft ?? null
+  const dustSharpTexture = atlasSprites?.dust_sharp ?? null
+  const glowTexture = atlasSprites?.glow_soft ?? null
 
   useEffect(() => {
     const anisotropyCap = Math.min(8, gl.capabilities.getMaxAnisotropy())
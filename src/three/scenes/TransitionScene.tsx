@@ -7,11 +7,12 @@ import {
   getCurrentBeat,
 } from '../../config/heroTransitionBeats'
 import type { VisualProfile } from '../../config/visualProfiles'
-import { getAssetPath } from '../assets/assetManifest'
+import { getTextureVariantPath } from '../assets/assetManifest'
 import { ConfettiParticles } from '../effects/ConfettiParticles'
 import { EnergyParticles } from '../effects/EnergyParticles'
 import { LightStreaks } from '../effects/LightStreaks'
 import { WaveformLines } from '../effects/WaveformLines'
+import { useAtlasSprites } from '../hooks/useAtlasSprites'
 import { useOptionalTexture } from '../hooks/useOptionalTexture'
 
 type TransitionSceneProps = {
@@ -65,11 +66,21 @@ export function TransitionScene({
 }: TransitionSceneProps) {
   const { camera, scene } = useThree()
 
-  const lightStreakTexture = useOptionalTexture(getAssetPath('light_streak'))
-  const confettiTexture = useOptionalTexture(getAssetPath('confetti_atlas'))
-  const waveformMask = useOptionalTexture(getAssetPath('waveform_mask'))
-  const radialBurstMask = useOptionalTexture(getAssetPath('radial_burst_mask'))
-  const noiseTile = useOptionalTexture(getAssetPath('noise_tile'))
+  const atlasSprites = useAtlasSprites()
+  const lightStreakTexture = atlasSprites?.light_streak ?? null
+  const confettiTexture = atlasSprites?.confetti_atlas ?? null
+  const waveformMask = useOptionalTexture(
+    getTextureVariantPath('waveform_mask', visualProfile.textureSet),
+  )
+  const waveformFlipbook = useOptionalTexture(
+    getTextureVariantPath('waveform_flipbook', visualProfile.textureSet),
+  )
+  const radialBurstMask = useOptionalTexture(
+    getTextureVariantPath('radial_burst_mask', visualProfile.textureSet),
+  )
+  const noiseTile = useOptionalTexture(
+    getTextureVariantPath('noise_tile', visualProfile.textureSet),
+  )
 
   const clampedProgress = MathUtils.clamp(progress, 0, 1)
   const beat = getCurrentBeat(TRANSITION_BEATS, clampedProgress)
@@ -167,6 +178,7 @@ export function TransitionScene({
         intensity={intensity}
         reducedMotion={reducedMotion}
         maskTexture={waveformMask}
+        flipbookTexture={waveformFlipbook}
       />
 
       <mesh rotation={[-Math.PI / 2, 0, 0]} position={[0, -1.8, -12]}>
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+import hashlib
+import importlib.util
+import sys
+import threading
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[2] / "scripts"
+sys.path.insert(0, str(SCRIPTS))
+
+
+@dataclass
+class StandInServer:
+    """Local HTTP stand-in for the asset hosts: serves `files` with ETags.
+
+    `failures[name]` makes the next N requests for `name` answer 503, and
+    `redirects` maps a name to the name it redirects to, and `cut_after[name]`
+    drops the connection after that many body bytes on the next response.
+    Range requests guarded by a matching If-Range get a 206. `connections`
+    records the client address of every request and `statuses` the status
+    of every response.
+    """
+
+    files: dict[str, bytes] = field(default_factory=dict)
+    failures: dict[str, int] = field(default_factory=dict)
+    redirects: dict[str, str] = field(default_factory=dict)
+    cut_after: dict[str, int] = field(default_factory=dict)
+    requests: list[tuple[str, dict[str, str]]] = field(default_factory=list)
+    connections: list[tuple[str, int]] = field(default_factory=list)
+    statuses: list[int] = field(default_factory=list)
+    base_url: str = ""
+    httpd: ThreadingHTTPServer | None = None
+
+    def url(self, name: str) -> str:
+        return f"{self.base_url}/{name}"
+
+    def etag(self, name: str) -> str:
+        return '"' + hashlib.sha256(self.files[name]).hexdigest()[:16] + '"'
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def _handler_for(server: StandInServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            name = self.path.lstrip("/")
+            server.requests.append((name, dict(self.headers)))
+            server.connections.append(self.client_address)
+            if server.failures.get(name, 0) > 0:
+                server.failures[name] -= 1
+                self._empty(503)
+                return
+            if name in server.redirects:
+                self._empty(302, Location=f"/{server.redirects[name]}")
+                return
+            if name not in server.files:
+                self._empty(404)
+                return
+            etag = server.etag(name)
+            if self.headers.get("If-None-Match") == etag:
+                self._empty(304, ETag=etag)
+                return
+            body = memoryview(server.files[name])
+            total = len(body)
+            start = 0
+            range_header = self.headers.get("Range")
+            if range_header and self.headers.get("If-Range") in (None, etag):
+                start = int(range_header.removeprefix("bytes=").split("-")[0])
+            status = 206 if start else 200
+            server.statuses.append(status)
+            self.send_response(status)
+            self.send_header("ETag", etag)
+            if start:
+                self.send_header("Content-Range", f"bytes {start}-{total - 1}/{total}")
+            self.send_header("Content-Length", str(total - start))
+            self.end_headers()
+            cut = server.cut_after.pop(name, None)
+            if cut is not None:
+                self.wfile.write(body[start : start + cut])
+                self.close_connection = True
+                return
+            self.wfile.write(body[start:])
+
+        def _empty(self, status: int, **headers: str) -> None:
+            server.statuses.append(status)
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    return Handler
+
+
+@pytest.fixture
+def stand_in_server() -> StandInServer:
+    server = StandInServer()
+    server.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(server))
+    server.base_url = f"http://127.0.0.1:{server.httpd.server_address[1]}"
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def pipeline() -> ModuleType:
+    """`fetch-free-polish-assets.py` as a module, for tests of its node builders.
+
+    It is registered in `sys.modules` so its functions pickle by name and
+    forked build workers can run them.
+    """
+    name = "fetch_free_polish_assets"
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / "fetch-free-polish-assets.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    yield module
+    del sys.modules[name]
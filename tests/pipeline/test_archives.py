@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from io import BytesIO
+import zipfile
+
+from PIL import Image
+import pytest
+
+from polish_assets.archives import ArchiveIndex, MaterialArchive
+
+
+def jpeg(color: tuple[int, int, int]) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (32, 32), color).save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+COLORS = {
+    "Color": (200, 120, 40),
+    "NormalGL": (128, 128, 255),
+    "Roughness": (90, 90, 90),
+    "AmbientOcclusion": (230, 230, 230),
+}
+
+
+@pytest.fixture
+def pack(tmp_path):
+    path = tmp_path / "Concrete013_2K-JPG.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("Concrete013.png", b"preview")
+        for i, (channel, color) in enumerate(COLORS.items()):
+            compression = zipfile.ZIP_STORED if i % 2 else zipfile.ZIP_DEFLATED
+            archive.writestr(f"Concrete013_2K-JPG_{channel}.jpg", jpeg(color), compression)
+    return path
+
+
+def test_channels_map_to_members(pack):
+    with MaterialArchive(pack) as archive:
+        assert sorted(archive.members) == sorted(COLORS)
+        with pytest.raises(FileNotFoundError):
+            archive.member("Displacement")
+
+
+def test_decode_many_handles_stored_and_deflated_members(pack):
+    with MaterialArchive(pack) as archive:
+        decoded = archive.decode_many(COLORS)
+    assert list(decoded) == list(COLORS)
+    for channel, color in COLORS.items():
+        pixel = decoded[channel].convert("RGB").getpixel((16, 16))
+        assert all(abs(a - b) <= 3 for a, b in zip(pixel, color))
+
+
+def test_index_decodes_wanted_channels_in_one_pass(pack, monkeypatch):
+    index = ArchiveIndex()
+    for channel in ("Color", "Roughness"):
+        index.want(pack, channel)
+    opened = []
+    original = MaterialArchive.decode_many
+    monkeypatch.setattr(
+        MaterialArchive,
+        "decode_many",
+        lambda self, channels: opened.append(sorted(channels)) or original(self, channels),
+    )
+
+    color = index.take(pack, "Color")
+    roughness = index.take(pack, "Roughness", mode="L")
+    index.close()
+
+    assert opened == [["Color", "Roughness"]]
+    assert color.mode == "RGB" and roughness.mode == "L"
+
+
+def test_channel_wanted_twice_is_decoded_once(pack, monkeypatch):
+    index = ArchiveIndex()
+    index.want(pack, "AmbientOcclusion")
+    index.want(pack, "AmbientOcclusion")
+    decodes = []
+    original = MaterialArchive.decode
+    monkeypatch.setattr(
+        MaterialArchive, "decode", lambda self, channel: decodes.append(channel) or original(self, channel)
+    )
+
+    first = index.take(pack, "AmbientOcclusion")
+    second = index.take(pack, "AmbientOcclusion")
+    index.take(pack, "AmbientOcclusion")
+    index.close()
+
+    assert first is second
+    assert decodes == ["AmbientOcclusion", "AmbientOcclusion"]
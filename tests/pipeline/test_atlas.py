@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from polish_assets.atlas import ALIGN, compose, pack, uv_rects
+
+
+SPRITE_SIZES = {
+    "dust_soft": (256, 256),
+    "dust_sharp": (256, 256),
+    "glow_soft": (512, 512),
+    "light_streak": (1024, 128),
+    "confetti_atlas": (1024, 1024),
+}
+
+
+def three_uv(rect: dict, u: float, v: float) -> tuple[float, float]:
+    """three.js Matrix3.setUvTransform applied to (u, v), as the runtime does."""
+    (tx, ty), (sx, sy), rotation = rect["offset"], rect["repeat"], rect["rotation"]
+    c, s = math.cos(rotation), math.sin(rotation)
+    return sx * c * u + sx * s * v + tx, -sy * s * u + sy * c * v + ty
+
+
+def sprite(width: int, height: int, seed: int) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (height, width, 4), dtype=np.uint8), "RGBA")
+
+
+def test_layout_fits_smallest_page_without_overlap():
+    gutter = 4
+    layout = pack(SPRITE_SIZES, gutter=gutter)
+
+    assert (layout.width, layout.height) == (2048, 1024)
+    assert layout.placements["light_streak"].rotated
+    frames = [placement.frame for placement in layout.placements.values()]
+    for x, y, w, h in frames:
+        assert x % ALIGN == 0 and y % ALIGN == 0
+        assert 0 <= x and x + w <= layout.width and 0 <= y and y + h <= layout.height
+    for i, (ax, ay, aw, ah) in enumerate(frames):
+        for bx, by, bw, bh in frames[i + 1 :]:
+            # Gutters included, sprites keep at least 2 * gutter between them.
+            separated = (
+                ax + aw + 2 * gutter <= bx
+                or bx + bw + 2 * gutter <= ax
+                or ay + ah + 2 * gutter <= by
+                or by + bh + 2 * gutter <= ay
+            )
+            assert separated
+
+
+def test_uv_rects_map_sprite_uvs_onto_their_pixels():
+    sizes = {"wide": (40, 12), "square": (16, 16), "tall": (8, 36)}
+    sprites = {name: sprite(*size, seed) for seed, (name, size) in enumerate(sizes.items())}
+    layout = pack(sizes, max_size=64)
+    page = np.asarray(compose(layout, sprites))
+    rects = uv_rects(layout)
+    assert any(placement.rotated for placement in layout.placements.values())
+
+    for name, image in sprites.items():
+        pixels = np.asarray(image)
+        for px, py in ((0, 0), (image.width - 1, 0), (3, image.height - 1), (5, 7)):
+            # Pixel centre in the sprite's own UVs (origin bottom-left, like flipY textures).
+            u, v = (px + 0.5) / image.width, 1 - (py + 0.5) / image.height
+            atlas_u, atlas_v = three_uv(rects[name], u, v)
+            ax = int(atlas_u * layout.width)
+            ay = int((1 - atlas_v) * layout.height)
+            assert (page[ay, ax] == pixels[py, px]).all(), (name, px, py)
+
+
+def test_gutters_repeat_edge_pixels():
+    sprites = {"a": sprite(12, 8, 1), "b": sprite(8, 8, 2)}
+    layout = pack({name: image.size for name, image in sprites.items()}, gutter=4, rotate=False)
+    page = np.asarray(compose(layout, sprites))
+
+    for name, image in sprites.items():
+        x, y, w, h = layout.placements[name].frame
+        pixels = np.asarray(image)
+        if x >= 4:
+            assert (page[y : y + h, x - 4 : x] == pixels[:, :1]).all()
+        if x + w + 4 <= layout.width:
+            assert (page[y : y + h, x + w : x + w + 4] == pixels[:, -1:]).all()
+        if y + h + 4 <= layout.height:
+            assert (page[y + h : y + h + 4, x : x + w] == pixels[-1:]).all()
+
+
+def test_oversized_sprites_are_rejected():
+    with pytest.raises(ValueError):
+        pack({"a": (1024, 1024), "b": (1024, 1024)}, max_size=1024)
+    with pytest.raises(ValueError):
+        pack({"a": (8, 8)}, gutter=3)
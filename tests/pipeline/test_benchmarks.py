@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+from PIL import Image
+
+from polish_assets.benchmarks import (
+    Measurement,
+    compare,
+    load_results,
+    measure,
+    output_bytes,
+    save_results,
+)
+
+
+def allocate(size: int):
+    def call() -> Image.Image:
+        scratch = np.ones((size, size, 64), np.uint8)
+        return Image.new("RGBA", (size, size), int(scratch[0, 0, 0]))
+
+    return call
+
+
+def test_measure_reports_output_and_peak_memory():
+    result = measure(allocate, "allocate", 512, repeat=2)
+
+    assert result.key == "allocate@512"
+    assert result.output_bytes == 512 * 512 * 4
+    assert result.seconds > 0
+    # The 16 MiB scratch array counts even though it is freed before the call returns.
+    assert result.peak_bytes >= 12 << 20
+
+
+def test_output_bytes_sums_batched_results(tmp_path):
+    written = tmp_path / "out.bin"
+    written.write_bytes(b"x" * 10)
+    batch = [Image.new("RGB", (4, 2)), Image.new("L", (3, 3)), written]
+    assert output_bytes(batch) == 4 * 2 * 3 + 3 * 3 + 10
+
+
+def test_compare_flags_growth_past_threshold(tmp_path):
+    baseline = [Measurement("noise", 512, 0.2, 64 << 20, 1000)]
+    save_results(tmp_path / "baseline.json", baseline)
+    stored = load_results(tmp_path / "baseline.json")
+
+    steady = [Measurement("noise", 512, 0.22, 66 << 20, 1010)]
+    slower = [Measurement("noise", 512, 0.3, 64 << 20, 1000), Measurement("new", 512, 9, 0, 0)]
+    assert compare(steady, stored, threshold=0.25) == []
+    assert compare(slower, stored, threshold=0.25) == ["noise@512 seconds: 0.2 -> 0.3 (+50%)"]
+    assert len(compare(steady, stored, threshold=0.05)) == 1
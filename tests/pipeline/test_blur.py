@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+from polish_assets.blur import (
+    MEAN_ERROR_BOUND,
+    P999_ERROR_BOUND,
+    gaussian_blur,
+    pyramid_factor,
+)
+
+
+def inputs() -> dict[str, Image.Image]:
+    rng = np.random.default_rng(7)
+    noise = rng.integers(0, 256, (256, 512, 4), dtype=np.uint8)
+    step = np.zeros((256, 512, 4), dtype=np.uint8)
+    step[:, 250:] = 255
+    step[90:93] = 255
+    # Colour under zero alpha, which the exact blur carries through unweighted.
+    transparent = noise.copy()
+    transparent[..., 3] = np.where(np.arange(512) < 256, 0, 255)
+    return {
+        "noise": Image.fromarray(noise, "RGBA"),
+        "step": Image.fromarray(step, "RGBA"),
+        "transparent": Image.fromarray(transparent, "RGBA"),
+        "rgb": Image.fromarray(noise[..., :3], "RGB"),
+    }
+
+
+@pytest.mark.parametrize("sigma", [5.0, 9.0, 34.0])
+def test_pyramid_blur_stays_within_its_error_bound(sigma):
+    assert pyramid_factor(sigma) > 1
+    for name, image in inputs().items():
+        exact = np.asarray(image.filter(ImageFilter.GaussianBlur(sigma))).astype(int)
+        fast = gaussian_blur(image, sigma, "pyramid")
+        assert fast.mode == image.mode and fast.size == image.size
+        error = np.abs(np.asarray(fast).astype(int) - exact)
+        assert error.mean() <= MEAN_ERROR_BOUND, name
+        assert np.percentile(error, 99.9) <= P999_ERROR_BOUND, name
+
+
+def test_small_sigmas_and_exact_method_use_pillow_blur():
+    image = inputs()["noise"]
+    assert pyramid_factor(2.0) == 1
+    for sigma, method in [(2.0, "pyramid"), (9.0, "exact")]:
+        expected = image.filter(ImageFilter.GaussianBlur(sigma))
+        assert gaussian_blur(image, sigma, method).tobytes() == expected.tobytes()
+    with pytest.raises(ValueError, match="box"):
+        gaussian_blur(image, 9.0, "box")
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from functools import partial
+from pathlib import Path
+import importlib.util
+import time
+
+from polish_assets.build_graph import BuildGraph, code_fingerprint
+from polish_assets.rng import stream
+
+CALLS: list[str] = []
+
+
+def shout(source: Path, suffix: str) -> str:
+    CALLS.append(source.name)
+    return source.read_text(encoding="utf-8").upper() + suffix
+
+
+def write_text(value: str, out_path: Path) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(value, encoding="utf-8")
+
+
+def declare(tmp_path: Path, suffix: str = "!") -> BuildGraph:
+    graph = BuildGraph(tmp_path / "db.json", tmp_path)
+    graph.add(tmp_path / "out" / "b.txt", shout, write_text, [tmp_path / "out" / "a.txt"], suffix="?")
+    graph.add(tmp_path / "out" / "a.txt", shout, write_text, [tmp_path / "src.txt"], suffix=suffix)
+    return graph
+
+
+def rebuilt(results) -> list[str]:
+    return [result.node.output.name for result in results if result.rebuilt]
+
+
+def test_first_run_builds_in_dependency_order(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+    CALLS.clear()
+
+    results = declare(tmp_path).run()
+
+    assert CALLS == ["src.txt", "a.txt"]
+    assert rebuilt(results) == ["a.txt", "b.txt"]
+    assert (tmp_path / "out" / "b.txt").read_text(encoding="utf-8") == "HI!?"
+
+
+def test_noop_rebuild_skips_everything_quickly(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+    declare(tmp_path).run()
+    CALLS.clear()
+
+    start = time.perf_counter()
+    results = declare(tmp_path).run()
+
+    assert time.perf_counter() - start < 0.5
+    assert CALLS == []
+    assert rebuilt(results) == []
+
+
+def test_changed_param_rebuilds_node_and_dependents(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+    declare(tmp_path).run()
+
+    results = declare(tmp_path, suffix="!!").run()
+
+    assert rebuilt(results) == ["a.txt", "b.txt"]
+    reasons = {result.node.output.name: result.reasons for result in results}
+    assert reasons["a.txt"] == ["param suffix: '!' -> '!!'"]
+    assert reasons["b.txt"] == ["input changed: out/a.txt"]
+
+
+def test_touched_input_with_same_content_is_clean(tmp_path):
+    source = tmp_path / "src.txt"
+    source.write_text("hi", encoding="utf-8")
+    declare(tmp_path).run()
+    source.write_text("hi", encoding="utf-8")
+
+    assert rebuilt(declare(tmp_path).run()) == []
+
+
+def test_missing_output_is_rebuilt(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+    declare(tmp_path).run()
+    (tmp_path / "out" / "b.txt").unlink()
+
+    results = declare(tmp_path).run()
+
+    assert rebuilt(results) == ["b.txt"]
+    assert results[-1].reasons == ["output missing"]
+
+
+def test_plan_includes_downstream_of_dirty_nodes(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+    declare(tmp_path).run()
+    (tmp_path / "src.txt").write_text("yo", encoding="utf-8")
+    CALLS.clear()
+
+    planned = declare(tmp_path).plan()
+
+    assert [node.output.name for node in planned] == ["a.txt", "b.txt"]
+    assert CALLS == []
+
+
+def whisper(source: Path, suffix: str) -> str:
+    return source.read_text(encoding="utf-8").lower() + suffix
+
+
+def twice(build, source: Path, suffix: str) -> str:
+    return build(source, suffix) * 2
+
+
+def test_partials_are_fingerprinted_through_bound_arguments():
+    assert code_fingerprint(partial(twice, shout)) == code_fingerprint(partial(twice, shout))
+    assert code_fingerprint(partial(twice, shout)) != code_fingerprint(partial(twice, whisper))
+    assert code_fingerprint(partial(twice, shout)) != code_fingerprint(twice)
+    assert code_fingerprint(partial(shout, suffix="!")) != code_fingerprint(partial(shout, suffix="?"))
+
+
+GENERATOR_MODULE = """
+SUFFIX = {suffix!r}
+SEEN: dict[str, int] = {{}}
+
+
+class Shouter:
+    def shout(self, text: str) -> str:
+        return text.upper() + SUFFIX
+
+
+def loud(source):
+    SEEN[source.name] = SEEN.get(source.name, 0) + 1
+    return Shouter().shout(source.read_text(encoding="utf-8"))
+"""
+
+
+def load_generator(path: Path, suffix: str):
+    path.write_text(GENERATOR_MODULE.format(suffix=suffix), encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_constants_reached_through_classes_are_fingerprinted(tmp_path):
+    (tmp_path / "src.txt").write_text("hi", encoding="utf-8")
+
+    def declare_loud(module) -> BuildGraph:
+        graph = BuildGraph(tmp_path / "db.json", tmp_path)
+        graph.add(tmp_path / "out" / "a.txt", module.loud, write_text, [tmp_path / "src.txt"])
+        return graph
+
+    module = load_generator(tmp_path / "shouting.py", "!")
+    declare_loud(module).run()
+    # The filled cache is state, not code: the node stays clean.
+    assert module.SEEN == {"src.txt": 1}
+    assert rebuilt(declare_loud(module).run()) == []
+
+    results = declare_loud(load_generator(tmp_path / "shouting.py", "!!")).run()
+
+    assert rebuilt(results) == ["a.txt"]
+    assert results[0].reasons == ["generator code changed"]
+    assert (tmp_path / "out" / "a.txt").read_text(encoding="utf-8") == "HI!!"
+
+
+def speckle(size: int, seed: int, stream_name: str) -> str:
+    rng = stream(seed, stream_name)
+    return "".join(rng.choice("abcdef") for _ in range(size))
+
+
+def join(*sources: Path) -> str:
+    return "".join(source.read_text(encoding="utf-8") for source in sources)
+
+
+def declare_speckles(root: Path) -> BuildGraph:
+    graph = BuildGraph(root / "db.json", root)
+    parts = [root / "out" / f"s{index}.txt" for index in range(6)]
+    graph.add(root / "out" / "joined.txt", join, write_text, parts)
+    for index, part in enumerate(parts):
+        graph.add(part, speckle, write_text, size=2000, seed=7, stream_name=part.stem)
+    return graph
+
+
+def test_parallel_build_matches_one_worker_and_serial_build(tmp_path):
+    outputs = {}
+    for workers in (0, 1, 3):
+        root = tmp_path / f"w{workers}"
+        graph = declare_speckles(root)
+        if workers:
+            # Pair up the parts so tasks hold more than one node.
+            results = graph.run_parallel(workers, group=lambda node: node.output.stem[-1:] in "024")
+        else:
+            results = graph.run()
+        assert rebuilt(results) == [f"s{index}.txt" for index in range(6)] + ["joined.txt"]
+        assert results[-1].reasons == ["new node"]
+        outputs[workers] = {path.name: path.read_bytes() for path in (root / "out").iterdir()}
+        assert rebuilt(declare_speckles(root).run()) == []
+
+    assert outputs[0] == outputs[1] == outputs[3]
+    assert outputs[0]["s0.txt"] != outputs[0]["s1.txt"]
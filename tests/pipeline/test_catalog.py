@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import os
+
+from polish_assets.catalog import HashIndex, build_catalog, sha256_mapped, verify
+
+
+def write(path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def library(tmp_path):
+    assets = tmp_path / "Assets"
+    write(assets / "mib-medianetwork-logo.png", b"logo")
+    write(assets / "Hero Splash.webp", b"hero")
+    write(assets / "free-open" / "generated" / "hero_splash.webp", b"smaller hero")
+    write(assets / "clip.mp4", os.urandom(3 << 20))
+    write(assets / "notes.txt", b"")
+    write(assets / ".cache" / "catalog-hashes.json", b"{}")
+    return assets
+
+
+def test_catalog_matches_the_powershell_schema_and_reuses_hashes(tmp_path):
+    assets = library(tmp_path)
+    index = HashIndex(assets / ".cache" / "catalog-hashes.json")
+
+    catalog = build_catalog(tmp_path, "Assets", index, workers=2)
+    index.save()
+
+    by_id = {asset["id"]: asset for asset in catalog["assets"]}
+    # Case-insensitive path order decides which duplicate slug gets the suffix.
+    assert list(by_id) == [
+        "clip",
+        "hero_splash",
+        "hero_splash_2",
+        "mib_medianetwork_logo",
+        "notes",
+    ]
+    assert by_id["hero_splash"]["sourcePath"] == "Assets/free-open/generated/hero_splash.webp"
+    assert by_id["clip"]["tags"] == ["reference", "hero", "transition"]
+    assert by_id["clip"]["type"] == "video" and by_id["notes"]["type"] == "file"
+    assert by_id["mib_medianetwork_logo"]["tags"] == ["brand", "logo"]
+    assert by_id["notes"]["sha256"] == hashlib.sha256(b"").hexdigest()
+    assert by_id["clip"]["sha256"] == hashlib.sha256((assets / "clip.mp4").read_bytes()).hexdigest()
+    assert by_id["clip"]["sizeBytes"] == 3 << 20
+    assert catalog["lookup"] == {
+        "brand": ["mib_medianetwork_logo"],
+        "heroReference": ["clip", "hero_splash", "hero_splash_2"],
+        "transitionReference": ["clip"],
+        "miscReference": ["notes"],
+    }
+
+    # Unchanged files are not read again, and an unchanged catalog keeps its timestamp.
+    index = HashIndex(assets / ".cache" / "catalog-hashes.json")
+    previous = {**catalog, "generatedAtUtc": "2026-01-01T00:00:00Z"}
+    assert build_catalog(tmp_path, "Assets", index, previous=previous) == previous
+    assert index.hashed == 0
+    write(assets / "notes.txt", b"changed")
+    rebuilt = build_catalog(tmp_path, "Assets", index, previous=previous)
+    assert index.hashed == 1 and rebuilt["generatedAtUtc"] != previous["generatedAtUtc"]
+
+
+def test_verify_reports_changed_and_missing_files(tmp_path):
+    assets = library(tmp_path)
+    catalog = build_catalog(tmp_path, "Assets", HashIndex(tmp_path / "index.json"))
+    assert verify(tmp_path, catalog, workers=3) == []
+
+    (assets / "notes.txt").unlink()
+    write(assets / "Hero Splash.webp", b"HERO")
+    write(assets / "clip.mp4", b"short")
+
+    digest = sha256_mapped(assets / "Hero Splash.webp")
+    assert verify(tmp_path, catalog) == [
+        "Assets/clip.mp4: 5 bytes, recorded 3145728",
+        f"Assets/Hero Splash.webp: sha256 {digest} does not match",
+        "Assets/notes.txt: missing",
+    ]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from polish_assets.curves import Sinusoid, flipbook, line_coverage, sinusoid_sum
+
+
+def test_coverage_is_the_exact_area_of_the_line_in_each_pixel():
+    coverage = line_coverage(np.full(3, 10.25), height=16, half_width=2.5)
+    assert coverage.shape == (16, 3) and coverage.dtype == np.float32
+    column = coverage[:, 1]
+    assert column[7] == pytest.approx(0.25) and column[12] == pytest.approx(0.75)
+    assert (column[8:12] == 1).all() and column[:7].sum() == 0 and column[13:].sum() == 0
+    assert column.sum() == pytest.approx(5.0)
+
+    # On a 45 degree slope the vertical extent grows by sqrt(2), so the thickness holds.
+    slope = line_coverage(np.arange(8, dtype=np.float64) + 20, height=48, half_width=1.5)
+    assert slope[:, 3].sum() == pytest.approx(3 * math.sqrt(2))
+
+
+def test_sinusoid_frames_loop_and_stack_top_to_bottom():
+    terms = [Sinusoid(2.0, 0.3), Sinusoid(1.0, 0.7, 1.4, cycles=3)]
+    frames = sinusoid_sum(40, terms, frames=8)
+    x = np.arange(40)
+    assert np.allclose(frames[0], 2 * np.sin(0.3 * x) + np.sin(0.7 * x + 1.4))
+    # Twice the frames sample the same loop twice as finely.
+    assert np.allclose(sinusoid_sum(40, terms, frames=16)[::2], frames)
+    step = 2 * math.pi / 8
+    after_last = 2 * np.sin(0.3 * x + 8 * step) + np.sin(0.7 * x + 1.4 + 3 * 8 * step)
+    assert np.allclose(after_last, frames[0])
+
+    strip = flipbook(line_coverage(frames + 6, height=12, half_width=1.0))
+    assert strip.shape == (8 * 12, 40) and strip.flags.c_contiguous
+    assert np.array_equal(strip[12:24], line_coverage(frames[1] + 6, 12, 1.0))
+    with pytest.raises(ValueError):
+        sinusoid_sum(40, terms, frames=0)
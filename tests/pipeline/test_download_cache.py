@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from polish_assets.download_cache import DownloadCache, DownloadError
+from polish_assets.http_pool import ConnectionPool
+
+
+def test_cold_fetch_stores_object_and_writes_output(stand_in_server, tmp_path):
+    stand_in_server.files["pack.zip"] = b"zip-bytes" * 1000
+    cache = DownloadCache(tmp_path / "cache")
+
+    status = cache.fetch(stand_in_server.url("pack.zip"), tmp_path / "out" / "pack.zip")
+
+    assert status == "downloaded"
+    assert (tmp_path / "out" / "pack.zip").read_bytes() == stand_in_server.files["pack.zip"]
+    sha256 = hashlib.sha256(stand_in_server.files["pack.zip"]).hexdigest()
+    assert cache.object_path(sha256).exists()
+
+
+def test_warm_fetch_revalidates_with_etag(stand_in_server, tmp_path):
+    stand_in_server.files["env.hdr"] = b"hdr" * 500
+    url = stand_in_server.url("env.hdr")
+    DownloadCache(tmp_path / "cache").fetch(url, tmp_path / "env.hdr")
+
+    status = DownloadCache(tmp_path / "cache").fetch(url, tmp_path / "env.hdr")
+
+    assert status == "not-modified"
+    _, headers = stand_in_server.requests[-1]
+    assert headers["If-None-Match"] == stand_in_server.etag("env.hdr")
+
+
+def test_changed_source_is_downloaded_again(stand_in_server, tmp_path):
+    stand_in_server.files["noise.png"] = b"v1"
+    url = stand_in_server.url("noise.png")
+    cache = DownloadCache(tmp_path / "cache")
+    cache.fetch(url, tmp_path / "noise.png")
+
+    stand_in_server.files["noise.png"] = b"v2"
+
+    assert cache.fetch(url, tmp_path / "noise.png") == "downloaded"
+    assert (tmp_path / "noise.png").read_bytes() == b"v2"
+
+
+def test_warm_cache_works_offline(stand_in_server, tmp_path):
+    stand_in_server.files["disc.png"] = b"disc"
+    url = stand_in_server.url("disc.png")
+    DownloadCache(tmp_path / "cache").fetch(url, tmp_path / "disc.png")
+    stand_in_server.stop()
+    (tmp_path / "disc.png").unlink()
+
+    assert DownloadCache(tmp_path / "cache", offline=True).fetch(url, tmp_path / "disc.png") == "offline"
+    no_retry = ConnectionPool(retries=0)
+    assert DownloadCache(tmp_path / "cache", pool=no_retry).fetch(url, tmp_path / "disc.png") == "stale"
+    assert (tmp_path / "disc.png").read_bytes() == b"disc"
+
+
+def test_cold_cache_offline_raises(tmp_path):
+    cache = DownloadCache(tmp_path / "cache", offline=True)
+    with pytest.raises(DownloadError):
+        cache.fetch("http://127.0.0.1:9/missing.png", tmp_path / "missing.png")
+
+
+def test_corrupted_object_is_refetched(stand_in_server, tmp_path):
+    stand_in_server.files["ball.png"] = b"ball" * 10
+    url = stand_in_server.url("ball.png")
+    cache = DownloadCache(tmp_path / "cache")
+    cache.fetch(url, tmp_path / "ball.png")
+    cache.object_path(cache.entries[url].sha256).write_bytes(b"tampered" + b"!" * 32)
+
+    status = DownloadCache(tmp_path / "cache").fetch(url, tmp_path / "ball.png")
+
+    assert status == "downloaded"
+    assert "If-None-Match" not in stand_in_server.requests[-1][1]
+    assert (tmp_path / "ball.png").read_bytes() == b"ball" * 10
+
+
+def test_expected_hash_mismatch_raises(stand_in_server, tmp_path):
+    stand_in_server.files["smoke1.png"] = b"smoke"
+    cache = DownloadCache(tmp_path / "cache")
+    with pytest.raises(DownloadError):
+        cache.fetch(stand_in_server.url("smoke1.png"), tmp_path / "smoke1.png", expected_sha256="0" * 64)
+    assert not (tmp_path / "smoke1.png").exists()
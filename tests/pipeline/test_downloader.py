@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from polish_assets.download_cache import DownloadCache, DownloadError
+from polish_assets.downloader import fetch_all
+from polish_assets.http_pool import ConnectionPool
+
+
+def test_fetch_all_keeps_job_order_and_reports_sizes(stand_in_server, tmp_path):
+    names = [f"sprite{i}.png" for i in range(12)]
+    for i, name in enumerate(names):
+        stand_in_server.files[name] = bytes([i]) * (1000 + i)
+    cache = DownloadCache(tmp_path / "cache")
+
+    results = fetch_all(cache, [(stand_in_server.url(n), tmp_path / n) for n in names], workers=4)
+
+    assert [result.path.name for result in results] == names
+    assert all(result.status == "downloaded" for result in results)
+    assert [result.size for result in results] == [1000 + i for i in range(12)]
+    assert all((tmp_path / n).read_bytes() == stand_in_server.files[n] for n in names)
+
+
+def test_single_worker_reuses_one_connection(stand_in_server, tmp_path):
+    names = [f"tex{i}.png" for i in range(6)]
+    for name in names:
+        stand_in_server.files[name] = name.encode() * 100
+    cache = DownloadCache(tmp_path / "cache")
+
+    fetch_all(cache, [(stand_in_server.url(n), tmp_path / n) for n in names], workers=1)
+    fetch_all(cache, [(stand_in_server.url(n), tmp_path / n) for n in names], workers=1)
+
+    assert len(stand_in_server.requests) == 12
+    assert len(set(stand_in_server.connections)) == 1
+
+
+def test_retryable_status_is_retried_with_backoff(stand_in_server, tmp_path):
+    stand_in_server.files["env.hdr"] = b"hdr"
+    stand_in_server.failures["env.hdr"] = 2
+    cache = DownloadCache(tmp_path / "cache", pool=ConnectionPool(retries=2, backoff=0.01))
+
+    assert cache.fetch(stand_in_server.url("env.hdr"), tmp_path / "env.hdr") == "downloaded"
+    assert len(stand_in_server.requests) == 3
+
+
+def test_retries_exhausted_raises(stand_in_server, tmp_path):
+    stand_in_server.files["env.hdr"] = b"hdr"
+    stand_in_server.failures["env.hdr"] = 5
+    cache = DownloadCache(tmp_path / "cache", pool=ConnectionPool(retries=1, backoff=0.01))
+
+    with pytest.raises(DownloadError):
+        cache.fetch(stand_in_server.url("env.hdr"), tmp_path / "env.hdr")
+
+
+def test_redirect_is_followed(stand_in_server, tmp_path):
+    stand_in_server.files["Concrete013_2K-JPG.zip"] = b"zip"
+    stand_in_server.redirects["get"] = "Concrete013_2K-JPG.zip"
+    cache = DownloadCache(tmp_path / "cache")
+
+    cache.fetch(stand_in_server.url("get"), tmp_path / "pack.zip")
+
+    assert (tmp_path / "pack.zip").read_bytes() == b"zip"
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from PIL import Image
+
+from polish_assets.build_graph import BuildGraph
+from polish_assets.encoding import EncodeStage, save_png, save_webp
+
+
+def gradient(width: int, height: int, offset: int) -> Image.Image:
+    ramp = Image.linear_gradient("L").resize((width, height))
+    return ramp.point(lambda v: (v + offset) % 256).convert("RGB")
+
+
+def encode_all(stage: EncodeStage, root) -> list[str]:
+    for i in range(6):
+        save, suffix = (save_webp, "webp") if i % 2 else (save_png, "png")
+        stage.submit(save, gradient(96 + i * 16, 64, i * 40), root / f"img{i}.{suffix}")
+    return [report.path.name for report in stage.wait()]
+
+
+def test_pool_output_matches_inline_and_keeps_order(tmp_path):
+    with EncodeStage(0) as inline:
+        inline_names = encode_all(inline, tmp_path / "inline")
+    with EncodeStage(2, max_in_flight=2) as pooled:
+        pooled_names = encode_all(pooled, tmp_path / "pooled")
+        reports = pooled.reports
+
+    assert pooled_names == inline_names == [f"img{i}.{'webp' if i % 2 else 'png'}" for i in range(6)]
+    for name in inline_names:
+        assert (tmp_path / "pooled" / name).read_bytes() == (tmp_path / "inline" / name).read_bytes()
+    assert all(report.size == report.path.stat().st_size for report in reports)
+
+
+def make_tile(offset: int) -> Image.Image:
+    return gradient(64, 64, offset)
+
+
+def brighten(source, amount: int) -> Image.Image:
+    return Image.open(source).convert("RGB").point(lambda v: min(255, v + amount))
+
+
+def test_graph_waits_for_encoded_inputs(tmp_path):
+    graph = BuildGraph(tmp_path / "db.json", tmp_path)
+    base = tmp_path / "base.png"
+    graph.add(tmp_path / "bright.png", brighten, save_png, [base], amount=30)
+    graph.add(base, make_tile, save_png, offset=7)
+
+    with EncodeStage(2) as stage:
+        results = graph.run(encoder=stage)
+        stage.wait()
+
+    assert [result.node.output.name for result in results] == ["base.png", "bright.png"]
+    expected = min(255, make_tile(7).getpixel((63, 0))[0] + 30)
+    assert Image.open(tmp_path / "bright.png").getpixel((63, 0))[0] == expected
+    assert BuildGraph(tmp_path / "db.json", tmp_path).db["nodes"].keys() == {"base.png", "bright.png"}
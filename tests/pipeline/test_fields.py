@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from polish_assets.fields import portal_gradient_field, radial_falloff, radial_gradient_field
+
+
+def test_portal_gradient_matches_the_per_pixel_formula():
+    size = 150  # more than one row band
+    field = portal_gradient_field(size)
+    center = size / 2
+    for x, y in [(0, 0), (75, 75), (10, 140), (149, 3), (60, 99)]:
+        distance = min(1.0, math.hypot((x - center) / center, (y - center) / center))
+        glow = 1.0 - distance
+        expected = (int(26 + glow * 158), int(74 + glow * 174), int(126 + glow * 128), 255)
+        assert tuple(field[y, x]) == expected
+
+
+def test_radial_falloff_follows_center_aspect_and_power():
+    falloff = radial_falloff(200, 100, center=(0.25, 0.5), aspect=2.0, power=2.0)
+    assert falloff.shape == (100, 200)
+    assert falloff[50, 50] == 0.0
+    # Horizontal radius 100, vertical radius 50: both ends of the ellipse reach 1.
+    assert falloff[50, 150] == 1.0 and falloff[0, 50] == 1.0
+    assert math.isclose(falloff[50, 100], 0.25)
+    assert math.isclose(falloff[25, 50], 0.25)
+    assert falloff[99, 199] == 1.0
+
+
+def test_darkness_stops_short_of_the_outer_colour():
+    field = radial_gradient_field(
+        130, 130, inner=(0, 0, 0, 0), outer=(0, 0, 0, 255), power=2.1, darkness=0.5
+    )
+    alpha = field[..., 3].astype(int)
+    assert alpha[65, 65] == 0 and alpha[0, 0] == 127
+    assert (field[..., :3] == 0).all()
+    assert (np.diff(alpha[65, 65:]) >= 0).all()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from polish_assets.hdr import (
+    downsample,
+    float_to_rgbe,
+    levels,
+    read_hdr,
+    rgbe_image,
+    rgbe_to_float,
+    row_solid_angles,
+    write_hdr,
+)
+
+
+def environment(width: int = 64, height: int = 32, seed: int = 5) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sky = rng.gamma(0.6, 2.0, (height, width, 3)).astype(np.float32)
+    sky[: height // 4, width // 3 : width // 3 + 4] = 5000.0  # a sun
+    sky[-2:, :8] = 0.0  # and some black
+    return rgbe_to_float(float_to_rgbe(sky))
+
+
+def radiance(array: np.ndarray) -> np.ndarray:
+    weights = row_solid_angles(*array.shape[:2])
+    return (array * weights[:, None, None]).sum(axis=(0, 1))
+
+
+def test_rle_round_trip_is_exact(tmp_path):
+    sky = environment()
+    write_hdr(sky, tmp_path / "sky.hdr")
+
+    assert np.array_equal(read_hdr(tmp_path / "sky.hdr"), sky)
+
+
+def test_flat_scanlines_are_read(tmp_path):
+    sky = environment(width=4, height=2)
+    header = b"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y 2 +X 4\n"
+    (tmp_path / "flat.hdr").write_bytes(header + float_to_rgbe(sky).tobytes())
+
+    assert np.array_equal(read_hdr(tmp_path / "flat.hdr"), sky)
+
+
+def test_unsupported_files_are_rejected(tmp_path):
+    (tmp_path / "xyz.hdr").write_bytes(b"#?RADIANCE\nFORMAT=32-bit_rle_xyze\n\n-Y 2 +X 4\n")
+    (tmp_path / "flipped.hdr").write_bytes(b"#?RADIANCE\n\n+Y 2 +X 4\n")
+    for name in ("xyz.hdr", "flipped.hdr"):
+        with pytest.raises(ValueError):
+            read_hdr(tmp_path / name)
+
+
+def test_levels_keep_total_radiance():
+    sky = environment(width=128, height=64)
+    ladder = levels(sky, (256, 64, 32))
+
+    assert sorted(ladder) == [32, 64]
+    assert ladder[64].shape == (32, 64, 3)
+    for level in ladder.values():
+        assert radiance(level) == pytest.approx(radiance(sky), rel=1e-4)
+    with pytest.raises(ValueError):
+        downsample(sky[:3])
+
+
+def test_rgbe_image_holds_the_rgbe_bytes():
+    sky = environment()
+    image = rgbe_image(sky)
+
+    assert image.mode == "RGBA" and image.size == (64, 32)
+    assert np.array_equal(rgbe_to_float(np.asarray(image)), sky)
+    assert np.asarray(image)[-1, 0].tolist() == [0, 0, 0, 0]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from PIL import Image
+import numpy as np
+
+from polish_assets.image_cache import ImageCache, resize_image
+
+
+def write_source(path, mode="RGBA", size=(64, 48)):
+    ramp = Image.linear_gradient("L").resize(size)
+    mirrored = ramp.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    Image.merge("RGBA", (ramp, ramp.rotate(90), mirrored, ramp)).convert(mode).save(path)
+    return path
+
+
+def test_load_and_resize_are_memoized(tmp_path):
+    source = write_source(tmp_path / "lensflare0.png")
+    cache = ImageCache()
+
+    first = cache.load(source, "RGBA")
+    assert cache.load(source, "RGBA") is first
+    small = cache.resize(first, (32, 24))
+    assert cache.resize(cache.load(source, "RGBA"), (32, 24)) is small
+    assert small.tobytes() == resize_image(Image.open(source).convert("RGBA"), (32, 24)).tobytes()
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_uncached_images_are_resized_without_memo(tmp_path):
+    cache = ImageCache()
+    image = Image.new("RGB", (16, 16), (10, 20, 30))
+
+    assert cache.resize(image, (8, 8)) is not cache.resize(image, (8, 8))
+    assert cache.misses == 0
+
+
+def test_lru_evicts_past_memory_cap(tmp_path):
+    sources = [write_source(tmp_path / f"s{i}.png", size=(64, 64 + i)) for i in range(3)]
+    cache = ImageCache(max_bytes=2 * 64 * 66 * 4)
+
+    images = [cache.load(path, "RGBA") for path in sources]
+
+    assert cache.bytes <= cache.max_bytes
+    assert cache.load(sources[2], "RGBA") is images[2]
+    assert cache.load(sources[0], "RGBA") is not images[0]
+
+
+def test_shared_dir_maps_identical_pixels_across_caches(tmp_path):
+    source = write_source(tmp_path / "caustic_free.png", mode="RGB")
+    shared = tmp_path / "shared"
+    decoded = Image.open(source).convert("RGB")
+
+    first = ImageCache(shared_dir=shared).load(source, "RGB")
+    files = sorted(shared.glob("*.npy"))
+    second = ImageCache(shared_dir=shared).load(source, "RGB")
+
+    assert first.mode == second.mode == "RGB"
+    assert first.tobytes() == second.tobytes() == decoded.tobytes()
+    assert sorted(shared.glob("*.npy")) == files and len(files) == 1
+    assert isinstance(np.load(files[0], mmap_mode="r"), np.memmap)
+
+
+def test_shared_rgba_is_mapped_without_copy(tmp_path):
+    source = write_source(tmp_path / "smoke1.png")
+
+    image = ImageCache(shared_dir=tmp_path / "shared").load(source, "RGBA")
+
+    assert image.readonly
+    assert image.tobytes() == Image.open(source).convert("RGBA").tobytes()
+
+
+def test_memo_shares_builds_and_their_resizes(tmp_path):
+    calls = []
+
+    def build():
+        calls.append(1)
+        return Image.linear_gradient("L").convert("RGB")
+
+    for shared_dir in (None, tmp_path / "shared"):
+        calls.clear()
+        cache = ImageCache(shared_dir=shared_dir)
+        built = cache.memo(("haze_a", 2048), build)
+        assert cache.memo(("haze_a", 2048), build) is built
+        assert cache.resize(built, (64, 64)) is cache.resize(built, (64, 64))
+        assert calls == [1]
+        assert built.mode == "RGB"
+
+
+def test_release_and_forget_drop_an_entry_with_its_resizes(tmp_path):
+    sources = [write_source(tmp_path / f"s{i}.png", size=(64, 48 + i)) for i in range(2)]
+    cache = ImageCache()
+    first, second = (cache.load(path, "RGBA") for path in sources)
+    cache.resize(first, (32, 24))
+    built = cache.memo(("haze_a",), lambda: Image.new("L", (16, 16)))
+    cache.resize(cache.resize(built, (8, 8)), (4, 4))
+    cache.memo(("haze_a", "other"), lambda: Image.new("L", (4, 4)))
+
+    assert cache.release(sources[0]) == 64 * 48 * 4 + 32 * 24 * 4
+    assert cache.forget(("haze_a",)) == 16 * 16 + 8 * 8 + 4 * 4
+    assert cache.release(tmp_path / "never_loaded.png") == 0
+    assert cache.bytes == 64 * 49 * 4 + 4 * 4
+    assert cache.load(sources[1], "RGBA") is second
+    assert cache.load(sources[0], "RGBA") is not first
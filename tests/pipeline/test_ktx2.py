@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from pathlib import Path
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image, ImageOps
+
+from polish_assets.bcn import ENCODERS
+from polish_assets.ktx2 import IDENTIFIER, mip_chain, read_ktx2, save_ktx2, write_ktx2
+from polish_assets.runtime_config import technical_budgets, texture_set_sides, texture_sets
+
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Pillow's "bcn" decoder is an independent reference for the block layouts.
+PILLOW_BCN = {"BC1": (1, "RGBA"), "BC3": (3, "RGBA"), "BC5": (5, "RGB")}
+
+
+def decode(block_format: str, data: bytes, width: int, height: int) -> np.ndarray:
+    number, mode = PILLOW_BCN[block_format]
+    padded = (-(-width // 4) * 4, -(-height // 4) * 4)
+    image = Image.frombytes(mode, padded, data, "bcn", number)
+    return np.asarray(image)[:height, :width].astype(np.float64)
+
+
+def make_image(width: int, height: int) -> np.ndarray:
+    y, x = np.mgrid[0:height, 0:width]
+    rng = np.random.default_rng(7)
+    return np.stack(
+        [
+            x * 255 // max(width - 1, 1),
+            y * 255 // max(height - 1, 1),
+            (x + y) * 255 // max(width + height - 2, 1),
+            128 + 100 * np.sin(x / 5.0) * np.cos(y / 7.0),
+        ],
+        axis=-1,
+    ).astype(np.uint8) ^ rng.integers(0, 8, (height, width, 4), dtype=np.uint8)
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a - b) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255**2 / mse)
+
+
+@pytest.mark.parametrize(
+    ("block_format", "channels", "minimum"),
+    [("BC1", slice(0, 3), 34.0), ("BC3", slice(0, 4), 34.0), ("BC5", slice(0, 2), 40.0)],
+)
+def test_blocks_decode_close_to_source(block_format, channels, minimum):
+    source = make_image(70, 38)  # not a multiple of the 4x4 block size
+    data = ENCODERS[block_format](source)
+
+    assert len(data) == 18 * 10 * (8 if block_format == "BC1" else 16)
+    decoded = decode(block_format, data, 70, 38)
+    assert psnr(decoded[..., channels], source[..., channels].astype(np.float64)) > minimum
+
+
+def test_flat_blocks_never_use_the_three_colour_black():
+    source = np.full((8, 8, 3), (200, 90, 30), dtype=np.uint8)
+    decoded = decode("BC1", ENCODERS["BC1"](source), 8, 8)
+
+    assert np.abs(decoded[..., :3] - source).max() <= 4
+
+
+def test_srgb_mips_average_in_linear_light():
+    checker = np.indices((4, 4)).sum(axis=0) % 2 * 255
+    array = np.repeat(checker[..., None], 3, axis=2).astype(np.uint8)
+
+    srgb, linear = mip_chain(array, "srgb"), mip_chain(array, "linear")
+
+    assert [level.shape[:2] for level in srgb] == [(4, 4), (2, 2), (1, 1)]
+    assert srgb[1][0, 0, 0] == 188  # sRGB encoding of 50% linear light
+    assert linear[1][0, 0, 0] == 128
+
+
+def test_normal_mips_stay_unit_length():
+    left = np.array([0.6, 0.0, 0.8])
+    right = np.array([-0.6, 0.0, 0.8])
+    row = np.array([left, right] * 8)
+    array = np.rint((np.tile(row, (16, 1, 1)) + 1) / 2 * 255).astype(np.uint8)
+
+    levels = mip_chain(array, "normal")
+
+    assert len(levels) == 5
+    normal = levels[1][0, 0].astype(np.float64) / 255 * 2 - 1
+    assert normal == pytest.approx([0, 0, 1], abs=0.01)
+
+
+def test_container_layout_and_levels(tmp_path):
+    ramp = Image.linear_gradient("L").rotate(90).resize((64, 16))
+    image = ImageOps.colorize(ramp, "#10243b", "#b9dcff")
+    out_path = tmp_path / "tex.ktx2"
+
+    save_ktx2(image, out_path, "srgb")
+
+    raw = out_path.read_bytes()
+    assert raw.startswith(IDENTIFIER)
+    vk_format, type_size, width, height, depth, layers, faces, levels, scheme = struct.unpack_from(
+        "<9I", raw, 12
+    )
+    assert (vk_format, type_size, width, height, faces, levels, scheme) == (132, 1, 64, 16, 1, 7, 0)
+    assert (depth, layers) == (0, 0)
+    dfd_offset, dfd_length = struct.unpack_from("<2I", raw, 48)
+    assert struct.unpack_from("<I", raw, dfd_offset)[0] == dfd_length
+    assert raw[dfd_offset + 12] == 128 and raw[dfd_offset + 14] == 2  # BC1 model, sRGB transfer
+
+    expected = mip_chain(np.asarray(image), "srgb")
+    offsets = []
+    for level in range(levels):
+        offset, length, uncompressed = struct.unpack_from("<3Q", raw, 80 + 24 * level)
+        level_width, level_height = max(1, 64 >> level), max(1, 16 >> level)
+        assert length == uncompressed == -(-level_width // 4) * -(-level_height // 4) * 8
+        assert offset % 8 == 0
+        decoded = decode("BC1", raw[offset : offset + length], level_width, level_height)
+        assert psnr(decoded[..., :3], expected[level].astype(np.float64)) > 36
+        offsets.append(offset)
+    assert offsets == sorted(offsets, reverse=True)  # smallest mip is stored first
+
+    info = read_ktx2(out_path)
+    assert info.format_name == "BC1"
+    assert info.rgba8_bytes == 4 * sum(max(1, 64 >> i) * max(1, 16 >> i) for i in range(7))
+    assert info.gpu_bytes == sum(info.level_bytes) < info.rgba8_bytes
+
+
+def test_alpha_selects_bc3_and_normals_bc5(tmp_path):
+    rgba = Image.fromarray(make_image(16, 16))
+    opaque = rgba.copy()
+    opaque.putalpha(255)
+
+    save_ktx2(rgba, tmp_path / "alpha.ktx2", "linear")
+    save_ktx2(opaque, tmp_path / "opaque.ktx2", "linear")
+    save_ktx2(opaque, tmp_path / "normal.ktx2", "normal")
+
+    assert read_ktx2(tmp_path / "alpha.ktx2").vk_format == 137
+    assert read_ktx2(tmp_path / "opaque.ktx2").vk_format == 131
+    assert read_ktx2(tmp_path / "normal.ktx2").vk_format == 141
+
+
+def test_write_rejects_srgb_normals(tmp_path):
+    with pytest.raises(KeyError):
+        write_ktx2(tmp_path / "bad.ktx2", "BC5", True, 4, 4, [b"\0" * 16])
+
+
+def test_runtime_budgets_come_from_the_app_config():
+    budgets = technical_budgets(REPO_ROOT / "src" / "config" / "heroTransitionBeats.ts")
+    sets = texture_sets(REPO_ROOT / "src" / "config" / "visualProfiles.ts")
+    sides = texture_set_sides(REPO_ROOT / "src" / "config" / "visualProfiles.ts")
+
+    assert set(budgets) == set(sets) == {"high", "mid", "low"}
+    assert all(budget["textureBudgetMB"] > 0 for budget in budgets.values())
+    assert sides == {"512": 512, "1k": 1024, "2k": 2048}
+    assert set(sets.values()) <= set(sides)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import ModuleType
+import json
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from polish_assets.build_graph import BuildGraph
+from polish_assets.encoding import save_png
+from polish_assets.hdr import write_hdr
+from polish_assets.procedural import load_specs
+
+SPECS = Path(__file__).resolve().parents[2] / "scripts" / "procedural-textures.json"
+
+
+def test_env_sidecar_describes_the_specular_strip_it_points_to(pipeline, tmp_path):
+    source = tmp_path / "sky.hdr"
+    sky = np.random.default_rng(3).gamma(0.6, 2.0, (64, 128, 3)).astype(np.float32)
+    write_hdr(sky, source)
+    specular = {"width": 16, "roughness": [0.25, 0.5, 0.75, 1.0]}
+
+    save_png(pipeline.build_env_specular(source, **specular), tmp_path / "sky_specular.png")
+    pipeline.save_json(
+        pipeline.build_env_sidecar(source, "sky", {"low": 256}, specular), tmp_path / "sky.json"
+    )
+
+    sidecar = json.loads((tmp_path / "sky.json").read_text(encoding="utf-8"))["specular"]
+    with Image.open(tmp_path / "sky_specular.png") as strip:
+        assert (sidecar["width"], sidecar["height"]) == strip.size
+    assert sidecar["bandHeight"] * len(sidecar["roughness"]) == sidecar["height"]
+
+
+def write_stamps(root: Path) -> list[Path]:
+    """Four small RGBA sprites standing in for the downloaded confetti and flare images."""
+    root.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for index, size in enumerate((24, 32, 40, 48)):
+        image = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse((2, 2 + index, size - 3, size - 3), fill=(255, 200 - 40 * index, 90, 255))
+        paths.append(root / f"stamp{index}.png")
+        image.save(paths[-1])
+    return paths
+
+
+def declare_real_builders(pipeline: ModuleType, root: Path, stamps: list[Path]) -> BuildGraph:
+    graph = BuildGraph(root / "db.json", root)
+    graph.add(
+        root / "out" / "confetti_atlas.png",
+        pipeline.build_confetti_atlas,
+        save_png,
+        stamps,
+        width=160,
+        height=128,
+        seed=7,
+        stream="confetti_atlas",
+    )
+    specs = dict(load_specs(SPECS))
+    specs["speckled_rays"] = {
+        "width": 96,
+        "height": 96,
+        "mode": "RGBA",
+        "layers": [
+            {
+                "op": "rays",
+                "stream": "speckled",
+                "count": 24,
+                "inner": 0.1,
+                "outer": [0.3, 0.5],
+                "width": [1, 3],
+                "alpha": [110, 230],
+            },
+            {"op": "noise", "stream": "speckled_noise", "strength": 0.4},
+        ],
+    }
+    for name, spec in specs.items():
+        inputs = spec.get("inputs", {})
+        params = {key: value for key, value in spec.items() if key not in ("output", "inputs")}
+        params.update(width=min(spec["width"], 96), height=min(spec["height"], 96))
+        graph.add(
+            root / "out" / f"{name}.png",
+            pipeline.build_procedural,
+            save_png,
+            [stamps[-1] for _ in inputs],
+            names=tuple(inputs),
+            seed=7,
+            **params,
+        )
+    return graph
+
+
+def test_real_builders_give_the_same_bytes_for_any_worker_count(pipeline, tmp_path):
+    stamps = write_stamps(tmp_path / "stamps")
+    outputs = {}
+    for workers in (0, 1, 3):
+        graph = declare_real_builders(pipeline, tmp_path / f"w{workers}", stamps)
+        if workers:
+            graph.run_parallel(workers, group=pipeline.task_group, setup=pipeline.prepare_task)
+        else:
+            graph.run()
+        out = tmp_path / f"w{workers}" / "out"
+        outputs[workers] = {path.name: path.read_bytes() for path in sorted(out.iterdir())}
+
+    assert len(outputs[0]) == 7
+    assert outputs[0] == outputs[1] == outputs[3]
+    with Image.open(tmp_path / "w0" / "out" / "speckled_rays.png") as rays:
+        low, high = rays.getextrema()[3]
+    assert low == 0 and high > 200
+
+
+def test_block_aligned_follows_the_rung_cascade(pipeline):
+    assert pipeline.block_aligned((1536, 1024))
+    assert not pipeline.block_aligned((1536, 1024), (1024,))
+    assert not pipeline.block_aligned((1536, 1024), (1024, 512))
+    assert pipeline.block_aligned((2048, 1024), (1024, 512))
+    assert pipeline.cut_size((1536, 1024), 512) == (512, 341)
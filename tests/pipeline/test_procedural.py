@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from polish_assets.blur import gaussian_blur
+from polish_assets.image_cache import resize_image
+from polish_assets.procedural import load_specs, render, render_batch, validate
+from polish_assets.stamps import composite_over, premultiply, to_image
+
+SPECS = Path(__file__).resolve().parents[2] / "scripts" / "procedural-textures.json"
+
+
+def test_shipped_specs_render_in_one_batch():
+    specs = load_specs(SPECS)
+    small = [{**spec, "width": 64, "height": 32} for spec in specs.values()]
+    glow = render({"width": 16, "height": 16, "layers": [{"op": "fill", "color": [255] * 4}]})
+    batch = render_batch(small, {"glow": glow}, seed=7)
+    for spec, image in zip(small, batch):
+        assert image.mode == spec["mode"] and image.size == (64, 32)
+        assert image.tobytes() == render(spec, {"glow": glow}, seed=7).tobytes()
+
+    scanline = np.asarray(render({**specs["scanline"], "width": 8, "height": 12}))
+    assert scanline[:, :, 0].tolist() == [[18] * 8, [0] * 8, [0] * 8, [10] * 8, [0] * 8, [0] * 8] * 2
+
+
+def test_blurred_profile_matches_the_blurred_full_image():
+    layers = [
+        {"op": "fill", "color": [8, 16, 28, 255]},
+        {"op": "band", "axis": "y", "half_width": 0.2, "steps": 3, "color": [134, 205, 255, 160]},
+        {"op": "stripes", "axis": "y", "period": 5, "thickness": 2, "color": [255, 0, 0, 90]},
+        {"op": "blur", "sigma": 3.5},
+    ]
+    spec = {"width": 96, "height": 80, "mode": "RGBA", "layers": layers}
+    # Zero-strength noise changes no value but expands the canvas to full size first.
+    full = {**spec, "layers": [{"op": "noise", "stream": "n", "strength": 0.0}, *layers]}
+    assert render(spec).tobytes() == render(full).tobytes()
+
+
+def test_one_channel_canvas_matches_the_four_channel_one():
+    layers = [
+        {"op": "band", "axis": "x", "half_width": 0.3, "steps": 4, "color": [255] * 4},
+        {
+            "op": "rays",
+            "stream": "r",
+            "count": 9,
+            "inner": 0.1,
+            "outer": [0.3, 0.5],
+            "width": [1, 4],
+            "alpha": [90, 255],
+        },
+        {"op": "blur", "sigma": 2.5},
+        {"op": "stripes", "axis": "y", "period": 4, "color": [255, 255, 255, 120]},
+        {"op": "blur", "sigma": 1.5},
+    ]
+    # Zero-strength noise changes no value but expands the canvas to four channels first.
+    noise = {"op": "noise", "stream": "n", "strength": 0.0}
+    for mode in ("RGB", "RGBA"):
+        spec = {"width": 90, "height": 70, "mode": mode, "layers": layers}
+        full = {**spec, "layers": [noise, *layers]}
+        assert render(spec).tobytes() == render(full).tobytes()
+
+
+def test_image_layer_draws_only_the_visible_part_of_its_stamp():
+    glow = Image.radial_gradient("L").convert("RGBA")
+    glow.putalpha(Image.linear_gradient("L").resize(glow.size))
+    layer = {"op": "image", "input": "glow", "size": 2.0, "blur": 6, "at": [[0.1, 0.5], [0.8, 0.6]]}
+    spec = {"width": 120, "height": 40, "mode": "RGBA", "layers": [layer]}
+
+    stamp = premultiply(gaussian_blur(resize_image(glow, (80, 80)), 6))
+    canvas = np.zeros((40, 120, 4), dtype=np.float32)
+    composite_over(canvas, stamp, 12 - 40, 20 - 40)
+    composite_over(canvas, stamp, 96 - 40, 24 - 40)
+    assert render(spec, {"glow": glow}).tobytes() == to_image(canvas).tobytes()
+
+
+def test_rays_stay_inside_their_annulus():
+    layer = {
+        "op": "rays",
+        "stream": "r",
+        "count": 12,
+        "inner": 0.2,
+        "outer": [0.3, 0.4],
+        "width": [1, 3],
+        "alpha": [255, 255],
+    }
+    burst = np.asarray(render({"width": 100, "height": 100, "mode": "RGB", "layers": [layer]}))
+    ys, xs = np.nonzero(burst[..., 0])
+    radius = np.hypot(xs + 0.5 - 50, ys + 0.5 - 50)
+    assert radius.min() > 20 - 1 and radius.max() < 40 + 1
+    assert burst[50, 50].tolist() == [0, 0, 0]
+
+
+def test_bad_specs_are_rejected():
+    with pytest.raises(ValueError, match="unknown op"):
+        validate({"width": 4, "height": 4, "layers": [{"op": "emboss"}]})
+    with pytest.raises(ValueError, match="unknown keys"):
+        validate({"width": 4, "height": 4, "layers": [], "colour": "red"})
+    with pytest.raises(ValueError, match="needs input"):
+        render({"width": 4, "height": 4, "layers": [{"op": "image", "input": "glow", "size": 1}]})
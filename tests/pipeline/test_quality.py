@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from polish_assets.encoding import EncodeStage, save_webp, save_webp_tuned
+from polish_assets.quality import BASELINE_QUALITY, SsimReference, ssim, tune_webp, webp_bytes
+
+
+def haze(size: int = 128) -> Image.Image:
+    ramp = Image.linear_gradient("L").resize((size, size))
+    return Image.merge("RGB", (ramp, ramp.rotate(90), ramp.rotate(180)))
+
+
+def grain(size: int = 128, seed: int = 3) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size, size, 3), dtype=np.uint8), "RGB")
+
+
+def decode(data: bytes, mode: str) -> Image.Image:
+    return Image.open(BytesIO(data)).convert(mode)
+
+
+def test_ssim_is_one_for_identical_images_and_falls_with_noise():
+    image = haze()
+    noisy = Image.blend(image, grain(), 0.2)
+
+    assert ssim(image, image) == pytest.approx(1.0)
+    assert ssim(image, noisy) < 0.9
+    assert ssim(image, Image.blend(image, grain(), 0.05)) > ssim(image, noisy)
+
+
+def test_ssim_scores_the_worst_channel():
+    image = haze()
+    r, g, b = image.split()
+    broken = Image.merge("RGB", (r, g, Image.blend(b, grain().split()[0], 0.5)))
+
+    assert ssim(image, broken) == pytest.approx(ssim(b, broken.split()[2]), abs=1e-6)
+
+
+def test_tuned_webp_meets_target_and_beats_fixed_quality():
+    image = haze(256)
+    tuned = tune_webp(image, target=0.98)
+
+    assert tuned.baseline == len(webp_bytes(image, quality=BASELINE_QUALITY))
+    assert len(tuned.data) < tuned.baseline
+    assert SsimReference(image).score(decode(tuned.data, "RGB")) >= 0.98
+
+
+def test_target_is_capped_at_the_fixed_quality_score():
+    image = grain()
+    tuned = tune_webp(image, target=0.999)
+    baseline = webp_bytes(image, quality=BASELINE_QUALITY)
+
+    assert len(tuned.data) <= len(baseline)
+    assert tuned.score >= ssim(image, decode(baseline, "RGB")) - 1e-6
+
+
+def test_flat_images_go_lossless_and_keep_hidden_colour():
+    image = Image.new("RGBA", (64, 64), (40, 80, 120, 0))
+    image.paste((250, 250, 250, 255), (0, 0, 64, 8))
+    tuned = tune_webp(image)
+
+    assert tuned.setting == "lossless"
+    assert decode(tuned.data, "RGBA").tobytes() == image.tobytes()
+
+
+def test_stage_reports_tuned_and_fixed_sizes(tmp_path):
+    with EncodeStage(0) as stage:
+        stage.submit(save_webp, haze(), tmp_path / "fixed.webp")
+        stage.submit(save_webp_tuned, haze(), tmp_path / "tuned.webp")
+        fixed, tuned = stage.wait()
+
+    assert fixed.baseline is None
+    assert tuned.baseline == fixed.size
+    assert tuned.size == (tmp_path / "tuned.webp").stat().st_size <= fixed.size
+    assert tuned.setting in tuned.summary(tmp_path)
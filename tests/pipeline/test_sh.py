@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from polish_assets.sh import equirect_directions, irradiance, prefilter_specular, project_sh
+
+
+AXES = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0], [0, -1, 0], [0, 0, 1], [0, 0, -1]], float)
+
+
+def spot(height: int = 64, width: int = 128, row: int = 32, column: int = 64) -> np.ndarray:
+    sky = np.zeros((height, width, 3), np.float32)
+    sky[row - 1 : row + 1, column - 1 : column + 1] = (400.0, 200.0, 100.0)
+    return sky
+
+
+def test_directions_follow_three_equirect_convention():
+    directions, solid_angles = equirect_directions(64, 128)
+
+    assert solid_angles.sum() == pytest.approx(4 * np.pi)
+    assert np.allclose(np.linalg.norm(directions, axis=-1), 1)
+    # Centre of the map looks down +X, a quarter turn right is +Z, the top row is +Y.
+    assert directions[32, 64] == pytest.approx([1, 0, 0], abs=0.05)
+    assert directions[32, 96] == pytest.approx([0, 0, 1], abs=0.05)
+    assert directions[0, 0, 1] > 0.99
+
+
+def test_uniform_sky_gives_pi_irradiance_everywhere():
+    coefficients = project_sh(np.ones((32, 64, 3), np.float32))
+
+    assert irradiance(coefficients, AXES) == pytest.approx(np.full((6, 3), np.pi), rel=1e-3)
+
+
+def test_spot_light_matches_clamped_cosine_irradiance():
+    sky = spot()
+    directions, solid_angles = equirect_directions(*sky.shape[:2])
+    normals = equirect_directions(8, 16)[0].reshape(-1, 3)
+    cosines = np.clip(normals @ directions.reshape(-1, 3).T, 0, None)
+    exact = cosines @ (sky.reshape(-1, 3) * solid_angles.reshape(-1, 1))
+    approx = irradiance(project_sh(sky), normals)
+
+    # L2 keeps the lobe's shape to within a few percent of its peak.
+    assert np.abs(approx - exact).max() < 0.1 * exact.max()
+    assert np.argmax(irradiance(project_sh(sky), AXES)[:, 0]) == 0
+
+
+def test_specular_bands_keep_energy_and_blur_with_roughness():
+    flat = prefilter_specular(np.full((32, 64, 3), 2.0, np.float32), 16, roughness=0.5)
+    assert flat == pytest.approx(np.full((8, 16, 3), 2.0), rel=1e-4)
+
+    sky = spot(32, 64, 16, 32)
+    glossy = prefilter_specular(sky, 32, roughness=0.25)
+    rough = prefilter_specular(sky, 32, roughness=1.0)
+    assert glossy.max() > rough.max()
+    peak = np.unravel_index(glossy[..., 0].argmax(), glossy.shape[:2])
+    assert peak in {(7, 15), (7, 16), (8, 15), (8, 16)}
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image, ImageChops
+
+from polish_assets.stamps import StampVariants, composite_over, premultiply, to_image
+
+
+def sprite(seed: int, size: int = 24) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    return Image.fromarray(rng.integers(0, 256, (size, size, 4), dtype=np.uint8), "RGBA")
+
+
+def test_premultiplied_over_matches_pillow_alpha_composite():
+    background = sprite(1, 40)
+    canvas = premultiply(background)
+    expected = background.copy()
+    for seed, (x, y) in enumerate([(5, 7), (-9, 30), (28, -4)], start=2):
+        tile = sprite(seed)
+        tint = (200, 230, 255, 150)
+        expected.alpha_composite(ImageChops.multiply(tile, Image.new("RGBA", tile.size, tint)), (x, y))
+        composite_over(canvas, premultiply(tile), x, y, [channel / 255 for channel in tint])
+
+    got = np.asarray(to_image(canvas)).astype(int)
+    want = np.asarray(expected).astype(int)
+    assert np.abs(got[..., 3] - want[..., 3]).max() <= 1
+    # Colour under near-zero alpha is ill-defined, so compare it premultiplied.
+    premultiplied = lambda array: array[..., :3] * array[..., 3:] / 255
+    assert np.abs(premultiplied(got) - premultiplied(want)).max() <= 2
+
+
+def test_variants_are_rendered_once_per_quantized_step():
+    variants = StampVariants([sprite(1, 64)], scale_range=(0.2, 0.6), scale_steps=5, angle_steps=8)
+
+    first = variants.get(0, 0.4, 44.0)
+    assert variants.get(0, 0.41, 46.0) is first
+    assert first.shape[0] > int(64 * 0.4)  # rotated 45 degrees with expand
+    assert variants.get(0, 0.4, 0.0).shape[:2] == (25, 25)
+    assert variants.get(0, 0.2, 359.0).shape[:2] == (12, 12)
+    assert len(variants) == 3
+    with pytest.raises(ValueError):
+        StampVariants([sprite(1)], scale_range=(0.2, 0.6), scale_steps=1)
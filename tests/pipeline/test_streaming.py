@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from polish_assets.build_graph import BuildGraph
+from polish_assets.streaming import Stream, last_uses
+
+
+def concat(*sources: Path) -> str:
+    return "".join(source.read_text(encoding="utf-8") for source in sources)
+
+
+def write_text(value: str, out_path: Path) -> None:
+    out_path.write_text(value, encoding="utf-8")
+
+
+def test_each_source_is_released_after_its_last_reader(tmp_path):
+    a, b = tmp_path / "a.txt", tmp_path / "b.txt"
+    a.write_text("a", encoding="utf-8")
+    b.write_text("b", encoding="utf-8")
+    graph = BuildGraph(tmp_path / "db.json", tmp_path)
+    first = graph.add(tmp_path / "ab.txt", concat, write_text, [a, b])
+    second = graph.add(tmp_path / "b2.txt", concat, write_text, [b])
+    third = graph.add(tmp_path / "abb.txt", concat, write_text, [tmp_path / "ab.txt", b])
+    assert last_uses(graph.nodes, lambda node: node.inputs) == {
+        id(first): [a],
+        id(third): [b, tmp_path / "ab.txt"],
+    }
+
+    events: list[str] = []
+    stream = Stream(
+        lambda node: node.inputs,
+        lambda key: events.append(key.name) or 1,
+        lambda: events.append("shed"),
+        max_rss=0,
+    )
+    stream.plan(graph.plan())
+    graph.run(stream=stream)
+
+    # With a zero cap every build is preceded by a shed.
+    assert events == ["shed", "a.txt", "shed", "shed", "b.txt", "ab.txt"]
+    assert (stream.sheds, stream.released_bytes) == (3, 3)
+    assert (tmp_path / "abb.txt").read_text(encoding="utf-8") == "abb"
+    assert "peak RSS" in stream.summary()
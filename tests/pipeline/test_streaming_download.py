@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+import hashlib
+import os
+import tracemalloc
+
+import pytest
+
+from polish_assets.download_cache import DownloadCache, DownloadError
+from polish_assets.http_pool import ConnectionPool
+
+
+def partial_sizes(cache_root: Path) -> list[int]:
+    """Sizes of the interrupted bodies kept under the cache's `partial/` directory."""
+    partial = cache_root / "partial"
+    return [path.stat().st_size for path in partial.iterdir() if path.suffix != ".json"]
+
+
+def test_large_body_streams_in_constant_memory(stand_in_server, tmp_path):
+    body = os.urandom(32 << 20)
+    stand_in_server.files["san_giuseppe_bridge_2k.hdr"] = body
+    cache = DownloadCache(tmp_path / "cache")
+
+    tracemalloc.start()
+    try:
+        cache.fetch(stand_in_server.url("san_giuseppe_bridge_2k.hdr"), tmp_path / "env.hdr")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 4 << 20
+    entry = cache.entries[stand_in_server.url("san_giuseppe_bridge_2k.hdr")]
+    assert entry.sha256 == hashlib.sha256(body).hexdigest()
+    assert entry.etag == stand_in_server.etag("san_giuseppe_bridge_2k.hdr")
+    assert (tmp_path / "env.hdr").stat().st_size == len(body)
+
+
+def test_dropped_transfer_resumes_with_range(stand_in_server, tmp_path):
+    body = os.urandom(300_000)
+    stand_in_server.files["pack.zip"] = body
+    stand_in_server.cut_after["pack.zip"] = 120_000
+    cache = DownloadCache(tmp_path / "cache", pool=ConnectionPool(backoff=0.01))
+
+    assert cache.fetch(stand_in_server.url("pack.zip"), tmp_path / "pack.zip") == "downloaded"
+
+    assert (tmp_path / "pack.zip").read_bytes() == body
+    _, resumed = stand_in_server.requests[-1]
+    assert resumed["Range"] == "bytes=120000-"
+    assert resumed["If-Range"] == stand_in_server.etag("pack.zip")
+    assert not (tmp_path / "cache" / "partial").exists() or not any(
+        (tmp_path / "cache" / "partial").iterdir()
+    )
+
+
+def test_partial_from_previous_run_is_resumed(stand_in_server, tmp_path):
+    body = os.urandom(200_000)
+    stand_in_server.files["Concrete047A_2K-JPG.zip"] = body
+    stand_in_server.cut_after["Concrete047A_2K-JPG.zip"] = 50_000
+    url = stand_in_server.url("Concrete047A_2K-JPG.zip")
+    no_retry = ConnectionPool(retries=0)
+    with pytest.raises(DownloadError):
+        DownloadCache(tmp_path / "cache", pool=no_retry).fetch(url, tmp_path / "pack.zip")
+    assert not (tmp_path / "pack.zip").exists()
+    assert partial_sizes(tmp_path / "cache") == [50_000]
+
+    DownloadCache(tmp_path / "cache", pool=no_retry).fetch(url, tmp_path / "pack.zip")
+
+    assert (tmp_path / "pack.zip").read_bytes() == body
+    assert stand_in_server.requests[-1][1]["Range"] == "bytes=50000-"
+    assert stand_in_server.statuses[-1] == 206
+
+
+def test_changed_source_restarts_partial(stand_in_server, tmp_path):
+    stand_in_server.files["noise.png"] = b"a" * 100_000
+    stand_in_server.cut_after["noise.png"] = 40_000
+    url = stand_in_server.url("noise.png")
+    no_retry = ConnectionPool(retries=0)
+    with pytest.raises(DownloadError):
+        DownloadCache(tmp_path / "cache", pool=no_retry).fetch(url, tmp_path / "noise.png")
+    assert partial_sizes(tmp_path / "cache") == [40_000]
+
+    stand_in_server.files["noise.png"] = b"b" * 90_000
+    DownloadCache(tmp_path / "cache", pool=no_retry).fetch(url, tmp_path / "noise.png")
+
+    assert (tmp_path / "noise.png").read_bytes() == b"b" * 90_000
+    # The resume was asked for, but the changed ETag got the whole new body back.
+    assert stand_in_server.requests[-1][1]["Range"] == "bytes=40000-"
+    assert stand_in_server.statuses[-1] == 200
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from PIL import Image, ImageChops
+
+from polish_assets.blur import blur_footprint, gaussian_blur
+from polish_assets.tiles import tile_boxes, tiled
+
+
+def noise(mode: str, size=(300, 170), seed=3) -> Image.Image:
+    bands = len(mode)
+    pixels = np.random.default_rng(seed).integers(0, 256, (size[1], size[0], bands), np.uint8)
+    return Image.fromarray(pixels[..., 0] if bands == 1 else pixels, mode)
+
+
+def test_boxes_cover_the_canvas_once_with_aligned_halos():
+    covered = np.zeros((170, 300), dtype=int)
+    for square, cropped in tile_boxes((300, 170), tile=62, halo=9, align=4):
+        left, top, right, bottom = square
+        covered[top:bottom, left:right] += 1
+        # The tile rounds up to 64 and the halo to 12, so crops start on the aligned grid.
+        assert left % 64 == 0 and top % 64 == 0
+        assert cropped[0] % 4 == 0 and cropped[1] % 4 == 0
+        assert cropped[0] == max(0, left - 12) and cropped[3] == min(170, bottom + 12)
+    assert (covered == 1).all()
+
+
+@pytest.mark.parametrize("mode", ["L", "RGB", "RGBA"])
+@pytest.mark.parametrize("sigma,method", [(0.8, "exact"), (5.0, "exact"), (9.0, "pyramid")])
+def test_tiled_blur_is_byte_identical_to_the_whole_image(mode, sigma, method):
+    image = noise(mode)
+    halo, align = blur_footprint(sigma, method)
+
+    def blur(tile: Image.Image) -> Image.Image:
+        return gaussian_blur(tile, sigma, method)
+
+    result = tiled(blur, image, halo=halo, align=align, tile=64, workers=3)
+
+    assert result.mode == mode
+    assert result.tobytes() == blur(image).tobytes()
+
+
+def test_fused_steps_match_and_inputs_must_agree_in_size():
+    base, overlay = noise("RGBA"), noise("RGBA", seed=4)
+
+    def shade(base: Image.Image, overlay: Image.Image) -> Image.Image:
+        return gaussian_blur(ImageChops.multiply(base, overlay), 5).convert("RGB")
+
+    result = tiled(shade, base, overlay, halo=blur_footprint(5)[0], tile=100)
+    assert result.tobytes() == shade(base, overlay).tobytes()
+    with pytest.raises(ValueError):
+        tiled(shade, base, noise("RGBA", size=(10, 10)))
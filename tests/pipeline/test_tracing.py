@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+
+from PIL import Image
+
+from polish_assets.tracing import Tracer, payload_bytes
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.span("decode", "a.png", 10) as span:
+        span.bytes_out = 99
+    tracer.record("encode", "a.webp", 0.0, 1.0, pid=1)
+
+    assert tracer.spans == []
+
+
+def test_spans_export_as_chrome_trace(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    with tracer.span("generate", "plate.webp") as outer:
+        with tracer.span("decode", "source.jpg", 1000) as inner:
+            inner.bytes_out = payload_bytes(Image.new("RGB", (8, 4)))
+        outer.bytes_out = 96
+    tracer.record("encode", "plate.webp", outer.start, 0.5, pid=4242, bytes_in=96, bytes_out=40)
+    tracer.write_chrome_trace(tmp_path / "trace.json")
+
+    events = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))["traceEvents"]
+    spans = {event["name"] + "/" + event["cat"]: event for event in events if event["ph"] == "X"}
+    assert spans["source.jpg/decode"]["args"]["bytes_out"] == 96
+    assert "rss_delta_kib" in spans["source.jpg/decode"]["args"]
+    outer_event, inner_event = spans["plate.webp/generate"], spans["source.jpg/decode"]
+    assert outer_event["ts"] <= inner_event["ts"]
+    assert inner_event["ts"] + inner_event["dur"] <= outer_event["ts"] + outer_event["dur"]
+    assert spans["plate.webp/encode"]["pid"] == 4242
+    names = {event["args"]["name"] for event in events if event["ph"] == "M"}
+    assert names == {"pipeline", "worker 4242"}
+
+    summary = tracer.summary()
+    assert summary[1].split()[:2] == ["encode", "1"]
+    assert [line.split()[0] for line in summary[1:4]] == ["encode", "generate", "decode"]